@@ -0,0 +1,117 @@
+"""Bounded inference executor with admission control.
+
+Scoring work runs on a fixed-size thread pool. At most `workers + queue_size`
+requests may be admitted at once; anything beyond that is refused immediately
+with `Overloaded` (mapped to 429 + Retry-After) instead of queueing invisibly
+until the gunicorn timeout fires. A request that waits or runs longer than
+`timeout` seconds is abandoned with a 503.
+"""
+import contextvars
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+import timing
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted or did not finish in time."""
+
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Run callables on a fixed-size executor behind a bounded admission queue."""
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._service_total = 0.0
+
+    def retry_after(self):
+        """Seconds a refused client should wait: the estimated time to drain the queue."""
+        with self._lock:
+            avg_service = self._service_total / self._completed if self._completed else 1.0
+            backlog = self._waiting + self._running
+        return max(1, min(60, math.ceil(avg_service * backlog / self.workers)))
+
+    def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on the executor and return its result.
+        Raises Overloaded(429) if the queue is full and Overloaded(503) if the
+        call does not complete within the timeout.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise Overloaded("Inference queue is full", 429, self.retry_after())
+
+        enqueued = time.monotonic()
+        with self._lock:
+            self._admitted += 1
+            self._waiting += 1
+
+        def task():
+            started = time.monotonic()
+            wait = started - enqueued
+            with self._lock:
+                self._waiting -= 1
+                self._running += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            timing.record('queue', wait)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._service_total += time.monotonic() - started
+
+        # run in a copy of the caller's context so stage timings reach its request timer
+        future = self._executor.submit(contextvars.copy_context().run, task)
+        # the slot is held until the work really finishes, even if the caller gave up
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeout:
+            if future.cancel():
+                with self._lock:
+                    self._waiting -= 1
+            with self._lock:
+                self._timed_out += 1
+            raise Overloaded(f"Inference did not complete within {self.timeout}s", 503, self.retry_after())
+
+    def stats(self):
+        """Snapshot of queue depth, wait times and admission counters."""
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "enabled": True,
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "timeout_seconds": self.timeout,
+                "queue_depth": self._waiting,
+                "running": self._running,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "completed": self._completed,
+                "avg_wait_ms": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
@@ -0,0 +1,283 @@
+"""Country and year rollups of scored projects.
+
+Dashboards need per-country (and per-year) averages and distributions of
+the E/S/G and SDG scores. Instead of regrouping the whole scored corpus on
+every view, `RollupStore` keeps for every group and dimension a count, sum,
+sum of squares and a fixed-bin histogram. Adding scored rows only touches
+the groups they belong to, the mean/std/histogram of a group are read from
+one row of each array, and the store is persisted as a small .npz file.
+
+Rows that carry a ProjectID count once per project: the store keeps each
+project's groups and score vector, so re-scoring a project subtracts its
+previous contribution before adding the new one, and re-adding a project
+with unchanged scores and groups is a no-op. Rows without an ID are only
+ever added.
+
+    python aggregates.py projects_scored.csv -o data/aggregates.npz
+
+rolls up an already scored CSV or Parquet file (reading only the country,
+year, project ID and score columns); `bulk_score.py --aggregates` updates
+the store as it scores.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+import storage
+
+DIMENSIONS = ('E', 'S', 'G') + tuple(f'SDG{i}' for i in range(1, 18))
+LEVELS = ('country', 'year', 'country_year')
+YEAR_COLUMNS = ('Year', 'FiscalYear')
+DATE_COLUMNS = ('BoardApprovalDate', 'ApprovalDate')
+
+
+def group_key(level, country, year):
+    """Key of the `level` group a project of `country` and `year` belongs to (None if unknown)."""
+    if level == 'country':
+        return country
+    if level == 'year':
+        return year
+    return f"{country}|{year}" if country is not None and year is not None else None
+
+
+def _labels(values):
+    return [str(int(v)) if v == v else None for v in values]  # NaN != NaN
+
+
+def project_years(df):
+    """Year of every row of a projects DataFrame, from a year or approval-date column (else None)."""
+    import pandas as pd
+
+    for col in YEAR_COLUMNS:
+        if col in df.columns:
+            return _labels(pd.to_numeric(df[col], errors='coerce'))
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            return _labels(pd.to_datetime(df[col], errors='coerce').dt.year)
+    return None
+
+
+class RollupStore:
+    """count / sum / sum of squares / histogram per (level, group, dimension)."""
+
+    def __init__(self, dimensions=DIMENSIONS, bins=10, value_range=(0.0, 1.0)):
+        self.dimensions = tuple(dimensions)
+        self.bin_edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        self._groups = {level: {} for level in LEVELS}  # level -> key -> row
+        self._keys = []
+        n_dims = len(self.dimensions)
+        self.projects = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros((0, n_dims), dtype=np.int64)
+        self.sums = np.zeros((0, n_dims))
+        self.sumsqs = np.zeros((0, n_dims))
+        self.histograms = np.zeros((0, n_dims, bins), dtype=np.int64)
+        # ProjectID -> row of project_scores / _project_groups (the project's current contribution)
+        self._project_rows = {}
+        self._project_groups = []
+        self.project_scores = np.zeros((0, n_dims))
+
+    def _rows(self, level, keys):
+        """Row index for every key, creating rows for new groups."""
+        groups = self._groups[level]
+        new = [k for k in dict.fromkeys(keys) if k not in groups]
+        if new:
+            start = len(self._keys)
+            for i, key in enumerate(new):
+                groups[key] = start + i
+                self._keys.append((level, key))
+            grow = len(new)
+            self.projects = np.concatenate([self.projects, np.zeros(grow, np.int64)])
+            self.counts = np.concatenate([self.counts, np.zeros((grow,) + self.counts.shape[1:], np.int64)])
+            self.sums = np.concatenate([self.sums, np.zeros((grow,) + self.sums.shape[1:])])
+            self.sumsqs = np.concatenate([self.sumsqs, np.zeros((grow,) + self.sumsqs.shape[1:])])
+            self.histograms = np.concatenate([self.histograms,
+                                              np.zeros((grow,) + self.histograms.shape[1:], np.int64)])
+        return np.array([groups[k] for k in keys], dtype=np.int64)
+
+    def update(self, scores, countries=None, years=None, project_ids=None):
+        """Add scored rows. `scores` is (n, len(dimensions)) with NaN for missing
+        values; `countries` / `years` / `project_ids` are per-row labels (None
+        where unknown). A project already in the store is replaced, or skipped if
+        its scores and groups are unchanged; of repeated IDs the last row counts.
+        Returns {"added", "replaced", "unchanged"} row counts.
+        """
+        scores = np.asarray(scores, dtype=float).reshape(-1, len(self.dimensions))
+        n = len(scores)
+        countries = list(countries) if countries is not None else [None] * n
+        years = list(years) if years is not None else [None] * n
+        if project_ids is None:
+            self._apply(scores, countries, years, 1)
+            return {"added": n, "replaced": 0, "unchanged": 0}
+
+        latest = {}
+        anonymous = []
+        for i, pid in enumerate(project_ids):
+            if pid is None:
+                anonymous.append(i)
+            else:
+                latest[str(pid)] = i
+        new, replaced, previous = [], [], []
+        for pid, i in latest.items():
+            row = self._project_rows.get(pid)
+            if row is None:
+                new.append((pid, i))
+            elif (self._project_groups[row] != (countries[i], years[i])
+                  or not np.array_equal(self.project_scores[row], scores[i], equal_nan=True)):
+                replaced.append((row, i))
+                previous.append(row)
+        if previous:
+            self._apply(self.project_scores[previous], [self._project_groups[r][0] for r in previous],
+                        [self._project_groups[r][1] for r in previous], -1)
+        rows = anonymous + [i for _, i in replaced] + [i for _, i in new]
+        if rows:
+            self._apply(scores[rows], [countries[i] for i in rows], [years[i] for i in rows], 1)
+
+        for row, i in replaced:
+            self.project_scores[row] = scores[i]
+            self._project_groups[row] = (countries[i], years[i])
+        if new:
+            for pid, i in new:
+                self._project_rows[pid] = len(self._project_groups)
+                self._project_groups.append((countries[i], years[i]))
+            self.project_scores = np.concatenate([self.project_scores, scores[[i for _, i in new]]])
+        return {"added": len(anonymous) + len(new), "replaced": len(replaced),
+                "unchanged": len(latest) - len(new) - len(replaced)}
+
+    def _apply(self, scores, countries, years, sign):
+        """Add (sign=1) or subtract (sign=-1) the contribution of scored rows."""
+        present = ~np.isnan(scores)
+        values = np.where(present, scores, 0.0)
+        n_bins = len(self.bin_edges) - 1
+        bins = np.clip(np.searchsorted(self.bin_edges, values, side='right') - 1, 0, n_bins - 1)
+        dim_idx = np.broadcast_to(np.arange(len(self.dimensions)), bins.shape)
+        for level in LEVELS:
+            keys = [group_key(level, c, y) for c, y in zip(countries, years)]
+            selected = np.array([k is not None for k in keys], dtype=bool)
+            if not selected.any():
+                continue
+            rows = self._rows(level, [k for k in keys if k is not None])
+            p = present[selected]
+            np.add.at(self.projects, rows, sign)
+            np.add.at(self.counts, rows, sign * p.astype(np.int64))
+            np.add.at(self.sums, rows, sign * values[selected])
+            np.add.at(self.sumsqs, rows, sign * values[selected] ** 2)
+            # only present values count towards the histograms
+            r, d = np.nonzero(p)
+            np.add.at(self.histograms, (rows[r], dim_idx[selected][r, d], bins[selected][r, d]), sign)
+        if sign < 0:
+            # drop the rounding residue of subtracted sums once a group / dimension is empty
+            empty = self.counts == 0
+            self.sums[empty] = 0.0
+            self.sumsqs[empty] = 0.0
+
+    def groups(self, level):
+        """Keys of the `level` groups that currently have projects."""
+        return [key for key, row in self._groups[level].items() if self.projects[row] > 0]
+
+    def summary(self, level, key):
+        """count, mean, std and histogram per dimension for one group, or None."""
+        row = self._groups[level].get(key)
+        if row is None or self.projects[row] <= 0:
+            return None
+        counts = self.counts[row]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums[row] / counts
+            stds = np.sqrt(np.maximum(self.sumsqs[row] / counts - means ** 2, 0.0))
+        dims = {}
+        for i, name in enumerate(self.dimensions):
+            if counts[i]:
+                dims[name] = {
+                    "count": int(counts[i]),
+                    "mean": round(float(means[i]), 4),
+                    "std": round(float(stds[i]), 4),
+                    "histogram": self.histograms[row, i].tolist(),
+                }
+        return {"count": int(self.projects[row]), "dimensions": dims}
+
+    def lookup(self, level, country=None, year=None):
+        """summary() of the `level` group of `country` and `year`, or None."""
+        key = group_key(level, country, year)
+        return None if key is None else self.summary(level, key)
+
+    def save(self, path):
+        """Write the store to `path` (.npz) atomically."""
+        tmp = path + '.tmp.npz'
+        np.savez_compressed(
+            tmp,
+            dimensions=np.array(self.dimensions),
+            bin_edges=self.bin_edges,
+            levels=np.array([level for level, _ in self._keys], dtype=str),
+            keys=np.array([key for _, key in self._keys], dtype=str),
+            projects=self.projects, counts=self.counts, sums=self.sums, sumsqs=self.sumsqs, histograms=self.histograms,
+            project_ids=np.array(list(self._project_rows), dtype=str),
+            # '' stands for an unknown country / year
+            project_countries=np.array([c or '' for c, _ in self._project_groups], dtype=str),
+            project_years=np.array([y or '' for _, y in self._project_groups], dtype=str),
+            project_scores=self.project_scores,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            edges = data['bin_edges']
+            store = cls(data['dimensions'].tolist(), len(edges) - 1, (edges[0], edges[-1]))
+            store.bin_edges = edges
+            store._keys = list(zip(data['levels'].tolist(), data['keys'].tolist()))
+            for row, (level, key) in enumerate(store._keys):
+                store._groups[level][key] = row
+            store.projects = data['projects']
+            store.counts, store.sums, store.sumsqs = data['counts'], data['sums'], data['sumsqs']
+            store.histograms = data['histograms']
+            if 'project_ids' in data.files:  # stores written before per-project tracking have none
+                store._project_rows = {pid: row for row, pid in enumerate(data['project_ids'].tolist())}
+                store._project_groups = [(c or None, y or None) for c, y in
+                                         zip(data['project_countries'].tolist(), data['project_years'].tolist())]
+                store.project_scores = data['project_scores']
+        return store
+
+    @classmethod
+    def open(cls, path):
+        """Load `path` if it exists, else return an empty store."""
+        return cls.load(path) if os.path.exists(path) else cls()
+
+
+def scores_from_frame(df, dimensions=DIMENSIONS):
+    """(n, len(dimensions)) score matrix from the columns of a scored DataFrame (NaN where absent)."""
+    out = np.full((len(df), len(dimensions)), np.nan)
+    for i, name in enumerate(dimensions):
+        if name in df.columns:
+            out[:, i] = df[name].to_numpy(dtype=float)
+    return out
+
+
+def update_from_frame(store, df):
+    """Add the rows of a scored projects DataFrame to `store`, per ProjectID if the frame has one."""
+    import pandas as pd
+
+    countries = [str(c) if pd.notna(c) else None for c in df['Country']] if 'Country' in df.columns else None
+    ids = [str(p) if pd.notna(p) else None for p in df['ProjectID']] if 'ProjectID' in df.columns else None
+    return store.update(scores_from_frame(df, store.dimensions), countries, project_years(df), ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Roll up a scored projects CSV into country/year summaries')
+    parser.add_argument('input', help='CSV or Parquet with Country, E, S, G and optionally SDG1..SDG17 / Year columns')
+    parser.add_argument('-o', '--output', default=os.path.join('data', 'aggregates.npz'))
+    parser.add_argument('--append', action='store_true', help='update an existing store (per ProjectID) instead of replacing it')
+    args = parser.parse_args(argv)
+
+    store = RollupStore.open(args.output) if args.append else RollupStore()
+    columns = ['ProjectID', 'Country', *YEAR_COLUMNS, *DATE_COLUMNS, *store.dimensions]
+    changes = update_from_frame(store, storage.read_corpus(args.input, columns))
+    store.save(args.output)
+    print(f"Rolled up {args.input} into {args.output}: "
+          + ', '.join(f"{len(store.groups(level))} {level} groups" for level in LEVELS)
+          + f" ({changes['added']} added, {changes['replaced']} replaced, {changes['unchanged']} unchanged)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
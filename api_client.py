@@ -0,0 +1,71 @@
+"""Minimal client for the scoring API, speaking MessagePack by default.
+
+    import api_client
+    client = api_client.ScoringClient('https://your-app-name.onrender.com')
+    result = client.predict_batch(descriptions, format='compact')
+    result['model_scores']   # numpy array (n, 3)
+    result['sdgs']           # numpy array (n, 17)
+
+Requests and responses use `application/msgpack` (see serialization.py for
+the packed array format), so compact score matrices arrive as numpy arrays
+without a per-float text round trip. `use_msgpack=False` sends and accepts
+JSON instead. Error responses raise `ScoringError`, with the server's
+message if it sent one.
+"""
+import json
+
+import serialization
+
+
+class ScoringError(Exception):
+    """Non-2xx response from the scoring API."""
+
+    def __init__(self, status, body):
+        message = body.get('message') or body.get('error') if isinstance(body, dict) else body
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.body = body
+
+
+class ScoringClient:
+    """POST descriptions to /predict and /predict/batch of one API base URL."""
+
+    def __init__(self, base_url, use_msgpack=True, timeout=120, session=None):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.use_msgpack = use_msgpack and serialization.msgpack is not None
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def _post(self, path, payload):
+        if self.use_msgpack:
+            data = serialization.packb(payload)
+            mimetype = serialization.MSGPACK_MIMETYPE
+        else:
+            data = serialization.dumps(payload)
+            mimetype = serialization.JSON_MIMETYPE
+        response = self.session.post(f"{self.base_url}{path}", data=data, timeout=self.timeout,
+                                     headers={'Content-Type': mimetype, 'Accept': mimetype})
+        body = decode(response.headers.get('Content-Type', ''), response.content)
+        if response.status_code >= 400:
+            raise ScoringError(response.status_code, body)
+        return body
+
+    def predict(self, description, **options):
+        """Score one description; `options` are /predict fields such as format='compact' or explain=True."""
+        return self._post('/predict', {'description': description, **options})
+
+    def predict_batch(self, descriptions, **options):
+        """Score a list of descriptions in one /predict/batch call."""
+        return self._post('/predict/batch', {'descriptions': list(descriptions), **options})
+
+
+def decode(content_type, content):
+    """Decode a response body by its Content-Type (MessagePack or JSON)."""
+    if serialization.is_msgpack(content_type.split(';')[0].strip()):
+        return serialization.unpackb(content)
+    try:
+        return json.loads(content)
+    except ValueError:
+        return content.decode('utf-8', 'replace')
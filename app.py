@@ -1,10 +1,34 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from werkzeug.exceptions import BadRequest
 import re
+import hashlib
+import json
 import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
 import numpy as np
 
 from typing import Optional
 
+import aggregates
+import explain
+import footprint
+import longdoc
+import profiling
+import serialization
+import similarity
+import storage
+import taxonomy
+import timing
+from admission import AdmissionController, Overloaded
+from batching import MicroBatcher
+from near_dup import NearDuplicateCache
+from singleflight import SingleFlight
+from serialization import json_response, negotiated_response
+
 # Optional S3 helper: if you prefer not to store model pickles in the repo,
 # set these env vars in Render and the app will attempt to download missing
 # model files from the S3 bucket on startup or first prediction request.
@@ -26,6 +50,107 @@ def fetch_from_s3(bucket: str, key: str, dest_path: str) -> bool:
     except Exception:
         return False
 
+# Long-document mode: descriptions longer than LONGDOC_THRESHOLD_CHARS (or
+# requests with "mode": "long") are scored in streaming chunks of
+# LONGDOC_CHUNK_CHARS. Requests above MAX_REQUEST_BYTES / MAX_DESCRIPTION_CHARS
+# are rejected with 413 before any scoring work is done.
+MAX_DESCRIPTION_CHARS = int(os.environ.get('MAX_DESCRIPTION_CHARS', 1_000_000))
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 4 * MAX_DESCRIPTION_CHARS))
+LONGDOC_THRESHOLD_CHARS = int(os.environ.get('LONGDOC_THRESHOLD_CHARS', 50_000))
+LONGDOC_CHUNK_CHARS = int(os.environ.get('LONGDOC_CHUNK_CHARS', 16_384))
+LONGDOC_SECTION_CHARS = int(os.environ.get('LONGDOC_SECTION_CHARS', 20_000))
+MAX_BATCH_ITEMS = int(os.environ.get('MAX_BATCH_ITEMS', 1000))
+# /predict/stream reads NDJSON lines incrementally and scores them STREAM_BATCH_SIZE at a time
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 64))
+# `explain: true` adds the top contributing n-grams per model output
+EXPLAIN_TOP_K = int(os.environ.get('EXPLAIN_TOP_K', 5))
+EXPLAIN_MAX_TOP_K = 50
+
+# Admission control (async serving mode, see gunicorn_async.conf.py): when
+# INFERENCE_WORKERS is set, scoring runs on a fixed-size executor with at most
+# INFERENCE_QUEUE_SIZE requests waiting; extra requests get a fast 429.
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 0))
+INFERENCE_QUEUE_SIZE = int(os.environ.get('INFERENCE_QUEUE_SIZE', 16))
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 30))
+ADMISSION = (AdmissionController(INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE, INFERENCE_TIMEOUT)
+             if INFERENCE_WORKERS > 0 else None)
+
+# Request coalescing: a /predict request identical to one this worker is
+# already scoring (same description, options and model version) waits for
+# that result instead of scoring again, for at most COALESCE_TIMEOUT seconds
+# before a 503. Set COALESCE_REQUESTS=0 to turn it off.
+COALESCE_REQUESTS = os.environ.get('COALESCE_REQUESTS', '1') == '1'
+COALESCE_TIMEOUT = float(os.environ.get('COALESCE_TIMEOUT', INFERENCE_TIMEOUT))
+SINGLEFLIGHT = SingleFlight(COALESCE_TIMEOUT) if COALESCE_REQUESTS else None
+
+# Opt-in micro-batching: concurrent single-description predictions arriving
+# within MICRO_BATCH_WINDOW_MS (up to MICRO_BATCH_MAX_SIZE) share one
+# vectorizer transform and one predict per head. Set MICRO_BATCHING=1. A
+# request whose batch has not finished within INFERENCE_TIMEOUT gets a 503.
+MICRO_BATCHING = os.environ.get('MICRO_BATCHING', '0') == '1'
+MICRO_BATCH_WINDOW_MS = float(os.environ.get('MICRO_BATCH_WINDOW_MS', 2))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get('MICRO_BATCH_MAX_SIZE', 64))
+
+# Server-Timing: with SERVER_TIMING=1 every response carries a per-stage
+# latency breakdown header; requests may also ask for a `timings` body field.
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '0') == '1'
+
+# On-demand profiling (GET /debug/profile) is off unless PROFILING_ENABLED=1;
+# set PROFILING_TOKEN to require a matching X-Profile-Token header.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'esg-profiles'))
+PROFILING_MAX_SECONDS = float(os.environ.get('PROFILING_MAX_SECONDS', 60))
+
+# Readiness: with PRELOAD_MODELS=1 every worker loads the models in a
+# background thread at startup and warms them up with synthetic descriptions
+# of WARMUP_LENGTHS words; GET /ready answers 503 until that has finished
+# (and starts the preload itself if it has not started yet). A failed preload
+# is retried on the next /ready after PRELOAD_RETRY_SECONDS, doubling per
+# failure up to PRELOAD_RETRY_MAX_SECONDS, or at once if a request has since
+# loaded the models.
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', '0') == '1'
+PRELOAD_RETRY_SECONDS = float(os.environ.get('PRELOAD_RETRY_SECONDS', 5))
+PRELOAD_RETRY_MAX_SECONDS = float(os.environ.get('PRELOAD_RETRY_MAX_SECONDS', 120))
+WARMUP_LENGTHS = tuple(int(n) for n in os.environ.get('WARMUP_LENGTHS', '8,64,512,4096').split(',') if n.strip())
+
+# Memory report in /models/status: process numbers are cached for
+# MEMORY_REPORT_TTL seconds, artifact numbers until the models change.
+# TRACEMALLOC_FRAMES > 0 starts tracemalloc so ?tracemalloc=N can list the
+# top allocation sites (tracing itself slows allocations; leave off normally).
+MEMORY_REPORT_TTL = float(os.environ.get('MEMORY_REPORT_TTL', 30))
+TRACEMALLOC_FRAMES = int(os.environ.get('TRACEMALLOC_FRAMES', 0))
+if TRACEMALLOC_FRAMES > 0:
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+# Near-duplicate cache: with NEAR_DUP_CACHE_SIZE > 0, requests that send
+# `near_duplicate: true` may reuse the model scores of a cached description
+# whose estimated Jaccard similarity (MinHash over word shingles) is at least
+# NEAR_DUP_THRESHOLD. Entries are dropped when the model files change.
+NEAR_DUP_CACHE_SIZE = int(os.environ.get('NEAR_DUP_CACHE_SIZE', 0))
+NEAR_DUP_THRESHOLD = float(os.environ.get('NEAR_DUP_THRESHOLD', 0.9))
+NEAR_DUP_CACHE = NearDuplicateCache(NEAR_DUP_CACHE_SIZE, NEAR_DUP_THRESHOLD) if NEAR_DUP_CACHE_SIZE > 0 else None
+
+# /similar: nearest projects in SIMILARITY_CORPUS (CSV or Parquet with
+# ProjectID, Country, Description) by TF-IDF cosine. The index is built on first use;
+# SIMILARITY_MODE is 'exact', 'approx' (IVF over an SVD embedding) or 'auto'
+# (approximate from SIMILARITY_APPROX_MIN_DOCS documents, scanning
+# SIMILARITY_N_PROBE clusters per query). Neighbours with a similarity at or
+# below SIMILARITY_MIN_SCORE are dropped, so a query that shares no terms with
+# the corpus gets no results rather than k arbitrary ones.
+SIMILARITY_CORPUS = os.environ.get('SIMILARITY_CORPUS',
+                                   os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'projects.csv'))
+SIMILARITY_MODE = os.environ.get('SIMILARITY_MODE', 'auto')
+SIMILARITY_APPROX_MIN_DOCS = int(os.environ.get('SIMILARITY_APPROX_MIN_DOCS', 1_000_000))
+SIMILARITY_N_PROBE = int(os.environ.get('SIMILARITY_N_PROBE', 32))
+SIMILARITY_MIN_SCORE = float(os.environ.get('SIMILARITY_MIN_SCORE', 0.0))
+SIMILARITY_MAX_K = 100
+
+# /aggregates serves the country/year rollups written by aggregates.py or
+# `bulk_score.py --aggregates`; the file is reloaded when it changes.
+AGGREGATES_PATH = os.environ.get('AGGREGATES_PATH',
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'aggregates.npz'))
+
 app = Flask(__name__)
 
 # Attempt to locate models in common paths
@@ -43,6 +168,11 @@ SDG_MODEL = None
 # Flag to track if we've attempted to load SDG model
 SDG_LOAD_ATTEMPTED = False
 
+# Path each artifact was actually loaded from ('vectorizer', 'esg_model', 'sdg_model')
+LOADED_FILES = {}
+# Serializes loading, so requests arriving during the background preload wait for it instead of loading again
+_LOAD_LOCK = threading.RLock()
+
 def try_load_models():
     global VECTORIZER, ESG_MODEL, SDG_MODEL, SDG_LOAD_ATTEMPTED
     for base in MODEL_PATHS:
@@ -75,6 +205,7 @@ def try_load_models():
                     print(f"Warning: Vectorizer at {vfile} is not fitted")
                     VECTORIZER = None
                 else:
+                    LOADED_FILES['vectorizer'] = vfile
                     print(f"Vectorizer loaded successfully")
             except Exception as e:
                 print(f"Error loading vectorizer from {vfile}: {str(e)}")
@@ -87,6 +218,7 @@ def try_load_models():
             try:
                 print(f"Loading ESG model from {efile}")
                 ESG_MODEL = joblib.load(efile)
+                LOADED_FILES['esg_model'] = efile
                 print(f"ESG model loaded successfully")
             except Exception as e:
                 print(f"Error loading ESG model from {efile}: {str(e)}")
@@ -105,6 +237,7 @@ def try_load_models():
                     print(f"✅ SDG model loaded successfully, type: {type(SDG_MODEL)}")
                     # Verify it's a valid model with predict method
                     if hasattr(SDG_MODEL, 'predict'):
+                        LOADED_FILES['sdg_model'] = sfile
                         print(f"✅ SDG model has predict method - ready to use")
                     else:
                         print(f"⚠️ WARNING: SDG model doesn't have predict method!")
@@ -121,166 +254,739 @@ def try_load_models():
 
 # Do not eagerly load heavy models at import time; load lazily on first predict call
 
+
+def model_version():
+    """Short fingerprint of the loaded artifact files (path, size, mtime); '' if none are loaded."""
+    parts = []
+    for name, path in sorted(LOADED_FILES.items()):
+        try:
+            st = os.stat(path)
+            parts.append(f"{name}={path}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{name}={path}")
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:12] if parts else ''
+
+def score_keyword_matches(found, tax=None):
+    """Turn a set of found taxonomy phrases into (scores, details)."""
+    return (tax or taxonomy.current()).esg_scores(found)
+
+
 def calculate_esg_scores(text):
     """Calculate ESG scores based on keyword presence and context"""
-    text = text.lower()
-    
-    # Enhanced keywords with weights
-    keywords = {
-        'Environmental': {
-            'high_impact': ['renewable energy', 'carbon reduction', 'climate action', 'environmental protection'],
-            'medium_impact': ['solar', 'wind', 'water conservation', 'recycling', 'biodiversity'],
-            'low_impact': ['green', 'sustainable', 'eco-friendly', 'natural resources']
-        },
-        'Social': {
-            'high_impact': ['community development', 'poverty reduction', 'healthcare access', 'education equality'],
-            'medium_impact': ['job creation', 'skill training', 'social welfare', 'gender equality'],
-            'low_impact': ['community', 'training', 'social', 'welfare']
-        },
-        'Governance': {
-            'high_impact': ['transparency initiative', 'anti-corruption', 'accountability framework'],
-            'medium_impact': ['governance policy', 'compliance program', 'stakeholder engagement'],
-            'low_impact': ['reporting', 'monitoring', 'policy', 'regulation']
-        }
-    }
-    
-    scores = {}
-    details = {}
-    
-    for category, impact_levels in keywords.items():
-        score = 0
-        matched_terms = []
-        
-        # Check high impact terms (weight: 0.5)
-        for term in impact_levels['high_impact']:
-            if term in text:
-                score += 0.5
-                matched_terms.append(f"{term} (high impact)")
-        
-        # Check medium impact terms (weight: 0.3)
-        for term in impact_levels['medium_impact']:
-            if term in text:
-                score += 0.3
-                matched_terms.append(f"{term} (medium impact)")
-        
-        # Check low impact terms (weight: 0.2)
-        for term in impact_levels['low_impact']:
-            if term in text:
-                score += 0.2
-                matched_terms.append(f"{term} (low impact)")
-        
-        # Normalize score to 0-1 range and round to 2 decimal places
-        scores[category] = round(min(1.0, score), 2)
-        details[category] = matched_terms
-    
-    return scores, details
+    tax = taxonomy.current()
+    return tax.esg_scores(tax.scan(text, 'esg'))
 
 
-def predict_with_models(text):
-    """If trained models are available, produce ESG and SDG predictions.
-    Returns a tuple (esg_scores_dict, sdg_scores_dict) or (None, None) if models missing.
+def calculate_esg_scores_chunked(chunks):
+    """Streaming variant of calculate_esg_scores for long documents."""
+    tax = taxonomy.current()
+    return tax.esg_scores(longdoc.match_terms(chunks, tax.terms('esg')))
+
+
+# Output column order of the model heads and the keyword scorer; compact
+# responses send scores as arrays in this order with a header.
+KEYWORD_CATEGORIES = ('Environmental', 'Social', 'Governance')
+ESG_OUTPUTS = ('Environment', 'Social', 'Governance')
+SDG_OUTPUTS = tuple(f'SDG{i}' for i in range(1, 18))
+
+
+def predict_from_matrix(vec):
+    """Run the loaded ESG and SDG heads over an already vectorized matrix.
+    Returns (esg_matrix, sdg_matrix) with one row per input; either is None if
+    that model is unavailable or failed.
     """
+    n_rows = vec.shape[0]
+    try:
+        with timing.stage('esg'):
+            esg_arr = np.asarray(ESG_MODEL.predict(vec), dtype=float).reshape(n_rows, -1)
+    except Exception as esg_error:
+        print(f"Error predicting ESG scores: {str(esg_error)}")
+        esg_arr = None
+
+    sdg_arr = None
+    if SDG_MODEL is not None:
+        try:
+            with timing.stage('sdg'):
+                sdg_arr = np.asarray(SDG_MODEL.predict(vec), dtype=float).reshape(n_rows, -1)
+        except Exception as sdg_error:
+            print(f"Error predicting SDG scores: {str(sdg_error)}")
+            import traceback
+            traceback.print_exc()
+            sdg_arr = None
+
+    return esg_arr, sdg_arr
+
+
+def ensure_models_loaded():
+    """Lazy-load models if needed; return True when the vectorizer and ESG model are usable."""
     # Lazy-load models (may be heavy); do not do this at import time
-    if VECTORIZER is None or ESG_MODEL is None:
-        try_load_models()
-    
-    # Also try to load SDG model if it's not loaded yet
-    if SDG_MODEL is None:
-        try_load_models()
+    if VECTORIZER is None or ESG_MODEL is None or SDG_MODEL is None:
+        with timing.stage('load', 'lazy'), _LOAD_LOCK:
+            if VECTORIZER is None or ESG_MODEL is None:
+                try_load_models()
+
+            # Also try to load SDG model if it's not loaded yet
+            if SDG_MODEL is None:
+                try_load_models()
+    else:
+        timing.record('models', desc='cached')
 
     if VECTORIZER is None or ESG_MODEL is None:
-        return None, None
-    
+        return False
+
     # Verify vectorizer is fitted before using
     if not hasattr(VECTORIZER, 'idf_') or VECTORIZER.idf_ is None:
         print("Warning: Vectorizer is not fitted")
-        return None, None
+        return False
+    return True
+
+
+def vectorize_texts(texts):
+    """Transform `texts` in one call; None if models are missing or the transform fails."""
+    if not ensure_models_loaded():
+        return None
 
     try:
-        vec = VECTORIZER.transform([text])
+        with timing.stage('vec'):
+            return VECTORIZER.transform(texts)
     except Exception as e:
         print(f"Error transforming text with vectorizer: {str(e)}")
+        return None
+
+
+def predict_model_arrays(texts):
+    """Vectorize `texts` in one transform and predict every head over the matrix.
+    Returns (esg_matrix, sdg_matrix) as float arrays of shape (n, 3) and (n, 17),
+    or (None, None) if models are missing.
+    """
+    vec = vectorize_texts(texts)
+    if vec is None:
         return None, None
+    return predict_from_matrix(vec)
 
-    try:
-        esg_pred = ESG_MODEL.predict(vec)
-        # ensure shape (n_outputs,)
-        esg_arr = np.asarray(esg_pred).reshape(-1)
-        esg_dict = {
-            'Environment': float(round(esg_arr[0], 2)),
-            'Social': float(round(esg_arr[1], 2)),
-            'Governance': float(round(esg_arr[2], 2))
+
+_EXPLAINERS = {'models': None, 'feature_names': None, 'esg': None, 'sdg': None}
+_EXPLAINERS_LOCK = threading.Lock()
+
+
+def model_explainers():
+    """Explainers for the loaded heads plus the vectorizer's feature names.
+    Built once per set of loaded models; the cache holds the model objects
+    themselves, so a reload is detected by identity.
+    """
+    models = (VECTORIZER, ESG_MODEL, SDG_MODEL)
+    with _EXPLAINERS_LOCK:
+        cached = _EXPLAINERS['models']
+        if cached is None or any(a is not b for a, b in zip(cached, models)):
+            _EXPLAINERS['feature_names'] = VECTORIZER.get_feature_names_out()
+            for key, model in (('esg', ESG_MODEL), ('sdg', SDG_MODEL)):
+                try:
+                    _EXPLAINERS[key] = explain.LinearExplainer(model) if model is not None else None
+                except ValueError as e:
+                    print(f"Explanations unavailable for the {key} model: {str(e)}")
+                    _EXPLAINERS[key] = None
+            _EXPLAINERS['models'] = models
+        return dict(_EXPLAINERS)
+
+
+def explain_matrix(vec, top_k):
+    """Top `top_k` contributing terms of every row of `vec` for each head.
+    Works on the matrix the predictions were made from, so no second transform.
+    """
+    with timing.stage('explain'):
+        explainers = model_explainers()
+        return {
+            'feature_names': explainers['feature_names'],
+            'esg': explainers['esg'].top_terms(vec, top_k) if explainers['esg'] is not None else None,
+            'sdg': explainers['sdg'].top_terms(vec, top_k) if explainers['sdg'] is not None else None,
         }
-    except Exception:
-        esg_dict = None
 
-    sdg_dict = None
-    print(f"Checking SDG_MODEL: {SDG_MODEL is not None}")
-    if SDG_MODEL is not None:
-        try:
-            print(f"Attempting SDG prediction with model type: {type(SDG_MODEL)}")
-            sdg_pred = SDG_MODEL.predict(vec)
-            print(f"SDG prediction raw result shape: {np.asarray(sdg_pred).shape if hasattr(np, 'asarray') else 'unknown'}")
-            sdg_arr = np.asarray(sdg_pred).reshape(-1)
-            print(f"SDG prediction array shape after reshape: {sdg_arr.shape}, length: {len(sdg_arr)}")
-            sdg_dict = {f'SDG{i+1}': float(round(v, 2)) for i, v in enumerate(sdg_arr)}
-            print(f"SDG predictions successful: {len(sdg_dict)} SDGs - {list(sdg_dict.keys())[:5]}...")
-        except Exception as sdg_error:
-            print(f"Error predicting SDG scores: {str(sdg_error)}")
-            import traceback
-            traceback.print_exc()
-            sdg_dict = None
+
+def predict_explained_arrays(texts, top_k):
+    """Like predict_model_arrays, plus `explain_matrix` output from the same transform."""
+    vec = vectorize_texts(texts)
+    if vec is None:
+        return None, None, None
+    esg_arr, sdg_arr = predict_from_matrix(vec)
+    return esg_arr, sdg_arr, explain_matrix(vec, top_k)
+
+
+def explanation_output(explanations, i, compact, sdg_goals=None):
+    """Format row `i` of `explain_matrix` output, keyed like the score fields it explains.
+    `sdg_goals` (0-based, in response order) limits SDG explanations to the selected goals.
+    """
+    if explanations is None:
+        return None
+    names = explanations['feature_names']
+    output = {"model_scores": None, "sdgs": None}
+    if explanations['esg'] is not None:
+        features, contributions = explanations['esg'][0][i], explanations['esg'][1][i]
+        terms = explain.format_terms(names, features, contributions, compact)
+        output["model_scores"] = terms if compact else dict(zip(ESG_OUTPUTS, terms))
+    if explanations['sdg'] is not None:
+        features, contributions = explanations['sdg'][0][i], explanations['sdg'][1][i]
+        goals = np.arange(len(features)) if sdg_goals is None else np.asarray(sdg_goals, dtype=int)
+        terms = explain.format_terms(names, features[goals], contributions[goals], compact)
+        output["sdgs"] = terms if compact else dict(zip((SDG_OUTPUTS[g] for g in goals), terms))
+    return output
+
+
+def score_long_document(description, with_sections=False, explain_top_k=None):
+    """Score a long description chunk by chunk with bounded working memory.
+    Keyword phrases and vocabulary counts are accumulated over whitespace-aligned
+    chunks and the heads run once on the accumulated TF-IDF rows. With
+    `with_sections`, the text is also split into paragraph-aligned sections that
+    get their own rows plus a length-weighted aggregate.
+    Returns a dict with `scores`, `details`, `esg_row`, `sdg_row`, with
+    `explain_top_k` also `explanations` for the document row and, for
+    sections, `spans`, `section_scores`, `section_esg`, `section_sdg`.
+    """
+    from scipy.sparse import vstack
+
+    models_ok = ensure_models_loaded()
+    tax = taxonomy.current()
+    spans = longdoc.split_sections(description, LONGDOC_SECTION_CHARS) if with_sections else [(0, len(description))]
+    doc_counter = longdoc.TermCounter(VECTORIZER) if models_ok else None
+    section_scores = []
+    section_rows = []
+
+    # phrases are matched once over the whole document, so one cut by a section
+    # boundary still counts; each match is attributed to the section it ends in
+    matcher = longdoc.PhraseMatcher(tax.terms('esg'))
+    for start, end in spans:
+        counter = longdoc.TermCounter(VECTORIZER) if models_ok and with_sections else None
+        section_found = set()
+        for chunk in longdoc.iter_chunks(description, LONGDOC_CHUNK_CHARS, start, end):
+            section_found |= matcher.feed(chunk)
+            if doc_counter is not None:
+                doc_counter.feed(chunk)
+            if counter is not None:
+                counter.feed(chunk)
+        if with_sections:
+            scores, _ = score_keyword_matches(section_found, tax)
+            section_scores.append([scores[c] for c in KEYWORD_CATEGORIES])
+        if counter is not None:
+            section_rows.append(counter.to_matrix())
+
+    scores, details = score_keyword_matches(matcher.found, tax)
+    result = {'scores': scores, 'details': details, 'esg_row': None, 'sdg_row': None}
+    esg_arr = sdg_arr = None
+    if doc_counter is not None:
+        matrix = vstack([doc_counter.to_matrix()] + section_rows).tocsr()
+        esg_arr, sdg_arr = predict_from_matrix(matrix)
+        result['esg_row'] = esg_arr[0] if esg_arr is not None else None
+        result['sdg_row'] = sdg_arr[0] if sdg_arr is not None else None
+        if explain_top_k:
+            result['explanations'] = explain_matrix(matrix[0], explain_top_k)
+
+    if with_sections:
+        result['spans'] = spans
+        result['section_scores'] = np.asarray(section_scores, dtype=float)
+        result['section_esg'] = esg_arr[1:] if esg_arr is not None else None
+        result['section_sdg'] = sdg_arr[1:] if sdg_arr is not None else None
+    return result
+
+
+def long_document_sections(result, compact=False):
+    """Format per-section rows and their length-weighted aggregate for a response."""
+    weights = np.array([end - start for start, end in result['spans']], dtype=float)
+    aggregate = {
+        key: np.round(np.average(result[key], axis=0, weights=weights), 2) if result[key] is not None else None
+        for key in ('section_scores', 'section_esg', 'section_sdg')
+    }
+    if compact:
+        rounded = {key: np.round(result[key], 2) if result[key] is not None else None
+                   for key in ('section_scores', 'section_esg', 'section_sdg')}
+        return {
+            "spans": result['spans'],
+            "scores": rounded['section_scores'],
+            "model_scores": rounded['section_esg'],
+            "sdgs": rounded['section_sdg'],
+        }, {
+            "scores": aggregate['section_scores'],
+            "model_scores": aggregate['section_esg'],
+            "sdgs": aggregate['section_sdg'],
+        }
+
+    sections = []
+    for i, (start, end) in enumerate(result['spans']):
+        sections.append({
+            "start": start,
+            "end": end,
+            "scores": dict(zip(KEYWORD_CATEGORIES, np.round(result['section_scores'][i], 2).tolist())),
+            "model_scores": esg_row_to_dict(result['section_esg'][i]) if result['section_esg'] is not None else None,
+            "sdgs": sdg_row_to_dict(result['section_sdg'][i]) if result['section_sdg'] is not None else None,
+        })
+    return sections, {
+        "scores": dict(zip(KEYWORD_CATEGORIES, aggregate['section_scores'].tolist())),
+        "model_scores": esg_row_to_dict(aggregate['section_esg']),
+        "sdgs": sdg_row_to_dict(aggregate['section_sdg']),
+    }
+
+
+def esg_row_to_dict(esg_row):
+    """Map one ESG model output row to the named, 2-decimal dict used in responses."""
+    if esg_row is None or len(esg_row) < len(ESG_OUTPUTS):
+        return None
+    return dict(zip(ESG_OUTPUTS, np.round(esg_row, 2).tolist()))
+
+
+def sdg_row_to_dict(sdg_row):
+    """Map one SDG model output row to the `SDG1..SDG17` dict used in responses."""
+    if sdg_row is None:
+        return None
+    return {f'SDG{i+1}': v for i, v in enumerate(np.round(sdg_row, 2).tolist())}
+
+
+BATCHER = (MicroBatcher(predict_model_arrays, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WINDOW_MS / 1000, INFERENCE_TIMEOUT)
+           if MICRO_BATCHING else None)
+
+
+def predict_model_rows(text):
+    """Model output rows (esg_row, sdg_row) for one text; either may be None.
+    Goes through the micro-batcher when it is enabled (Overloaded 503 after INFERENCE_TIMEOUT).
+    """
+    if BATCHER is not None:
+        # vectorize/predict run on the batcher thread; time the whole wait
+        with timing.stage('batch'):
+            return BATCHER.predict(text)
+    esg_arr, sdg_arr = predict_model_arrays([text])
+    return (esg_arr[0] if esg_arr is not None else None,
+            sdg_arr[0] if sdg_arr is not None else None)
+
+
+def parse_sdg_options(data):
+    """Validate the `sdg_top_k` / `sdg_min_score` request options.
+    Returns (top_k, min_score), each None when not requested; raises ValueError.
+    """
+    top_k = data.get('sdg_top_k')
+    min_score = data.get('sdg_min_score')
+    if top_k is not None:
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            raise ValueError("sdg_top_k must be a positive integer")
+    if min_score is not None:
+        if isinstance(min_score, bool) or not isinstance(min_score, (int, float)):
+            raise ValueError("sdg_min_score must be a number")
+        min_score = float(min_score)
+    return top_k, min_score
+
+
+def parse_explain_options(data):
+    """Validate `explain` / `explain_top_k`; returns the number of terms per output, or None."""
+    if not data.get('explain'):
+        return None
+    top_k = data.get('explain_top_k', EXPLAIN_TOP_K)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or not 1 <= top_k <= EXPLAIN_MAX_TOP_K:
+        raise ValueError(f"explain_top_k must be an integer between 1 and {EXPLAIN_MAX_TOP_K}")
+    return top_k
+
+
+def select_sdgs(sdg_matrix, top_k=None, min_score=None):
+    """Pick the strongest goals of every row without building per-goal dicts.
+    Uses one argpartition over the whole matrix for top-k and a vectorized
+    mask for the threshold. Returns (goals, scores): per-row arrays of 0-based
+    goal indices and their scores, strongest first.
+    """
+    n_rows, n_goals = sdg_matrix.shape
+    if top_k is not None and top_k < n_goals:
+        idx = np.argpartition(-sdg_matrix, top_k - 1, axis=1)[:, :top_k]
     else:
-        print("SDG_MODEL is None - attempting to reload models")
-        # Try one more time to load SDG model
-        try_load_models()
-        if SDG_MODEL is not None:
-            try:
-                print(f"SDG model now loaded, attempting prediction")
-                sdg_pred = SDG_MODEL.predict(vec)
-                sdg_arr = np.asarray(sdg_pred).reshape(-1)
-                sdg_dict = {f'SDG{i+1}': float(round(v, 2)) for i, v in enumerate(sdg_arr)}
-                print(f"SDG predictions successful after reload: {len(sdg_dict)} SDGs")
-            except Exception as sdg_error:
-                print(f"Error predicting SDG scores after reload: {str(sdg_error)}")
-                import traceback
-                traceback.print_exc()
-                sdg_dict = None
+        idx = np.broadcast_to(np.arange(n_goals), (n_rows, n_goals))
+    vals = np.take_along_axis(sdg_matrix, idx, axis=1)
+    order = np.argsort(-vals, axis=1, kind='stable')
+    idx = np.take_along_axis(idx, order, axis=1)
+    vals = np.take_along_axis(vals, order, axis=1)
+    if min_score is None:
+        return list(idx), list(vals)
+    keep = vals >= min_score
+    counts = keep.sum(axis=1)
+    return [idx[i, :counts[i]] for i in range(n_rows)], [vals[i, :counts[i]] for i in range(n_rows)]
+
+
+def sdg_selection_output(goals, scores, compact):
+    """Format one row's selected goals: a `SDGn -> score` dict, or goal/score arrays when compact."""
+    scores = np.round(scores, 2)
+    if compact:
+        return {"goals": goals + 1, "scores": scores}
+    return {f'SDG{g+1}': s for g, s in zip(goals.tolist(), scores.tolist())}
+
+
+def selected_goals(sdg_row, sdg_options):
+    """0-based goals `sdg_output` returns for this row, or None when all are returned."""
+    if sdg_row is None or sdg_options == (None, None):
+        return None
+    return select_sdgs(sdg_row[np.newaxis, :], *sdg_options)[0][0]
+
+
+def sdg_output(sdg_row, sdg_options, compact):
+    """SDG part of a response for one row: the full vector, or only the selected goals."""
+    if sdg_row is None:
+        return None
+    top_k, min_score = sdg_options
+    if top_k is None and min_score is None:
+        return np.round(sdg_row, 2) if compact else sdg_row_to_dict(sdg_row)
+    goals, scores = select_sdgs(sdg_row[np.newaxis, :], top_k, min_score)
+    return sdg_selection_output(goals[0], scores[0], compact)
+
+
+def predict_model_rows_cached(text):
+    """predict_model_rows through the near-duplicate cache.
+    Returns (esg_row, sdg_row, similarity); similarity is None on a miss.
+    """
+    # load first, so the version is known and a lazy load is not counted as compute saved
+    ensure_models_loaded()
+    with timing.stage('neardup'):
+        sig = NEAR_DUP_CACHE.signature(text)
+        hit = NEAR_DUP_CACHE.get(sig, model_version())
+    if hit is not None:
+        (esg_row, sdg_row), sim = hit
+        return esg_row, sdg_row, sim
+    started = time.perf_counter()
+    esg_row, sdg_row = predict_model_rows(text)
+    if esg_row is not None:
+        NEAR_DUP_CACHE.put(sig, (esg_row, sdg_row), model_version(), time.perf_counter() - started)
+    return esg_row, sdg_row, None
+
+
+def predict_with_models(text):
+    """If trained models are available, produce ESG and SDG predictions.
+    Returns a tuple (esg_scores_dict, sdg_scores_dict) or (None, None) if models missing.
+    """
+    esg_row, sdg_row = predict_model_rows(text)
+    return esg_row_to_dict(esg_row), sdg_row_to_dict(sdg_row)
+
+
+def request_payload():
+    """The request body, parsed as MessagePack (Content-Type application/msgpack) or JSON.
+    Raises ValueError for a body that does not parse.
+    """
+    if serialization.is_msgpack(request.mimetype):
+        return serialization.unpackb(request.get_data())
+    try:
+        return request.get_json(force=True)
+    except BadRequest:
+        raise ValueError("Invalid JSON body") from None
+
+
+def response_format(data):
+    """Return the requested response shape: 'compact' or 'full' (default).
+    Accepts either a `format` body field or a `?format=` query parameter.
+    """
+    fmt = request.args.get('format') or (data.get('format') if isinstance(data, dict) else None)
+    return 'compact' if fmt == 'compact' else 'full'
+
+
+def build_full_response(description, scores, overall_score, details, model_esg, model_sdgs, sdg_selected=False):
+    """Assemble the default (verbose) `/predict` response body.
+    With `sdg_selected`, `model_sdgs` holds only the goals picked by
+    sdg_top_k / sdg_min_score, so an empty dict is a valid result.
+    """
+    # Prepare response - always include sdgs field even if None
+    response = {
+        "input": {"description": description},
+        "scores": scores,
+        "overall_score": overall_score,
+        "details": details,
+        "model_scores": model_esg,
+        "sdgs": model_sdgs if model_sdgs is not None else {},
+        "interpretation": {
+            "scale": "Scores range from 0 to 1, where 1 indicates strongest alignment",
+            "score_levels": {"high": "0.7 - 1.0", "medium": "0.4 - 0.69", "low": "0 - 0.39"}
+        }
+    }
+
+    # Add notes if model predictions are unavailable
+    if model_esg is None:
+        response["note"] = "Model-based ESG predictions are currently unavailable. Showing keyword-based scores only."
+
+    if model_sdgs is None or (not sdg_selected and isinstance(model_sdgs, dict) and len(model_sdgs) == 0):
+        response["sdg_note"] = "SDG model predictions are currently unavailable. The SDG model may not be loaded or may have encountered an error."
+
+    return response
+
+
+def build_compact_response(scores, overall_score, esg_row, sdg_row, sdg_options=(None, None)):
+    """Assemble the compact `/predict` response body.
+    No echoed input, no static text and no matched-term details; scores are
+    fixed-order arrays described once by `header`. Model rows are numpy arrays
+    rounded in a single vectorized call and written by the serializer as-is.
+    With SDG selection, `sdgs` is {"goals": [1-based goal numbers], "scores": [...]}.
+    """
+    return {
+        "header": {
+            "scores": KEYWORD_CATEGORIES,
+            "model_scores": ESG_OUTPUTS,
+            "sdgs": SDG_OUTPUTS[:len(sdg_row)] if sdg_row is not None else (),
+        },
+        "scores": [scores[c] for c in KEYWORD_CATEGORIES],
+        "overall_score": overall_score,
+        "model_scores": np.round(esg_row, 2) if esg_row is not None else None,
+        "sdgs": sdg_output(sdg_row, sdg_options, compact=True),
+    }
+
+@app.before_request
+def start_request_timer():
+    if SERVER_TIMING:
+        timing.start()
+
+
+@app.after_request
+def add_server_timing(response):
+    timer = timing.finish()
+    if timer is not None:
+        response.headers['Server-Timing'] = timer.header()
+    return response
 
-    return esg_dict, sdg_dict
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness; see /ready for whether this worker can score)"""
     return jsonify({
         "status": "healthy",
         "message": "ESG Score Predictor API is running",
-        "version": "2.0"
+        "version": "2.0",
+        "ready": _READINESS['state'] == 'ready'
     }), 200
 
 
+_READINESS = {'state': 'idle', 'pid': None, 'load_seconds': None, 'warmup_seconds': None,
+              'warmup_predictions': 0, 'error': None, 'attempts': 0, 'retry_at': 0.0}
+_READINESS_LOCK = threading.Lock()
+
+
+def warmup_texts(lengths=WARMUP_LENGTHS):
+    """Synthetic descriptions of `lengths` words from the vocabulary, each with a few taxonomy phrases."""
+    rng = np.random.default_rng(0)
+    vocabulary = np.array(sorted(VECTORIZER.vocabulary_))
+    phrases = sorted(taxonomy.current().terms('all'))
+    texts = []
+    for n in lengths:
+        words = rng.choice(vocabulary, n).tolist()
+        words[::max(1, n // 4)] = rng.choice(phrases, len(words[::max(1, n // 4)])).tolist()
+        texts.append(' '.join(words))
+    return texts
+
+
+def warmup():
+    """Run each scoring path once over synthetic descriptions; returns the number of descriptions scored."""
+    texts = warmup_texts()
+    predict_model_arrays(texts)  # batch transform and predict
+    for text in texts:
+        calculate_esg_scores(text)
+        predict_model_rows(text)  # single-row path (through the micro-batcher when enabled)
+    predict_explained_arrays(texts[:1], EXPLAIN_TOP_K)
+    score_long_document(texts[-1], with_sections=True)
+    return 2 * len(texts) + 2
+
+
+def preload_models():
+    """Load the models and warm them up, recording durations and state in _READINESS."""
+    started = time.perf_counter()
+    try:
+        loaded = ensure_models_loaded()
+        _READINESS['load_seconds'] = round(time.perf_counter() - started, 3)
+        if not loaded:
+            preload_failed('vectorizer or ESG model could not be loaded')
+            print(f"❌ Preload failed after {_READINESS['load_seconds']}s: models could not be loaded")
+            return
+        _READINESS['state'] = 'warming'
+        warm_started = time.perf_counter()
+        _READINESS['warmup_predictions'] = warmup()
+        _READINESS['warmup_seconds'] = round(time.perf_counter() - warm_started, 3)
+        _READINESS['state'] = 'ready'
+        print(f"✅ Models loaded in {_READINESS['load_seconds']}s, warmed up in {_READINESS['warmup_seconds']}s")
+    except Exception as e:
+        preload_failed(f"{type(e).__name__}: {e}")
+        print(f"❌ Preload failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+def preload_failed(error):
+    """Mark the preload failed and schedule its retry with exponential backoff."""
+    with _READINESS_LOCK:
+        _READINESS['attempts'] += 1
+        delay = min(PRELOAD_RETRY_MAX_SECONDS, PRELOAD_RETRY_SECONDS * 2 ** (_READINESS['attempts'] - 1))
+        _READINESS.update(state='failed', error=error, retry_at=time.monotonic() + delay)
+
+
+def start_preload():
+    """Start preload_models in a background thread, once per worker process (again after a failure)."""
+    with _READINESS_LOCK:
+        if _READINESS['pid'] == os.getpid():
+            if _READINESS['state'] != 'failed':
+                return
+            # retry after the backoff, or now if a request has loaded the models meanwhile (then only warm up)
+            loaded = VECTORIZER is not None and ESG_MODEL is not None
+            if not loaded and time.monotonic() < _READINESS['retry_at']:
+                return
+        elif _READINESS['state'] == 'ready' and ESG_MODEL is not None:
+            return
+        else:
+            # a worker forked from a process that already started (or finished) the preload starts its own
+            _READINESS['attempts'] = 0
+        _READINESS.update(state='loading', pid=os.getpid(), load_seconds=None, warmup_seconds=None,
+                          warmup_predictions=0, error=None)
+    threading.Thread(target=preload_models, name='model-preload', daemon=True).start()
+
+
+@app.route('/ready', methods=['GET'])
+def readiness():
+    """Readiness check: 200 once this worker has loaded and warmed up its models, 503 before"""
+    start_preload()
+    ready = _READINESS['state'] == 'ready'
+    response = jsonify({
+        "ready": ready,
+        "state": _READINESS['state'],
+        "load_seconds": _READINESS['load_seconds'],
+        "warmup_seconds": _READINESS['warmup_seconds'],
+        "warmup_predictions": _READINESS['warmup_predictions'],
+        "error": _READINESS['error'],
+        "attempts": _READINESS['attempts'],
+        "model_version": model_version(),
+        "pid": os.getpid()
+    })
+    if ready:
+        return response, 200
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
+_MEMORY_CACHE = {'models_key': None, 'artifacts': None, 'process': None, 'process_at': 0.0}
+_MEMORY_LOCK = threading.Lock()
+
+
+def memory_report():
+    """Cached memory footprint of the loaded artifacts and of this worker process."""
+    models_key = (id(VECTORIZER), id(ESG_MODEL), id(SDG_MODEL))
+    now = time.monotonic()
+    with _MEMORY_LOCK:
+        if _MEMORY_CACHE['models_key'] != models_key:
+            _MEMORY_CACHE['artifacts'] = {
+                'vectorizer': footprint.vectorizer_footprint(VECTORIZER),
+                'esg_model': footprint.model_footprint(ESG_MODEL),
+                'sdg_model': footprint.model_footprint(SDG_MODEL),
+            }
+            for name, path in LOADED_FILES.items():
+                if _MEMORY_CACHE['artifacts'].get(name) is not None:
+                    _MEMORY_CACHE['artifacts'][name]['file'] = path
+                    _MEMORY_CACHE['artifacts'][name]['file_bytes'] = footprint.file_size(path)
+            _MEMORY_CACHE['models_key'] = models_key
+        if _MEMORY_CACHE['process'] is None or now - _MEMORY_CACHE['process_at'] > MEMORY_REPORT_TTL:
+            _MEMORY_CACHE['process'] = footprint.process_memory()
+            _MEMORY_CACHE['process_at'] = now
+        return {
+            'artifacts': _MEMORY_CACHE['artifacts'],
+            'process': _MEMORY_CACHE['process'],
+            'process_age_seconds': round(now - _MEMORY_CACHE['process_at'], 3),
+            'pid': os.getpid(),
+        }
+
+
 @app.route('/models/status', methods=['GET'])
 def models_status():
     """Return which models are currently loaded and where artifacts exist."""
-    # Ensure we attempted to load models
-    try_load_models()
+    # Report only; loading is left to /predict and the preload so health probes never block on it
+    loading = not _LOAD_LOCK.acquire(blocking=False)
+    if not loading:
+        _LOAD_LOCK.release()
     roots = MODEL_PATHS
     status = {
-        'vectorizer_loaded': bool(VECTORIZER),
-        'esg_model_loaded': bool(ESG_MODEL),
-        'sdg_model_loaded': bool(SDG_MODEL),
+        'vectorizer_loaded': VECTORIZER is not None,
+        'esg_model_loaded': ESG_MODEL is not None,
+        'sdg_model_loaded': SDG_MODEL is not None,
+        'loading': loading,
         'search_paths': roots,
         'found_files': {}
     }
+    status['file_sizes'] = {}
     for base in roots:
         status['found_files'][base] = {
             'vectorizer': os.path.exists(os.path.join(base, 'vectorizer.pkl')),
             'esg_model': os.path.exists(os.path.join(base, 'esg_regression.pkl')),
             'sdg_model': os.path.exists(os.path.join(base, 'sdg_regression.pkl'))
         }
+        status['file_sizes'][base] = {
+            'vectorizer': footprint.file_size(os.path.join(base, 'vectorizer.pkl')),
+            'esg_model': footprint.file_size(os.path.join(base, 'esg_regression.pkl')),
+            'sdg_model': footprint.file_size(os.path.join(base, 'sdg_regression.pkl'))
+        }
+    status['memory'] = memory_report()
+    top_n = request.args.get('tracemalloc', type=int)
+    if top_n:
+        status['memory']['tracemalloc'] = footprint.tracemalloc_top(top_n)
     return jsonify(status)
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Runtime counters for capacity monitoring (admission queue depth and waits)."""
+    return jsonify({
+        "admission": ADMISSION.stats() if ADMISSION is not None else {"enabled": False},
+        "coalescing": SINGLEFLIGHT.stats() if SINGLEFLIGHT is not None else {"enabled": False},
+        "streaming": dict(_STREAM_STATS, batch_size=STREAM_BATCH_SIZE),
+        "micro_batching": BATCHER.stats() if BATCHER is not None else {"enabled": False},
+        "near_duplicate_cache": NEAR_DUP_CACHE.stats() if NEAR_DUP_CACHE is not None else {"enabled": False},
+        "similarity_index": _SIMILARITY['index'].stats() if _SIMILARITY['index'] is not None else {"built": False},
+        "taxonomy": taxonomy.stats()
+    })
+
+
+def profile_points():
+    """Entry points wrapped with cProfile in `cprofile` mode."""
+    points = [(app, 'wsgi_app'), (sys.modules[__name__], 'build_predict_response')]
+    if BATCHER is not None:
+        points.append((BATCHER, 'predict_batch'))
+    return points
+
+
+@app.route('/debug/profile', methods=['GET'])
+def debug_profile():
+    """Profile this worker (or, with scope=all, every gunicorn worker) for `seconds`.
+    Returns collapsed stacks (mode=sample) or a pstats dump (mode=cprofile).
+    """
+    if not PROFILING_ENABLED:
+        return jsonify({"error": "Not found"}), 404
+    if PROFILING_TOKEN and request.headers.get('X-Profile-Token') != PROFILING_TOKEN:
+        return jsonify({"error": "Forbidden"}), 403
+
+    mode = request.args.get('mode', 'sample')
+    scope = request.args.get('scope', 'worker')
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval = float(request.args.get('interval_ms', 10)) / 1000
+    except ValueError:
+        return jsonify({"error": "seconds and interval_ms must be numbers"}), 400
+    if mode not in profiling.PROFILE_MODES or scope not in ('worker', 'all'):
+        return jsonify({"error": "mode must be sample|cprofile and scope worker|all"}), 400
+    if not 0 < seconds <= PROFILING_MAX_SECONDS or interval <= 0:
+        return jsonify({"error": f"seconds must be in (0, {PROFILING_MAX_SECONDS}] and interval_ms > 0"}), 400
+    if scope == 'all' and not request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        return jsonify({"error": "scope=all is only available under gunicorn"}), 400
+
+    signalled = []
+    if scope == 'all':
+        profile_id, signalled = profiling.trigger_siblings(PROFILING_DIR, mode, seconds, interval)
+
+    try:
+        result = profiling.run_profile(mode, seconds, profile_points(), interval,
+                                       exclude={threading.get_ident()})
+        workers = 1
+        if signalled:
+            profiling.write_result(PROFILING_DIR, profile_id, mode, result)
+            result, workers = profiling.collect_results(PROFILING_DIR, profile_id, mode, len(signalled) + 1,
+                                                        timeout=profiling.TRIGGER_GRACE_SECONDS)
+    finally:
+        if scope == 'all':
+            profiling.remove_trigger(PROFILING_DIR, profile_id)
+
+    ext, mimetype = ('collapsed', 'text/plain') if mode == 'sample' else ('prof', 'application/octet-stream')
+    response = Response(result, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=profile-{os.getpid()}-{mode}.{ext}'
+    response.headers['X-Profile-Workers'] = str(workers)
+    return response
+
+
 @app.route('/', methods=['GET'])
 def home():
     """Home endpoint with API documentation"""
@@ -292,7 +998,16 @@ def home():
                 "method": "POST",
                 "description": "Get ESG scores for a project description",
                 "request_format": {
-                    "description": "string (project description)"
+                    "description": "string (project description)",
+                    "format": "(optional) 'full' (default) or 'compact'; also accepted as ?format=",
+                    "mode": "(optional) 'long' to force chunked long-document scoring (automatic above the size threshold)",
+                    "sections": "(optional, long mode) true to add per-section scores and a length-weighted aggregate",
+                    "timings": "(optional) true to add per-stage durations in ms when SERVER_TIMING is enabled",
+                    "sdg_top_k": "(optional) return only the k strongest SDGs, strongest first",
+                    "sdg_min_score": "(optional) return only SDGs scoring at least this value",
+                    "explain": "(optional) true to add the top contributing terms per model output",
+                    "explain_top_k": f"(optional) terms per output when explaining (default {EXPLAIN_TOP_K})",
+                    "near_duplicate": "(optional) true to accept cached model scores of a near-identical description"
                 },
                 "response_format": {
                     "input": {"description": "string"},
@@ -309,25 +1024,296 @@ def home():
                         "Governance": ["matched terms"]
                     }
                 },
+                "compact_response_format": {
+                    "header": {"scores": ["Environmental", "Social", "Governance"],
+                               "model_scores": ["Environment", "Social", "Governance"],
+                               "sdgs": ["SDG1", "...", "SDG17"]},
+                    "scores": "[float, float, float] in header order",
+                    "overall_score": "float",
+                    "model_scores": "[float, float, float] or null",
+                    "sdgs": "[float x 17] or null"
+                },
                 "example_request": {
                     "description": "Solar power installation with community training program and transparent governance"
                 }
             },
+            "/predict/batch": {
+                "method": "POST",
+                "description": "Score many descriptions with one vectorizer pass and one predict per model",
+                "request_format": {
+                    "descriptions": ["string", "..."],
+                    "format": "(optional) 'full' (default, per-item results) or 'compact' (arrays, one row per item)",
+                    "sdg_top_k": "(optional) as for /predict",
+                    "sdg_min_score": "(optional) as for /predict",
+                    "explain": "(optional) as for /predict",
+                    "explain_top_k": "(optional) as for /predict"
+                }
+            },
+            "/predict/stream": {
+                "method": "POST",
+                "description": "Score newline-delimited JSON descriptions, streaming one NDJSON result line each",
+                "request_format": "one JSON string or {\"description\": ..., \"id\": ...} per line",
+                "parameters": {
+                    "format": "(optional) 'full' (default) or 'compact' per result line",
+                    "sdg_top_k": "(optional) as for /predict",
+                    "sdg_min_score": "(optional) as for /predict",
+                    "explain": "(optional) 'true' to add explanations",
+                    "explain_top_k": "(optional) as for /predict"
+                },
+                "response_format": "{\"index\", \"id\"?, ...result or \"error\"} per line, then {\"done\": true, \"count\", \"errors\"}"
+            },
+            "/similar": {
+                "method": "GET or POST",
+                "description": "Projects most similar to a description or a corpus ProjectID (TF-IDF cosine)",
+                "parameters": {
+                    "description": "text to search with, or",
+                    "project_id": "ProjectID of a corpus project",
+                    "k": f"(optional) number of results, 1-{SIMILARITY_MAX_K} (default 10)"
+                }
+            },
+            "/aggregates": {
+                "method": "GET",
+                "description": "Per-country / per-year count, mean, std and histogram of every score",
+                "parameters": {
+                    "country": "(optional) country name",
+                    "year": "(optional) year; with country, the country-year group",
+                    "level": "(optional) 'country', 'year' or 'country_year' to list every group"
+                }
+            },
             "/health": {
                 "method": "GET",
                 "description": "Check API health status"
+            },
+            "/ready": {
+                "method": "GET",
+                "description": "200 once this worker's models are loaded and warmed up, 503 with the load state before"
+            },
+            "/metrics": {
+                "method": "GET",
+                "description": "Runtime counters (inference queue depth, wait times, rejections, micro-batch sizes)"
             }
         }
     })
 
+def payload_too_large(message):
+    """413 response used by the early input-size checks."""
+    return jsonify({
+        "error": "Payload too large",
+        "message": message,
+        "limits": {"max_request_bytes": MAX_REQUEST_BYTES, "max_description_chars": MAX_DESCRIPTION_CHARS}
+    }), 413
+
+
+def predict_long_document(description, with_sections, compact, sdg_options=(None, None), explain_top_k=None):
+    """Long-document branch of `/predict` (chunked scoring, optional sections).
+    SDG selection and explanations apply to the whole-document scores; sections
+    keep full vectors.
+    """
+    result = score_long_document(description, with_sections, explain_top_k)
+    scores = result['scores']
+    overall_score = round(sum(scores.values()) / 3, 2)
+    if compact:
+        response = build_compact_response(scores, overall_score, result['esg_row'], result['sdg_row'], sdg_options)
+    else:
+        response = build_full_response(description, scores, overall_score, result['details'],
+                                       esg_row_to_dict(result['esg_row']),
+                                       sdg_output(result['sdg_row'], sdg_options, compact=False),
+                                       sdg_selected=sdg_options != (None, None))
+    response["mode"] = "long"
+    if explain_top_k:
+        response["explanations"] = explanation_output(result.get('explanations'), 0, compact,
+                                                      selected_goals(result['sdg_row'], sdg_options))
+    if with_sections:
+        response["sections"], response["aggregate"] = long_document_sections(result, compact)
+    return response
+
+
+def build_predict_response(description, data, compact, sdg_options=(None, None), explain_top_k=None):
+    """Score one description and build the `/predict` body.
+    Needs no request context, so it can run on the inference executor.
+    Keyword scores are always computed on the text itself; only model scores
+    come from the near-duplicate cache when the client opts in.
+    """
+    if data.get('mode') == 'long' or len(description) > LONGDOC_THRESHOLD_CHARS:
+        with timing.stage('longdoc'):
+            return predict_long_document(description, bool(data.get('sections')), compact, sdg_options,
+                                         explain_top_k)
+
+    # Calculate ESG scores and get details (keyword-based)
+    with timing.stage('kw'):
+        scores, details = calculate_esg_scores(description)
+    overall_score = round(sum(scores.values()) / 3, 2)
+
+    # Try model-based predictions (if models exist)
+    explanations = None
+    near_dup_similarity = None
+    try:
+        if NEAR_DUP_CACHE is not None and data.get('near_duplicate') and not explain_top_k:
+            esg_row, sdg_row, near_dup_similarity = predict_model_rows_cached(description)
+        elif explain_top_k:
+            # explained requests skip the micro-batcher: the explanation needs their own matrix row
+            esg_arr, sdg_arr, explanations = predict_explained_arrays([description], explain_top_k)
+            esg_row = esg_arr[0] if esg_arr is not None else None
+            sdg_row = sdg_arr[0] if sdg_arr is not None else None
+        else:
+            esg_row, sdg_row = predict_model_rows(description)
+    except Overloaded:
+        raise  # a batched prediction that timed out is a 503, not a keyword-only answer
+    except Exception as model_error:
+        # Log model error but don't fail the request
+        print(f"Model prediction error (using keyword-based scores only): {str(model_error)}")
+        esg_row = None
+        sdg_row = None
+
+    if compact:
+        response = build_compact_response(scores, overall_score, esg_row, sdg_row, sdg_options)
+    else:
+        response = build_full_response(description, scores, overall_score, details,
+                                       esg_row_to_dict(esg_row), sdg_output(sdg_row, sdg_options, compact=False),
+                                       sdg_selected=sdg_options != (None, None))
+    if explain_top_k:
+        response["explanations"] = explanation_output(explanations, 0, compact,
+                                                      selected_goals(sdg_row, sdg_options))
+    if near_dup_similarity is not None:
+        response["near_duplicate"] = {"similarity": round(near_dup_similarity, 3)}
+    return response
+
+
+def build_batch_response(descriptions, compact, sdg_options=(None, None), explain_top_k=None):
+    """Score a list of descriptions with one vectorizer transform and one predict per head.
+    Full results are per-item dicts without the echoed input or static text;
+    compact results are arrays with one row per item. Explanations come from
+    the same transformed matrix.
+    """
+    with timing.stage('kw'):
+        keyword = [calculate_esg_scores(d) for d in descriptions]
+    explanations = None
+    try:
+        if explain_top_k:
+            esg_arr, sdg_arr, explanations = predict_explained_arrays(descriptions, explain_top_k)
+        else:
+            esg_arr, sdg_arr = predict_model_arrays(descriptions)
+    except Exception as model_error:
+        print(f"Model prediction error (using keyword-based scores only): {str(model_error)}")
+        esg_arr = sdg_arr = None
+
+    selected = sdg_options != (None, None)
+    goals = sel_scores = None
+    if sdg_arr is not None and selected:
+        goals, sel_scores = select_sdgs(sdg_arr, *sdg_options)
+
+    if compact:
+        kw = np.array([[s[c] for c in KEYWORD_CATEGORIES] for s, _ in keyword], dtype=float).reshape(-1, 3)
+        if sdg_arr is None:
+            sdgs = None
+        elif selected:
+            sdgs = {"goals": [g + 1 for g in goals], "scores": [np.round(s, 2) for s in sel_scores]}
+        else:
+            sdgs = np.round(sdg_arr, 2)
+        response = {
+            "header": {
+                "scores": KEYWORD_CATEGORIES,
+                "model_scores": ESG_OUTPUTS,
+                "sdgs": SDG_OUTPUTS[:sdg_arr.shape[1]] if sdg_arr is not None else (),
+            },
+            "count": len(descriptions),
+            "scores": kw,
+            "overall_score": np.round(kw.sum(axis=1) / 3, 2),
+            "model_scores": np.round(esg_arr, 2) if esg_arr is not None else None,
+            "sdgs": sdgs,
+        }
+        if explain_top_k:
+            response["explanations"] = [
+                explanation_output(explanations, i, True, goals[i] if goals is not None else None)
+                for i in range(len(descriptions))
+            ] if explanations is not None else None
+        return response
+
+    results = []
+    for i, (scores, details) in enumerate(keyword):
+        if sdg_arr is None:
+            sdgs = None
+        elif selected:
+            sdgs = sdg_selection_output(goals[i], sel_scores[i], compact=False)
+        else:
+            sdgs = sdg_row_to_dict(sdg_arr[i])
+        item = {
+            "scores": scores,
+            "overall_score": round(sum(scores.values()) / 3, 2),
+            "details": details,
+            "model_scores": esg_row_to_dict(esg_arr[i]) if esg_arr is not None else None,
+            "sdgs": sdgs,
+        }
+        if explain_top_k:
+            item["explanations"] = explanation_output(explanations, i, False,
+                                                      goals[i] if goals is not None else None)
+        results.append(item)
+    return {"count": len(descriptions), "results": results}
+
+
+def run_inference(fn, *args):
+    """Run scoring work directly, or on the bounded executor when admission control is on."""
+    if ADMISSION is None:
+        return fn(*args)
+    return ADMISSION.run(fn, *args)
+
+
+def coalescing_key(description, data, compact, sdg_options, explain_top_k):
+    """Key of everything a /predict body depends on besides the echoed input.
+    Surrounding whitespace is dropped outside long-document mode: keyword phrases
+    and vectorizer tokens never include it.
+    """
+    long_mode = data.get('mode') == 'long' or len(description) > LONGDOC_THRESHOLD_CHARS
+    text = description if long_mode else description.strip()
+    options = (compact, sdg_options, explain_top_k, long_mode, bool(data.get('sections')),
+               bool(data.get('near_duplicate')))
+    digest = hashlib.sha1(text.encode('utf-8', 'surrogatepass')).hexdigest()
+    return digest, repr(options), model_version()
+
+
+def run_coalesced(key, description, fn, *args):
+    """run_inference(fn, *args), shared with identical requests already in flight.
+    Returns a body dict the caller may modify.
+    """
+    if SINGLEFLIGHT is None:
+        return run_inference(fn, *args)
+    body, shared = SINGLEFLIGHT.do(key, run_inference, fn, *args)
+    body = dict(body)  # every caller adds its own fields (e.g. timings) to its own copy
+    if shared:
+        timing.record('coalesced')
+        if 'input' in body:
+            body['input'] = {'description': description}
+    return body
+
+
+def overloaded_response(exc):
+    """Fast 429/503 with Retry-After for requests refused by admission control."""
+    response = jsonify({
+        "error": "Service overloaded" if exc.status == 429 else "Service unavailable",
+        "message": str(exc),
+        "retry_after": exc.retry_after
+    })
+    response.status_code = exc.status
+    response.headers['Retry-After'] = str(exc.retry_after)
+    return response
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Predict ESG scores for a given project description"""
     try:
-        data = request.get_json(force=True)
+        # Reject oversized bodies before reading/parsing them
+        if request.content_length is not None and request.content_length > MAX_REQUEST_BYTES:
+            return payload_too_large(f"Request body exceeds {MAX_REQUEST_BYTES} bytes")
+
+        with timing.stage('parse'):
+            try:
+                data = request_payload()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
         
         # Validate input
-        if not data or 'description' not in data:
+        if not isinstance(data, dict) or 'description' not in data:
             return jsonify({
                 "error": "Missing required field: description",
                 "usage": {
@@ -338,43 +1324,28 @@ def predict():
             }), 400
         
         description = data['description']
-        
-        # Calculate ESG scores and get details (keyword-based)
-        scores, details = calculate_esg_scores(description)
-        overall_score = round(sum(scores.values()) / 3, 2)
+        if not isinstance(description, str):
+            return jsonify({"error": "description must be a string"}), 400
+        if len(description) > MAX_DESCRIPTION_CHARS:
+            return payload_too_large(f"description exceeds {MAX_DESCRIPTION_CHARS} characters")
 
-        # Try model-based predictions (if models exist)
+        compact = response_format(data) == 'compact'
         try:
-            model_esg, model_sdgs = predict_with_models(description)
-        except Exception as model_error:
-            # Log model error but don't fail the request
-            print(f"Model prediction error (using keyword-based scores only): {str(model_error)}")
-            model_esg = None
-            model_sdgs = None
-
-        # Prepare response - always include sdgs field even if None
-        response = {
-            "input": {"description": description},
-            "scores": scores,
-            "overall_score": overall_score,
-            "details": details,
-            "model_scores": model_esg,
-            "sdgs": model_sdgs if model_sdgs is not None else {},
-            "interpretation": {
-                "scale": "Scores range from 0 to 1, where 1 indicates strongest alignment",
-                "score_levels": {"high": "0.7 - 1.0", "medium": "0.4 - 0.69", "low": "0 - 0.39"}
-            }
-        }
-        
-        # Add notes if model predictions are unavailable
-        if model_esg is None:
-            response["note"] = "Model-based ESG predictions are currently unavailable. Showing keyword-based scores only."
-        
-        if model_sdgs is None or (isinstance(model_sdgs, dict) and len(model_sdgs) == 0):
-            response["sdg_note"] = "SDG model predictions are currently unavailable. The SDG model may not be loaded or may have encountered an error."
-        
-        return jsonify(response)
-    
+            sdg_options = parse_sdg_options(data)
+            explain_top_k = parse_explain_options(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        key = coalescing_key(description, data, compact, sdg_options, explain_top_k)
+        body = run_coalesced(key, description, build_predict_response, description, data, compact, sdg_options,
+                             explain_top_k)
+        timer = timing.current()
+        if timer is not None and data.get('timings'):
+            body["timings"] = timer.as_dict()
+        with timing.stage('ser'):
+            return negotiated_response(body)
+
+    except Overloaded as exc:
+        return overloaded_response(exc)
     except Exception as e:
         # Log full error for debugging
         import traceback
@@ -385,6 +1356,360 @@ def predict():
             "message": str(e)
         }), 500
 
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many descriptions in one request (one transform, one predict per head)"""
+    try:
+        if request.content_length is not None and request.content_length > MAX_REQUEST_BYTES:
+            return payload_too_large(f"Request body exceeds {MAX_REQUEST_BYTES} bytes")
+
+        with timing.stage('parse'):
+            try:
+                data = request_payload()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        descriptions = data.get('descriptions') if isinstance(data, dict) else None
+        if not isinstance(descriptions, list) or not all(isinstance(d, str) for d in descriptions):
+            return jsonify({
+                "error": "Missing required field: descriptions",
+                "usage": {"required_format": {"descriptions": ["description 1", "description 2"]}}
+            }), 400
+        if len(descriptions) > MAX_BATCH_ITEMS:
+            return payload_too_large(f"descriptions has more than {MAX_BATCH_ITEMS} items")
+        if any(len(d) > MAX_DESCRIPTION_CHARS for d in descriptions):
+            return payload_too_large(f"a description exceeds {MAX_DESCRIPTION_CHARS} characters")
+        try:
+            sdg_options = parse_sdg_options(data)
+            explain_top_k = parse_explain_options(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        compact = response_format(data) == 'compact'
+        body = run_inference(build_batch_response, descriptions, compact, sdg_options, explain_top_k)
+        timer = timing.current()
+        if timer is not None and data.get('timings'):
+            body["timings"] = timer.as_dict()
+        with timing.stage('ser'):
+            return negotiated_response(body)
+
+    except Overloaded as exc:
+        return overloaded_response(exc)
+    except Exception as e:
+        import traceback
+        print(f"Error in batch predict endpoint: {traceback.format_exc()}")
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e)
+        }), 500
+
+_STREAM_STATS = {'streams': 0, 'active': 0, 'items': 0, 'errors': 0, 'completed': 0, 'cancelled': 0}
+_STREAM_LOCK = threading.Lock()
+
+
+def _count_stream(**deltas):
+    with _STREAM_LOCK:
+        for name, delta in deltas.items():
+            _STREAM_STATS[name] += delta
+
+
+def stream_options(args):
+    """/predict/stream options from the query string, typed like the JSON body fields; raises ValueError."""
+    options = {}
+    for name, cast in (('sdg_top_k', int), ('sdg_min_score', float), ('explain_top_k', int)):
+        if args.get(name) is not None:
+            try:
+                options[name] = cast(args[name])
+            except ValueError:
+                raise ValueError(f"{name} must be a number") from None
+    options['explain'] = args.get('explain', '').lower() in ('1', 'true', 'yes')
+    return parse_sdg_options(options), parse_explain_options(options)
+
+
+def read_ndjson(stream, max_line_bytes):
+    """Yield (index, id, description, error) per non-empty line of an NDJSON byte stream.
+    A line is a JSON string or an object with `description` (and optional `id`).
+    Reads one line at a time, so memory is bounded by `max_line_bytes`.
+    """
+    index = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            while line and not line.endswith(b'\n'):  # skip the rest of the oversized line
+                line = stream.readline(65536)
+            yield index, None, None, f"line exceeds {max_line_bytes} bytes"
+            index += 1
+            continue
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield index, None, None, f"invalid JSON: {e}"
+        else:
+            item_id = item.get('id') if isinstance(item, dict) else None
+            description = item.get('description') if isinstance(item, dict) else item
+            if not isinstance(description, str):
+                yield index, item_id, None, "each line must be a JSON string or an object with a description"
+            elif len(description) > MAX_DESCRIPTION_CHARS:
+                yield index, item_id, None, f"description exceeds {MAX_DESCRIPTION_CHARS} characters"
+            else:
+                yield index, item_id, description, None
+        index += 1
+
+
+def batch_result_rows(body, compact):
+    """Split a build_batch_response body into one result dict per description."""
+    if not compact:
+        return body['results']
+    rows = []
+    for i in range(body['count']):
+        sdgs = body['sdgs']
+        if isinstance(sdgs, dict):
+            sdgs = {"goals": sdgs['goals'][i], "scores": sdgs['scores'][i]}
+        elif sdgs is not None:
+            sdgs = sdgs[i]
+        row = {
+            "scores": body['scores'][i],
+            "overall_score": body['overall_score'][i],
+            "model_scores": body['model_scores'][i] if body['model_scores'] is not None else None,
+            "sdgs": sdgs,
+        }
+        if 'explanations' in body:
+            row["explanations"] = body['explanations'][i] if body['explanations'] is not None else None
+        rows.append(row)
+    return rows
+
+
+def stream_results(lines, compact, sdg_options, explain_top_k):
+    """Score (index, id, description, error) items in batches; yield NDJSON bytes per batch.
+    Batches grow 1, 2, 4, ... up to STREAM_BATCH_SIZE, so the first results go out at once.
+    Closing the generator (the client went away) stops reading and scoring.
+    """
+    _count_stream(streams=1, active=1)
+    count = errors = 0
+    finished = False
+    try:
+        pending = []
+        batch_size = 1
+        exhausted = False
+        while not exhausted:
+            for item in lines:
+                pending.append(item)
+                if len(pending) >= batch_size:
+                    break
+            else:
+                exhausted = True
+            if not pending:
+                break
+            valid = [item for item in pending if item[3] is None]
+            rows = iter(())
+            if valid:
+                body = run_inference(build_batch_response, [item[2] for item in valid], compact, sdg_options,
+                                     explain_top_k)
+                rows = iter(batch_result_rows(body, compact))
+            out = []
+            for index, item_id, _, error in pending:
+                result = {"index": index}
+                if item_id is not None:
+                    result["id"] = item_id
+                if error is None:
+                    result.update(next(rows))
+                else:
+                    result["error"] = error
+                    errors += 1
+                out.append(serialization.dumps(result))
+            count += len(pending)
+            _count_stream(items=len(pending), errors=sum(item[3] is not None for item in pending))
+            pending = []
+            batch_size = min(2 * batch_size, STREAM_BATCH_SIZE)
+            yield b'\n'.join(out) + b'\n'
+        finished = True
+        yield serialization.dumps({"done": True, "count": count, "errors": errors}) + b'\n'
+    except Overloaded as exc:
+        finished = True
+        yield serialization.dumps({"done": False, "count": count, "error": str(exc),
+                                   "retry_after": exc.retry_after}) + b'\n'
+    finally:
+        _count_stream(active=-1, **({'completed': 1} if finished else {'cancelled': 1}))
+
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """Score NDJSON descriptions from the request body, streaming NDJSON results per internal batch"""
+    try:
+        compact = response_format(None) == 'compact'
+        sdg_options, explain_top_k = stream_options(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    lines = read_ndjson(request.stream, MAX_REQUEST_BYTES)
+    response = Response(stream_with_context(stream_results(lines, compact, sdg_options, explain_top_k)),
+                        mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'  # let proxies pass each batch through as it is written
+    return response
+
+
+_SIMILARITY = {'vectorizer': None, 'index': None, 'ids': None, 'countries': None, 'descriptions': None,
+               'rows': None}
+_SIMILARITY_LOCK = threading.Lock()
+
+
+def similarity_index():
+    """The /similar corpus and its index, built on first use for the loaded vectorizer."""
+    with _SIMILARITY_LOCK:
+        if _SIMILARITY['vectorizer'] is not VECTORIZER:
+            corpus = storage.read_corpus(SIMILARITY_CORPUS, ['ProjectID', 'Country', 'Description'])
+            descriptions = corpus['Description'].fillna('').astype(str).tolist()
+            ids = corpus['ProjectID'].tolist() if 'ProjectID' in corpus.columns else list(range(len(corpus)))
+            matrix = VECTORIZER.transform(descriptions)
+            _SIMILARITY.update(
+                index=similarity.build_index(matrix, SIMILARITY_MODE, SIMILARITY_APPROX_MIN_DOCS,
+                                             n_probe=SIMILARITY_N_PROBE),
+                ids=ids,
+                countries=corpus['Country'].tolist() if 'Country' in corpus.columns else None,
+                descriptions=descriptions,
+                rows={str(pid): i for i, pid in enumerate(ids)},
+                vectorizer=VECTORIZER,
+            )
+            print(f"Similarity index built: {_SIMILARITY['index'].stats()}")
+        return dict(_SIMILARITY)
+
+
+def find_similar(query, k, exclude_row=None):
+    """Top-k corpus projects for a 1-row TF-IDF query (optionally without one corpus row),
+    keeping only those more similar than SIMILARITY_MIN_SCORE.
+    """
+    corpus = similarity_index()
+    with timing.stage('similar'):
+        scores, rows = corpus['index'].query(query, k + (exclude_row is not None))
+    results = []
+    for score, row in zip(scores[0].tolist(), rows[0].tolist()):
+        if score <= SIMILARITY_MIN_SCORE:
+            break  # best first: the rest share no terms with the query (or fall below the floor)
+        if row < 0 or row == exclude_row or len(results) == k:
+            continue
+        results.append({
+            "project_id": corpus['ids'][row],
+            "country": corpus['countries'][row] if corpus['countries'] is not None else None,
+            "description": corpus['descriptions'][row],
+            "similarity": round(score, 4),
+        })
+    return {"mode": corpus['index'].mode, "k": k, "results": results}
+
+
+@app.route('/similar', methods=['GET', 'POST'])
+def similar():
+    """Projects most similar to a description or to a corpus ProjectID (TF-IDF cosine)"""
+    try:
+        params = dict(request.args)
+        if request.method == 'POST':
+            body = request.get_json(silent=True)
+            if isinstance(body, dict):
+                params.update(body)
+        try:
+            k = int(params.get('k', 10))
+        except (TypeError, ValueError):
+            k = 0
+        if not 1 <= k <= SIMILARITY_MAX_K:
+            return jsonify({"error": f"k must be an integer between 1 and {SIMILARITY_MAX_K}"}), 400
+        description = params.get('description')
+        project_id = params.get('project_id')
+        if not description and project_id is None:
+            return jsonify({
+                "error": "Provide a description or a project_id",
+                "usage": {"GET": "/similar?k=10&project_id=42", "POST": {"description": "project description", "k": 10}}
+            }), 400
+        if description is not None and len(str(description)) > MAX_DESCRIPTION_CHARS:
+            return payload_too_large(f"description exceeds {MAX_DESCRIPTION_CHARS} characters")
+
+        if not ensure_models_loaded():
+            return jsonify({"error": "Vectorizer not available"}), 503
+        try:
+            corpus = similarity_index()
+        except (OSError, KeyError) as e:
+            return jsonify({"error": "Similarity corpus unavailable", "message": str(e)}), 503
+
+        if project_id is not None and not description:
+            row = corpus['rows'].get(str(project_id))
+            if row is None:
+                return jsonify({"error": f"Unknown project_id: {project_id}"}), 404
+            with timing.stage('vec'):
+                query = VECTORIZER.transform([corpus['descriptions'][row]])
+            body = run_inference(find_similar, query, k, row)
+            body["query"] = {"project_id": corpus['ids'][row]}
+        else:
+            with timing.stage('vec'):
+                query = VECTORIZER.transform([str(description)])
+            body = run_inference(find_similar, query, k)
+        with timing.stage('ser'):
+            return json_response(body)
+
+    except Overloaded as exc:
+        return overloaded_response(exc)
+    except Exception as e:
+        import traceback
+        print(f"Error in similar endpoint: {traceback.format_exc()}")
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e)
+        }), 500
+
+_AGGREGATES = {'mtime': None, 'store': None}
+_AGGREGATES_LOCK = threading.Lock()
+
+
+def aggregates_store():
+    """The rollup store at AGGREGATES_PATH (reloaded when the file changes), or None."""
+    try:
+        mtime = os.stat(AGGREGATES_PATH).st_mtime_ns
+    except OSError:
+        return None
+    with _AGGREGATES_LOCK:
+        if _AGGREGATES['mtime'] != mtime:
+            _AGGREGATES['store'] = aggregates.RollupStore.load(AGGREGATES_PATH)
+            _AGGREGATES['mtime'] = mtime
+        return _AGGREGATES['store']
+
+
+@app.route('/aggregates', methods=['GET'])
+def aggregates_view():
+    """Precomputed per-country / per-year score summaries"""
+    store = aggregates_store()
+    if store is None:
+        return jsonify({"error": "No aggregates available",
+                        "hint": "run `python aggregates.py projects_scored.csv` or `bulk_score.py --aggregates`"}), 404
+
+    country = request.args.get('country')
+    year = request.args.get('year')
+    level = request.args.get('level')
+    if country is not None or year is not None:
+        level = 'country_year' if country is not None and year is not None else ('country' if country else 'year')
+        key = aggregates.group_key(level, country, year)
+        summary = store.lookup(level, country, year)
+        if summary is None:
+            return jsonify({"error": f"No projects for {level} {key}"}), 404
+        return json_response({"level": level, "key": key, "bin_edges": store.bin_edges, **summary})
+    if level is not None:
+        if level not in aggregates.LEVELS:
+            return jsonify({"error": f"level must be one of {list(aggregates.LEVELS)}"}), 400
+        return json_response({"level": level, "bin_edges": store.bin_edges,
+                              "groups": {key: store.summary(level, key) for key in store.groups(level)}})
+    return json_response({
+        "dimensions": store.dimensions,
+        "bin_edges": store.bin_edges,
+        "groups": {lvl: store.groups(lvl) for lvl in aggregates.LEVELS},
+    })
+
+# Let sibling gunicorn workers join a scope=all profile (handler only, no per-request cost)
+if PROFILING_ENABLED:
+    profiling.install_signal_handler(PROFILING_DIR, profile_points)
+
+# Last, so the preload thread only calls functions that are already defined
+if PRELOAD_MODELS:
+    start_preload()
+
 if __name__ == '__main__':
     print("✅ Starting ESG Score Predictor API v2.0...")
     print("📡 API will be available at http://localhost:5000")
@@ -0,0 +1,165 @@
+"""Micro-batching scheduler for model predictions.
+
+Concurrent single-description calls are queued and a background thread runs
+them as one batch: one `VECTORIZER.transform` and one `predict` per head over
+the stacked matrix, then each caller's future is resolved with its own row.
+
+When requests are arriving concurrently (more than one is waiting, or the
+previous batch had several items and finished less than `window` seconds ago)
+the scheduler keeps collecting for up to `window` seconds or `max_batch`
+items. A lone request on an idle service is dispatched immediately, so
+latency at low load does not regress.
+
+The scheduler thread belongs to the process that started it. A forked child
+(a gunicorn worker under `preload_app` when the master already used the
+batcher) starts its own thread and queue on first use. `predict` waits at most
+`timeout` seconds for its row and then raises `Overloaded` (503).
+
+Request timers (timing.py) live in the caller's context, which the scheduler
+thread does not share. When the caller has one, the batch's stages (model
+load, vectorize, predict) are timed on the scheduler thread and copied into
+the caller's timer by `predict`.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeout
+
+import timing
+from admission import Overloaded
+
+_START_LOCK = threading.Lock()
+
+
+class MicroBatcher:
+    """Coalesce concurrent `submit(text)` calls into batched `predict_batch(texts)` calls.
+
+    `predict_batch` must return a tuple of arrays (or None) with one row per
+    input text; each future resolves to the tuple of that input's rows.
+    """
+
+    def __init__(self, predict_batch, max_batch=64, window=0.002, timeout=30.0):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.window = window
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._timed_out = 0
+        self._last_done = 0.0
+        self._last_size = 0
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+
+    def _ensure_started(self):
+        # started lazily, once per process: a fork copies this object but not its thread
+        if self._pid == os.getpid():
+            return
+        with _START_LOCK:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # the parent's queue and lock may have been in use at the fork
+                self._queue = queue.Queue()
+                self._lock = threading.Lock()
+            self._thread = threading.Thread(target=self._loop, name='micro-batcher', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, text, stages=None):
+        """Queue one text; returns a Future resolving to its tuple of output rows.
+        A `stages` list receives the (name, seconds, desc) timings of the batch that scores it.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((text, future, stages))
+        return future
+
+    def predict(self, text):
+        """The tuple of output rows for one text, waiting at most `timeout` seconds (else Overloaded 503).
+        The batch's stage timings are added to the caller's request timer, if it has one.
+        """
+        stages = [] if timing.current() is not None else None
+        future = self.submit(text, stages)
+        try:
+            rows = future.result(timeout=self.timeout)
+        except FuturesTimeout:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise Overloaded(f"Batched prediction did not complete within {self.timeout}s", 503,
+                             max(1, int(self.timeout))) from None
+        for entry in stages or ():
+            timing.record(*entry)
+        return rows
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        # take whatever is already waiting
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        idle = time.monotonic() - self._last_done > self.window
+        if idle or (len(batch) == 1 and self._last_size <= 1):
+            return batch  # no concurrent traffic: do not add latency
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue  # every caller gave up
+            texts = [text for text, _, _ in batch]
+            timed = any(stages is not None for _, _, stages in batch)
+            timer = timing.start() if timed else None
+            try:
+                outputs = self.predict_batch(texts)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+            else:
+                if timer is not None:
+                    for _, _, stages in batch:
+                        if stages is not None:
+                            stages.extend(timer.entries)
+                for i, (_, future, _) in enumerate(batch):
+                    future.set_result(tuple(out[i] if out is not None else None for out in outputs))
+            finally:
+                if timer is not None:
+                    timing.finish()
+            self._last_done = time.monotonic()
+            self._last_size = len(batch)
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._max_seen = max(self._max_seen, len(batch))
+
+    def stats(self):
+        """Batch counters for /metrics."""
+        with self._lock:
+            return {
+                "enabled": True,
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "max_batch_seen": self._max_seen,
+                "timed_out": self._timed_out,
+            }
@@ -0,0 +1,73 @@
+"""Throughput and added latency of the micro-batching scheduler.
+
+N client threads issue single-description predictions back to back, either
+calling `predict_model_arrays` directly or going through a `MicroBatcher`.
+Reports throughput and p50/p99 latency for each concurrency level.
+
+Usage: python benchmarks/bench_microbatch.py [--models DIR] [--window-ms 2] [--seconds 3]
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from synthetic import load_app, make_corpus
+from batching import MicroBatcher
+
+
+def run_clients(call, texts, clients, seconds):
+    latencies = []
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def client(offset):
+        local = []
+        i = offset
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            call(texts[i % len(texts)])
+            local.append(time.perf_counter() - start)
+            i += clients
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    began = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+    lat = np.array(latencies) * 1000
+    return len(lat) / elapsed, np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', help='artifact directory (default: train synthetic artifacts)')
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    api = load_app(args.models)
+    texts = make_corpus(512, seed=1)
+    batcher = MicroBatcher(api.predict_model_arrays, args.max_batch, args.window_ms / 1000)
+
+    def direct(text):
+        return api.predict_model_arrays([text])
+
+    def batched(text):
+        return batcher.predict(text)
+
+    print(f"{'clients':>7} {'mode':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for clients in (1, 4, 16, 64):
+        for mode, call in (('direct', direct), ('batched', batched)):
+            rps, p50, p99 = run_clients(call, texts, clients, args.seconds)
+            print(f"{clients:>7} {mode:>8} {rps:>9.0f} {p50:>8.2f} {p99:>8.2f}")
+    print(batcher.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""JSON vs MessagePack for batch scoring: parse / serialize cost and payload size.
+
+For batches of synthetic descriptions (see synthetic.py), builds the
+/predict/batch request and the full and compact response bodies with
+synthetic artifacts. For each it times:
+- server-side request parsing (Flask's JSON parsing vs serialization.unpackb);
+- response serialization (serialization.dumps, orjson when installed, vs
+  serialization.packb);
+- client-side decoding (json.loads vs serialization.unpackb).
+It also reports payload bytes.
+
+Usage: python benchmarks/bench_msgpack.py [--batch 10 100 1000] [--words 300] [--repeat 20]
+"""
+import argparse
+import json
+import time
+
+from flask import json as flask_json
+
+from synthetic import load_app, make_corpus
+import serialization
+
+
+def time_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batch', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--words', type=int, default=300, help='words per description')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    if serialization.msgpack is None:
+        raise SystemExit('msgpack is not installed')
+
+    api = load_app()
+    print(f"JSON serializer: {'orjson' if serialization.orjson is not None else 'stdlib json'}")
+    print(f"{'batch':>6} {'body':>8} {'format':>8} {'bytes':>10} {'parse ms':>9} {'dump ms':>9} {'decode ms':>10}")
+    for n in args.batch:
+        descriptions = make_corpus(n, words_per_doc=args.words, seed=n)
+        bodies = [('request', {'descriptions': descriptions, 'format': 'compact'})]
+        bodies += [(fmt, api.build_batch_response(descriptions, fmt == 'compact')) for fmt in ('full', 'compact')]
+        for name, body in bodies:
+            encoded = {'json': serialization.dumps(body), 'msgpack': serialization.packb(body)}
+            for fmt, data in encoded.items():
+                if name == 'request':  # the server parses requests
+                    with api.app.test_request_context('/predict/batch', method='POST', data=data,
+                                                      content_type=f'application/{fmt}'):
+                        parse_ms, _ = time_call(lambda: api.request_payload() if fmt == 'msgpack'
+                                                else flask_json.loads(data), args.repeat)
+                else:
+                    parse_ms = float('nan')
+                dump = serialization.packb if fmt == 'msgpack' else serialization.dumps
+                load = serialization.unpackb if fmt == 'msgpack' else json.loads
+                dump_ms, _ = time_call(lambda: dump(body), args.repeat)
+                decode_ms, _ = time_call(lambda: load(data), args.repeat)
+                print(f"{n:>6} {name:>8} {fmt:>8} {len(data):>10,} {parse_ms:>9.3f} {dump_ms:>9.3f} {decode_ms:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Training time of the SDG head: per-target MultiOutputRegressor vs one multi-target solve.
+
+For every corpus size and number of targets, fits
+MultiOutputRegressor(LinearRegression()) (the current train_sdg.py head) and
+multi_target.fit_multi_target with each solver on the same TF-IDF matrix,
+and reports fit time, speedup and the largest absolute prediction
+difference from the per-target fit.
+
+Usage: python benchmarks/bench_multi_target.py [--docs 2000 8000 30000] [--targets 3 17 50]
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LinearRegression
+from sklearn.multioutput import MultiOutputRegressor
+
+from synthetic import make_corpus
+import multi_target
+
+DIRECT_MAX_SIZE = 4000  # the dense factorization is cubic in min(docs, features)
+
+
+def timed_fit(fit):
+    start = time.perf_counter()
+    model = fit()
+    return model, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, nargs='+', default=[2000, 8000, 30000])
+    parser.add_argument('--targets', type=int, nargs='+', default=[3, 17, 50])
+    parser.add_argument('--features', type=int, default=5000)
+    parser.add_argument('--n-jobs', type=int, default=-1, help='workers for the lsqr solver')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'docs':>7} {'targets':>7} {'solver':>12} {'fit s':>8} {'speedup':>8} {'max |dpred|':>12}")
+    for n_docs in args.docs:
+        X = TfidfVectorizer(max_features=args.features).fit_transform(make_corpus(n_docs))
+        for n_targets in args.targets:
+            # weak-label-like targets: linear in the features plus noise, clipped to [0, 1]
+            Y = np.clip(X @ rng.normal(0, 0.5, (X.shape[1], n_targets)) + rng.normal(0, 0.05, (n_docs, n_targets)), 0, 1)
+            base, base_s = timed_fit(lambda: MultiOutputRegressor(LinearRegression()).fit(X, Y))
+            expected = base.predict(X)
+            print(f"{n_docs:>7} {n_targets:>7} {'multioutput':>12} {base_s:>8.2f} {1.0:>8.2f} {0.0:>12.1e}")
+            solvers = ['lsqr', 'cg'] + (['direct'] if min(X.shape) <= DIRECT_MAX_SIZE else [])
+            for solver in solvers:
+                model, seconds = timed_fit(lambda: multi_target.fit_multi_target(X, Y, solver=solver,
+                                                                                 n_jobs=args.n_jobs))
+                diff = np.abs(model.predict(X) - expected).max()
+                print(f"{n_docs:>7} {n_targets:>7} {solver:>12} {seconds:>8.2f} {base_s / seconds:>8.2f} {diff:>12.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Bulk scoring throughput with 1..N processes over shared model arrays.
+
+Trains synthetic artifacts (see synthetic.py) and scores the same corpus
+in-process with the app's predict_model_arrays, then with
+parallel_score.score_parallel for each process count. Reports descriptions
+per second, speedup over the single-process baseline and the largest
+absolute difference from the baseline scores.
+
+Usage: python benchmarks/bench_parallel_score.py [--docs 50000] [--processes 1 2 4 8 16 32]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from synthetic import load_app, make_corpus
+import parallel_score
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=50000)
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1))))
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    parser.add_argument('--models', help='artifact directory (default: train synthetic artifacts)')
+    args = parser.parse_args()
+
+    api = load_app(args.models)
+    if not api.ensure_models_loaded():
+        raise SystemExit('Models could not be loaded')
+    docs = make_corpus(args.docs, seed=1)
+
+    started = time.perf_counter()
+    esg_parts, sdg_parts = zip(*(api.predict_model_arrays(docs[i:i + args.chunk_size])
+                                 for i in range(0, len(docs), args.chunk_size)))
+    base_s = time.perf_counter() - started
+    expected = np.hstack([np.vstack(esg_parts), np.vstack(sdg_parts)])
+    print(f"{cpus} CPUs, {len(docs)} descriptions")
+    print(f"{'processes':>10} {'seconds':>8} {'docs/s':>10} {'speedup':>8} {'max |diff|':>11}")
+    print(f"{'in-process':>10} {base_s:>8.2f} {len(docs) / base_s:>10,.0f} {1.0:>8.2f} {0.0:>11.1e}")
+    for n in args.processes:
+        started = time.perf_counter()
+        esg, sdg = parallel_score.score_parallel(api.VECTORIZER, api.ESG_MODEL, api.SDG_MODEL, docs, n,
+                                                 args.chunk_size)
+        seconds = time.perf_counter() - started
+        diff = np.abs(np.hstack([esg, sdg]) - expected).max()
+        print(f"{n:>10} {seconds:>8.2f} {len(docs) / seconds:>10,.0f} {base_s / seconds:>8.2f} {diff:>11.1e}")
+
+
+if __name__ == '__main__':
+    main()
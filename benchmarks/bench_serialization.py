@@ -0,0 +1,69 @@
+"""Compare `/predict` response size and serialization cost.
+
+Builds the full and compact response bodies for descriptions of a few sizes
+and times Flask's `jsonify` against the fast serializer in `serialization.py`.
+Model rows are synthetic, so no trained artifacts are needed.
+
+Usage: python benchmarks/bench_serialization.py [--repeat 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import jsonify  # noqa: E402
+
+import app as api  # noqa: E402
+import serialization  # noqa: E402
+
+SAMPLE = ("Solar power installation with community training program, renewable energy "
+          "and transparency initiative with stakeholder engagement. ")
+
+
+def time_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat * 1e6, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    esg_row = rng.random(3)
+    sdg_row = rng.random(17)
+    print(f"serializer: {'orjson' if serialization.orjson is not None else 'stdlib json'}")
+    print(f"{'input':>8} {'shape':>8} {'path':>8} {'bytes':>8} {'us/resp':>9}")
+
+    for size in (200, 2_000, 10_000):
+        description = (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+        scores, details = api.calculate_esg_scores(description)
+        overall = round(sum(scores.values()) / 3, 2)
+
+        def full_body():
+            return api.build_full_response(description, scores, overall, details,
+                                           api.esg_row_to_dict(esg_row), api.sdg_row_to_dict(sdg_row))
+
+        def compact_body():
+            return api.build_compact_response(scores, overall, esg_row, sdg_row)
+
+        with api.app.test_request_context('/predict', method='POST'):
+            cases = [
+                ('full', 'jsonify', lambda: jsonify(full_body()).get_data()),
+                ('full', 'fast', lambda: serialization.dumps(full_body())),
+                ('compact', 'fast', lambda: serialization.dumps(compact_body())),
+            ]
+            for shape, path, fn in cases:
+                us, body = time_call(fn, args.repeat)
+                print(f"{size:>8} {shape:>8} {path:>8} {len(body):>8} {us:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Build time, memory and query latency of the /similar indexes.
+
+Builds the exact (blocked sparse matmul) and approximate (IVF over an SVD
+embedding) indexes over a synthetic topic corpus vectorized with the app's
+TfidfVectorizer, then reports single-query p50/p99 latency and, for the
+approximate index, recall@k against the exact result.
+
+Usage: python benchmarks/bench_similarity.py [--models DIR] [--docs 20000 100000] [--k 10]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import load_app, make_topic_corpus
+import similarity
+
+
+def latencies(index, queries, k):
+    out, rows = [], []
+    for i in range(queries.shape[0]):
+        start = time.perf_counter()
+        _, r = index.query(queries[i], k)
+        out.append(time.perf_counter() - start)
+        rows.append(r[0])
+    lat = np.array(out) * 1000
+    return np.percentile(lat, 50), np.percentile(lat, 99), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', help='artifact directory (default: train synthetic artifacts)')
+    parser.add_argument('--docs', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[4, 8, 16])
+    args = parser.parse_args()
+
+    api = load_app(args.models)
+    print(f"{'docs':>8} {'index':>12} {'build s':>8} {'MB':>7} {'p50 ms':>8} {'p99 ms':>8} {'recall':>7}")
+    for n_docs in args.docs:
+        matrix = api.VECTORIZER.transform(make_topic_corpus(n_docs, seed=1))
+        queries = api.VECTORIZER.transform(make_topic_corpus(args.queries, seed=2))
+
+        exact = similarity.ExactIndex(matrix)
+        p50, p99, truth = latencies(exact, queries, args.k)
+        print(f"{n_docs:>8} {'exact':>12} {exact.build_seconds:>8.2f} {exact.stats()['bytes'] / 2**20:>7.1f} "
+              f"{p50:>8.2f} {p99:>8.2f} {1.0:>7.3f}")
+
+        approx = similarity.ApproxIndex(matrix)
+        for n_probe in args.n_probe:
+            approx.n_probe = n_probe
+            p50, p99, rows = latencies(approx, queries, args.k)
+            recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(truth, rows)])
+            print(f"{n_docs:>8} {f'approx/{n_probe}':>12} {approx.build_seconds:>8.2f} "
+                  f"{approx.stats()['bytes'] / 2**20:>7.1f} {p50:>8.2f} {p99:>8.2f} {recall:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Load and scan times of project corpora as CSV versus Parquet.
+
+Writes the same corpus as CSV and as Parquet (storage.write_corpus) and
+times the reads the scripts do: the whole table, `Description` only
+(training / weak labeling), `Country` + score columns (rollups) and a
+streaming pass over `Description` in row-group batches.
+
+Usage: python benchmarks/bench_storage.py [--rows 200000] [--csv WORLD_BANK_EXPORT.csv]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_topic_corpus
+import storage
+
+SCORE_COLUMNS = ['E', 'S', 'G'] + [f'SDG{i}' for i in range(1, 18)]
+
+
+def make_export(n_rows, seed=0):
+    """A World Bank projects export lookalike: ids, countries, years, text and scores."""
+    rng = np.random.default_rng(seed)
+    countries = np.array([f"Country {i}" for i in range(140)])
+    df = pd.DataFrame({
+        'ProjectID': [f"P{i:06d}" for i in range(n_rows)],
+        'Country': countries[rng.integers(len(countries), size=n_rows)],
+        'Region': rng.choice(['Africa', 'East Asia and Pacific', 'Europe and Central Asia', 'Latin America',
+                              'Middle East and North Africa', 'South Asia'], n_rows),
+        'Year': rng.integers(1990, 2026, size=n_rows),
+        'Status': rng.choice(['Active', 'Closed', 'Pipeline', 'Dropped'], n_rows),
+        'Description': make_topic_corpus(n_rows, seed=seed),
+    })
+    for col in SCORE_COLUMNS:
+        df[col] = rng.random(n_rows).round(4)
+    return df
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--csv', help='benchmark this CSV export instead of a synthetic one')
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix='wbg-storage-')
+    csv_path = os.path.join(out_dir, 'projects.csv')
+    pq_path = os.path.join(out_dir, 'projects.parquet')
+    df = pd.read_csv(args.csv) if args.csv else make_export(args.rows)
+    print(f"{len(df)} rows, columns: {', '.join(df.columns)}")
+
+    writes = {'csv': timed(lambda: storage.write_corpus(df, csv_path), 1),
+              'parquet': timed(lambda: storage.write_corpus(df, pq_path), 1)}
+    score_cols = ['Country'] + [c for c in SCORE_COLUMNS if c in df.columns]
+
+    def stream(path):
+        return sum(len(batch) for batch in storage.iter_corpus(path, ['Description']))
+
+    reads = [
+        ('full table', lambda p: storage.read_corpus(p)),
+        ('Description only', lambda p: storage.read_corpus(p, ['Description'])),
+        ('Country + scores', lambda p: storage.read_corpus(p, score_cols)),
+        ('stream Description', stream),
+    ]
+    print(f"{'':>20} {'csv':>10} {'parquet':>10} {'speedup':>8}")
+    print(f"{'size MB':>20} {os.path.getsize(csv_path) / 2**20:>10.1f} {os.path.getsize(pq_path) / 2**20:>10.1f}")
+    print(f"{'write s':>20} {writes['csv']:>10.2f} {writes['parquet']:>10.2f} {writes['csv'] / writes['parquet']:>7.1f}x")
+    for name, read in reads:
+        t_csv = timed(lambda: read(csv_path))
+        t_pq = timed(lambda: read(pq_path))
+        print(f"{name + ' s':>20} {t_csv:>10.3f} {t_pq:>10.3f} {t_csv / t_pq:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
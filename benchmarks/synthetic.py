@@ -0,0 +1,84 @@
+"""Synthetic corpus and model artifacts for the benchmark scripts.
+
+The real artifacts are stored with Git LFS and may not be checked out, so the
+benchmarks train a production-shaped artifact set (TfidfVectorizer with a
+5000-term vocabulary, MultiOutputRegressor(LinearRegression) heads for 3 ESG
+and 17 SDG targets) on a generated corpus and point `app` at it.
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+TOPIC_WORDS = ("renewable energy solar wind climate carbon reduction water sanitation forest biodiversity "
+               "community development poverty reduction education health women gender training jobs "
+               "transparency initiative governance policy regulation anti-corruption accountability "
+               "infrastructure urban housing transport agriculture food nutrition ocean marine partnership").split()
+
+
+def make_corpus(n_docs=2000, words_per_doc=120, vocab_size=8000, seed=0):
+    """Return a list of `n_docs` pseudo project abstracts."""
+    rng = np.random.default_rng(seed)
+    filler = np.array([f"term{i}" for i in range(vocab_size)] + TOPIC_WORDS)
+    # Zipf-like word frequencies, like real abstracts
+    weights = 1.0 / np.arange(1, len(filler) + 1)
+    weights /= weights.sum()
+    docs = []
+    for _ in range(n_docs):
+        n = max(5, int(rng.normal(words_per_doc, words_per_doc / 4)))
+        docs.append(' '.join(rng.choice(filler, size=n, p=weights)))
+    return docs
+
+
+def make_topic_corpus(n_docs=20000, n_topics=200, words_per_doc=120, vocab_size=8000, seed=0):
+    """Return `n_docs` abstracts drawn from `n_topics` topic word distributions.
+    Unlike `make_corpus`, documents of one topic share vocabulary, as real
+    project abstracts do, which is what nearest-neighbour indexes rely on.
+    """
+    rng = np.random.default_rng(seed)
+    filler = np.array([f"term{i}" for i in range(vocab_size)] + TOPIC_WORDS)
+    background = 1.0 / np.arange(1, len(filler) + 1)
+    background /= background.sum()
+    docs = []
+    topic_words = [rng.choice(len(filler), size=40, replace=False) for _ in range(n_topics)]
+    for _ in range(n_docs):
+        topic = topic_words[rng.integers(n_topics)]
+        n = max(5, int(rng.normal(words_per_doc, words_per_doc / 4)))
+        n_topic = rng.binomial(n, 0.4)
+        words = np.concatenate([rng.choice(len(filler), size=n - n_topic, p=background), rng.choice(topic, size=n_topic)])
+        docs.append(' '.join(filler[words]))
+    return docs
+
+
+def build_artifacts(out_dir=None, n_docs=2000, max_features=5000, seed=0):
+    """Train and save vectorizer.pkl, esg_regression.pkl, sdg_regression.pkl; return the directory."""
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LinearRegression
+    from sklearn.multioutput import MultiOutputRegressor
+
+    out_dir = out_dir or tempfile.mkdtemp(prefix='wbg-bench-')
+    docs = make_corpus(n_docs, seed=seed)
+    rng = np.random.default_rng(seed)
+    vectorizer = TfidfVectorizer(max_features=max_features)
+    X = vectorizer.fit_transform(docs)
+    joblib.dump(vectorizer, os.path.join(out_dir, 'vectorizer.pkl'))
+    joblib.dump(MultiOutputRegressor(LinearRegression()).fit(X, rng.random((n_docs, 3))),
+                os.path.join(out_dir, 'esg_regression.pkl'))
+    joblib.dump(MultiOutputRegressor(LinearRegression()).fit(X, rng.random((n_docs, 17))),
+                os.path.join(out_dir, 'sdg_regression.pkl'))
+    return out_dir
+
+
+def load_app(models_dir=None):
+    """Import `app` with its model search path pointed at `models_dir` (built if omitted)."""
+    import app as api
+    models_dir = models_dir or build_artifacts()
+    api.MODEL_PATHS[:] = [models_dir]
+    api.try_load_models()
+    return api
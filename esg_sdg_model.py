@@ -5,6 +5,8 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.multioutput import MultiOutputRegressor
 from sklearn.linear_model import LinearRegression
 
+from weak_labels import score_esg
+
 print('✅ Libraries loaded')
 
 # Create sample data
@@ -32,14 +34,6 @@ print('✅ Data downloaded and saved')
 
 # Generate ESG scores
 print('\nGenerating ESG scores...')
-def score_esg(text):
-    text = str(text).lower()
-    E_keywords = ['renewable','solar','wind','climate','water','carbon','forest','pollution','sustainability']
-    S_keywords = ['education','health','community','women','youth','poverty','training','employment','social','housing']
-    G_keywords = ['governance','transparency','policy','regulation','anti-corruption','institution','audit','compliance','reform']
-    def calc_score(keywords): return round(min(1, sum(w in text for w in keywords) / 5), 2)
-    return calc_score(E_keywords), calc_score(S_keywords), calc_score(G_keywords)
-
 df[['E','S','G']] = df['Description'].apply(lambda x: pd.Series(score_esg(x)))
 df.to_csv('projects_scored.csv', index=False)
 print('✅ ESG scores generated and saved')
@@ -0,0 +1,204 @@
+"""Accuracy versus latency and memory of candidate model artifact sets.
+
+    python evaluate.py data/projects.csv models/ sweeps/best/ small=sweeps/small/ -o eval.csv
+
+Each candidate is a directory holding vectorizer.pkl, esg_regression.pkl
+and (optionally) sdg_regression.pkl, named `name=dir` or by its directory.
+All candidates are scored on the same fixed held-out split as sweep.py
+(seeded permutation, `--test-size`, `--seed`), so sweep winners are
+evaluated on documents they were not trained on. One table row per
+candidate reports:
+
+* MAE and R^2 per target against the keyword weak labels (weak_labels.py),
+  plus their means over the ESG and SDG targets;
+* agreement with the API keyword scorer (app.calculate_esg_scores):
+  Pearson correlation and MAE of E/S/G;
+* artifact bytes on disk and in memory (footprint.py), median load time;
+* p50/p99 single-description latency (transform + predict) and batch
+  throughput in descriptions per second.
+
+Candidates without sdg_regression.pkl are scored on the 3 ESG targets only
+(`targets` is 'esg', else 'all'), so their mean MAE is not comparable with
+that of full 20-target sets. The `pareto` column marks candidates that no
+other candidate with the same targets beats on mean MAE, p50 latency and
+memory together; `pareto_esg` compares every candidate on the shared ESG
+targets (ESG MAE, latency, memory).
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+import footprint
+import storage
+import weak_labels
+from sweep import split_indices
+
+ARTIFACTS = (('vectorizer', 'vectorizer.pkl'), ('esg', 'esg_regression.pkl'), ('sdg', 'sdg_regression.pkl'))
+ESG_NAMES = ('Environmental', 'Social', 'Governance')
+PARETO_OBJECTIVES = ('mae', 'latency_p50_ms', 'memory_bytes')
+ESG_PARETO_OBJECTIVES = ('esg_mae', 'latency_p50_ms', 'memory_bytes')
+
+
+def parse_candidate(value):
+    name, sep, path = value.partition('=')
+    if not sep:
+        path = name
+        name = os.path.basename(os.path.normpath(path)) or path
+    return name, path
+
+
+def load_artifacts(path, repeat=3):
+    """({'vectorizer', 'esg', 'sdg'} objects, median load seconds); 'sdg' is None if absent."""
+    times, loaded = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        loaded = {key: joblib.load(os.path.join(path, name)) if os.path.exists(os.path.join(path, name)) else None
+                  for key, name in ARTIFACTS}
+        times.append(time.perf_counter() - started)
+    if loaded['vectorizer'] is None or loaded['esg'] is None:
+        raise SystemExit(f"{path}: vectorizer.pkl and esg_regression.pkl are required")
+    return loaded, float(np.median(times))
+
+
+def predict(models, texts):
+    vec = models['vectorizer'].transform(texts)
+    esg = np.asarray(models['esg'].predict(vec)).reshape(len(texts), -1)
+    sdg = np.asarray(models['sdg'].predict(vec)).reshape(len(texts), -1) if models['sdg'] is not None else None
+    return esg, sdg
+
+
+def _r2(y, pred):
+    ss_tot = ((y - y.mean(axis=0)) ** 2).sum(axis=0)
+    ss_res = ((y - pred) ** 2).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+
+
+def _pearson(a, b):
+    if a.std() == 0 or b.std() == 0:
+        return np.nan
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def accuracy(esg, sdg, labels, keyword_esg):
+    """Per-target and mean MAE / R^2 against weak labels, and agreement with the keyword scorer."""
+    row = {'targets': 'all' if sdg is not None else 'esg'}
+    n_esg = len(weak_labels.ESG_COLUMNS)
+    columns, preds, truth = list(weak_labels.ESG_COLUMNS), [esg[:, :n_esg]], [labels[:, :n_esg]]
+    if sdg is not None:
+        columns += weak_labels.SDG_COLUMNS
+        preds.append(sdg)
+        truth.append(labels[:, n_esg:])
+    pred, y = np.hstack(preds), np.hstack(truth)
+    mae = np.abs(pred - y).mean(axis=0)
+    r2 = _r2(y, pred)
+    row['mae'] = float(mae.mean())
+    row['r2'] = float(np.nanmean(r2)) if not np.isnan(r2).all() else np.nan
+    row['esg_mae'] = float(mae[:n_esg].mean())
+    if sdg is not None:
+        row['sdg_mae'] = float(mae[n_esg:].mean())
+    for i, col in enumerate(columns):
+        row[f'mae_{col}'] = float(mae[i])
+        row[f'r2_{col}'] = float(r2[i])
+    for i, col in enumerate(weak_labels.ESG_COLUMNS):
+        row[f'kw_corr_{col}'] = _pearson(esg[:, i], keyword_esg[:, i])
+    row['kw_mae'] = float(np.abs(esg[:, :n_esg] - keyword_esg).mean())
+    return row
+
+
+def latency(models, texts, batch_size):
+    """(p50 ms, p99 ms) of one description at a time and batch throughput (descriptions / s)."""
+    samples = []
+    for text in texts:
+        started = time.perf_counter()
+        predict(models, [text])
+        samples.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        predict(models, texts[start:start + batch_size])
+    elapsed = time.perf_counter() - started
+    p50, p99 = np.percentile(samples, [50, 99]) * 1000
+    return float(p50), float(p99), len(texts) / elapsed if elapsed > 0 else float('inf')
+
+
+def memory_bytes(models):
+    vec = footprint.vectorizer_footprint(models['vectorizer']) or {}
+    total = vec.get('vocabulary_bytes', 0) + vec.get('idf', {}).get('bytes', 0)
+    for key in ('esg', 'sdg'):
+        head = footprint.model_footprint(models[key])
+        if head:
+            total += head['coef_bytes'] + head['intercept_bytes']
+    return int(total)
+
+
+def pareto_front(rows, objectives=PARETO_OBJECTIVES, group='targets'):
+    """Flag per row: True unless another row of the same `group` (None: any row)
+    is no worse on every objective and better on one.
+    """
+    values = np.array([[row[o] for o in objectives] for row in rows], dtype=float)
+    groups = np.array([row[group] if group else '' for row in rows])
+    flags = []
+    for v, g in zip(values, groups):
+        dominated = np.any((groups == g) & np.all(values <= v, axis=1) & np.any(values < v, axis=1))
+        flags.append(not dominated)
+    return flags
+
+
+def evaluate(candidates, texts, batch_size=256, latency_samples=300):
+    """One result row per (name, path) candidate on `texts` (the held-out documents)."""
+    import app as api
+
+    labels = weak_labels.label_matrix(texts)
+    keyword_esg = np.array([[api.calculate_esg_scores(t)[0][name] for name in ESG_NAMES] for t in texts])
+    rows = []
+    for name, path in candidates:
+        models, load_s = load_artifacts(path)
+        esg, sdg = predict(models, texts)
+        p50, p99, throughput = latency(models, texts[:latency_samples], batch_size)
+        disk = sum(footprint.file_size(os.path.join(path, f)) or 0 for _, f in ARTIFACTS)
+        rows.append({'candidate': name, **accuracy(esg, sdg, labels, keyword_esg),
+                     'disk_bytes': disk, 'memory_bytes': memory_bytes(models), 'load_s': load_s,
+                     'latency_p50_ms': p50, 'latency_p99_ms': p99, 'throughput_per_s': throughput})
+        print(f"Evaluated {name}: mae={rows[-1]['mae']:.4f} p50={p50:.2f}ms")
+    for row, flag, esg_flag in zip(rows, pareto_front(rows), pareto_front(rows, ESG_PARETO_OBJECTIVES, None)):
+        row['pareto'] = flag
+        row['pareto_esg'] = esg_flag
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare model artifact sets on accuracy, latency and memory')
+    parser.add_argument('input', help='CSV or Parquet corpus with a Description column')
+    parser.add_argument('candidates', nargs='+', type=parse_candidate, help='artifact directories, optionally name=dir')
+    parser.add_argument('-o', '--output', help='also write the table to this CSV or Parquet file')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--latency-samples', type=int, default=300)
+    parser.add_argument('--all-targets', action='store_true', help='print per-target MAE/R^2 columns too')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    texts = storage.read_corpus(args.input, columns=['Description'])['Description'].fillna('').astype(str).tolist()
+    _, test = split_indices(len(texts), args.test_size, args.seed)
+    rows = evaluate(args.candidates, [texts[i] for i in test], args.batch_size, args.latency_samples)
+
+    table = pd.DataFrame(rows).sort_values(['targets', 'pareto', 'mae'],
+                                           ascending=[True, False, True]).reset_index(drop=True)
+    if args.output:
+        storage.write_corpus(table, args.output)
+        print(f"Wrote {args.output}")
+    shown = table if args.all_targets else table[[c for c in table.columns
+                                                  if not c.startswith(('mae_', 'r2_'))]]
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(shown.round(4).to_string())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
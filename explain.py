@@ -0,0 +1,86 @@
+"""Per-term explanations for the linear ESG and SDG heads.
+
+Both heads are linear in the TF-IDF features, so every prediction decomposes
+exactly into ``intercept[t] + sum_j x[j] * coef[t, j]`` over the non-zero
+features of the row. The top contributing n-grams of a row are the largest
+entries of ``x[j] * coef[t, j]``; they are computed here from the sparse
+matrix the prediction already used, for all targets at once, so an
+explanation costs one gather over the row's non-zeros and no second
+vectorizer transform.
+"""
+import numpy as np
+
+
+def linear_head_params(model):
+    """Return (coef, intercept) of a linear head as (n_targets, n_features) and (n_targets,) arrays.
+    Handles a MultiOutputRegressor over linear estimators as well as natively
+    multi-output linear models; returns None for a head that is not linear.
+    """
+    estimators = getattr(model, 'estimators_', None) or [model]
+    coefs, intercepts = [], []
+    for est in estimators:
+        coef = getattr(est, 'coef_', None)
+        if coef is None:
+            return None
+        coef = np.atleast_2d(np.asarray(coef, dtype=float))
+        coefs.append(coef)
+        intercept = np.atleast_1d(np.asarray(getattr(est, 'intercept_', 0.0), dtype=float))
+        intercepts.append(np.broadcast_to(intercept, (coef.shape[0],)))
+    return np.vstack(coefs), np.concatenate(intercepts)
+
+
+class LinearExplainer:
+    """Top contributing features of a linear head for rows of a sparse TF-IDF matrix."""
+
+    def __init__(self, model):
+        params = linear_head_params(model)
+        if params is None:
+            raise ValueError(f"{type(model).__name__} is not a linear model")
+        coef, self.intercept = params
+        # (n_features, n_targets), so a row's non-zero features gather contiguously
+        self.coef_t = np.ascontiguousarray(coef.T)
+
+    def top_terms(self, matrix, top_k):
+        """Return (features, contributions), both of shape (n_rows, n_targets, top_k).
+        Features are column indices ordered by decreasing contribution; rows with
+        fewer than `top_k` non-zeros are padded with -1 and 0.0.
+        """
+        matrix = matrix.tocsr()
+        n_rows, n_targets = matrix.shape[0], self.coef_t.shape[1]
+        features = np.full((n_rows, n_targets, top_k), -1, dtype=np.int64)
+        contributions = np.zeros((n_rows, n_targets, top_k))
+        # x_j * coef[t, j] for every stored entry of the matrix and every target
+        contrib = matrix.data[:, np.newaxis] * self.coef_t[matrix.indices]
+        indptr, indices = matrix.indptr, matrix.indices
+        for i in range(n_rows):
+            start, end = indptr[i], indptr[i + 1]
+            nnz = end - start
+            if nnz == 0:
+                continue
+            block = contrib[start:end]
+            k = min(top_k, nnz)
+            if k < nnz:
+                part = np.argpartition(-block, k - 1, axis=0)[:k]
+            else:
+                part = np.broadcast_to(np.arange(nnz)[:, np.newaxis], block.shape)
+            vals = np.take_along_axis(block, part, axis=0)
+            order = np.argsort(-vals, axis=0, kind='stable')
+            part = np.take_along_axis(part, order, axis=0)
+            features[i, :, :k] = indices[start:end][part].T
+            contributions[i, :, :k] = np.take_along_axis(vals, order, axis=0).T
+        return features, contributions
+
+
+def format_terms(feature_names, features, contributions, compact):
+    """Format one row of one head, (n_targets, k) arrays, for a response.
+    Full: a list per target of {"term", "contribution"}; compact: parallel
+    `terms` and `contributions` lists per target.
+    """
+    terms = [feature_names[f[f >= 0]].tolist() for f in features]
+    values = [np.round(c[f >= 0], 4) for f, c in zip(features, contributions)]
+    if compact:
+        return {"terms": terms, "contributions": values}
+    return [
+        [{"term": t, "contribution": v} for t, v in zip(row_terms, row_values.tolist())]
+        for row_terms, row_values in zip(terms, values)
+    ]
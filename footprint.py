@@ -0,0 +1,140 @@
+"""Memory footprint of the loaded artifacts and of the worker process.
+
+Everything here is read-only and cheap: artifact sizes come from array
+`nbytes` and the vocabulary dict, process numbers from /proc/self/smaps_rollup
+(falling back to psutil, then to `resource`). Callers are expected to cache
+the result; see `models_status` in app.py.
+"""
+import os
+import sys
+import tracemalloc
+
+
+def file_size(path):
+    """Size in bytes of `path`, or None if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _array_info(arr):
+    return {"shape": list(arr.shape), "dtype": str(arr.dtype), "bytes": int(arr.nbytes)}
+
+
+def vectorizer_footprint(vectorizer):
+    """Vocabulary size and bytes, and IDF array size, of a fitted TfidfVectorizer."""
+    if vectorizer is None:
+        return None
+    report = {"type": type(vectorizer).__name__}
+    vocab = getattr(vectorizer, 'vocabulary_', None)
+    if vocab is not None:
+        vocab_bytes = sys.getsizeof(vocab) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in vocab.items())
+        report["vocabulary_entries"] = len(vocab)
+        report["vocabulary_bytes"] = vocab_bytes
+    idf = getattr(vectorizer, 'idf_', None)
+    if idf is not None:
+        report["idf"] = _array_info(idf)
+    stop_words = getattr(vectorizer, 'stop_words_', None)
+    if stop_words:
+        # kept only for introspection; can be dropped from the artifact to save memory
+        report["stop_words_entries"] = len(stop_words)
+        report["stop_words_bytes"] = sys.getsizeof(stop_words) + sum(sys.getsizeof(w) for w in stop_words)
+    return report
+
+
+def model_footprint(model):
+    """Estimator count and coefficient/intercept bytes and dtypes of a (multi-output) linear head."""
+    if model is None:
+        return None
+    estimators = getattr(model, 'estimators_', None) or [model]
+    coef_bytes = intercept_bytes = 0
+    dtypes = set()
+    for est in estimators:
+        # quantized heads (quantize.py) keep their stored kernel and scales apart from the coef_ view
+        coef = getattr(est, 'kernel_', None)
+        if coef is None:
+            coef = getattr(est, 'coef_', None)
+        if coef is not None:
+            coef_bytes += coef.nbytes
+            dtypes.add(str(coef.dtype))
+        scale = getattr(est, 'scale_', None)
+        if scale is not None:
+            coef_bytes += scale.nbytes
+        intercept = getattr(est, 'intercept_', None)
+        if intercept is not None and hasattr(intercept, 'nbytes'):
+            intercept_bytes += intercept.nbytes
+    return {
+        "type": type(model).__name__,
+        "n_estimators": len(estimators),
+        "n_features": getattr(model, 'n_features_in_', None),
+        "coef_bytes": int(coef_bytes),
+        "intercept_bytes": int(intercept_bytes),
+        "coef_dtypes": sorted(dtypes),
+    }
+
+
+def _smaps_rollup():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    shared = fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        "source": "smaps_rollup",
+        "rss_bytes": fields.get('Rss'),
+        "pss_bytes": fields.get('Pss'),
+        "uss_bytes": private,
+        "shared_bytes": shared,
+        "private_bytes": private,
+        "swap_bytes": fields.get('Swap'),
+    }
+
+
+def process_memory():
+    """RSS/PSS/USS and shared vs private bytes of this worker process."""
+    try:
+        return _smaps_rollup()
+    except OSError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_full_info()
+        return {
+            "source": "psutil",
+            "rss_bytes": info.rss,
+            "pss_bytes": getattr(info, 'pss', None),
+            "uss_bytes": getattr(info, 'uss', None),
+            "shared_bytes": getattr(info, 'shared', None),
+            "private_bytes": getattr(info, 'uss', None),
+            "swap_bytes": getattr(info, 'swap', None),
+        }
+    except Exception:
+        pass
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return {"source": "getrusage", "max_rss_bytes": maxrss if sys.platform == 'darwin' else maxrss * 1024}
+    except Exception:
+        return {"source": None}
+
+
+def tracemalloc_top(limit):
+    """Top `limit` allocation sites by size, if tracemalloc is tracing (else None)."""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics('lineno')[:limit]
+        ],
+    }
@@ -0,0 +1,24 @@
+"""Gunicorn settings for the threaded (async) serving mode.
+
+    gunicorn -c gunicorn_async.conf.py app:app
+
+gthread workers accept many connections per process, while scoring itself
+runs on a small fixed-size executor per worker (see admission.py). When the
+executor and its queue are full, extra requests get an immediate 429 with
+Retry-After instead of waiting for the 120s worker timeout.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Inherited by the workers, read by app.py at import time
+os.environ.setdefault('INFERENCE_WORKERS', '2')
+os.environ.setdefault('INFERENCE_QUEUE_SIZE', '16')
+os.environ.setdefault('INFERENCE_TIMEOUT', '30')
+os.environ.setdefault('PRELOAD_MODELS', '1')
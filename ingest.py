@@ -0,0 +1,234 @@
+"""Resumable, parallel ingestion of World Bank project dumps.
+
+Works from local dump files instead of live API calls:
+
+* paged JSON responses of the projects API (``{"projects": {...}}`` or a
+  list of project objects), one page per file, or JSON Lines;
+* CSV exports such as World_Bank_Projects_and_Operations.csv, read in
+  chunks of the columns that are needed.
+
+Files are parsed in a process pool (in file order, so results are
+deterministic). Every record becomes (ProjectID, Country, Year, Description)
+with `Description` normalized from abstract + project name; a content hash
+per record is kept in the checkpoint, so only new or changed records are
+written. Output goes to numbered Parquet shards under `<out>/shards/`, and
+the checkpoint is rewritten after each shard, so an interrupted run resumes
+with the files it had not finished and a new dump only adds its changes.
+
+    python ingest.py dumps/*.json dumps/operations.csv -o data/ingest --workers 4
+    python ingest.py dumps/ -o data/ingest --materialize data/projects.parquet
+"""
+import argparse
+import glob
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import storage
+
+COLUMNS = ('ProjectID', 'Country', 'Year', 'Description')
+ID_FIELDS = ('id', 'projectid', 'proj_id', 'ProjectID')
+COUNTRY_FIELDS = ('countryname', 'countryshortname', 'country', 'Country')
+ABSTRACT_FIELDS = ('project_abstract.cdata', 'project_abstract', 'Description', 'description')
+NAME_FIELDS = ('project_name', 'projectname', 'ProjectName')
+DATE_FIELDS = ('boardapprovaldate', 'board_approval_date', 'approvaldate')
+YEAR_FIELDS = ('approvalfy', 'fiscalyear', 'Year')
+CSV_FIELDS = set(ID_FIELDS + COUNTRY_FIELDS + ABSTRACT_FIELDS + NAME_FIELDS + DATE_FIELDS + YEAR_FIELDS)
+CSV_CHUNK_ROWS = 50_000
+DUMP_EXTENSIONS = ('.json', '.jsonl', '.ndjson', '.csv')
+
+_TAG = re.compile(r'<[^>]+>')
+_SPACE = re.compile(r'\s+')
+_YEAR = re.compile(r'(19|20)\d\d')
+
+
+def normalize_text(value):
+    """Plain single-spaced text from an API/CSV field (HTML entities and tags removed)."""
+    if value is None or value != value:  # None or NaN
+        return ''
+    if isinstance(value, dict):  # API objects such as {"cdata": "..."}
+        value = value.get('cdata', '')
+    if isinstance(value, (list, tuple)):
+        value = ' '.join(str(v) for v in value)
+    return _SPACE.sub(' ', _TAG.sub(' ', html.unescape(str(value)))).strip()
+
+
+def _first(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if value is not None and value == value and value != '':
+            return value
+    return None
+
+
+def normalize_record(record):
+    """(ProjectID, Country, Year, Description) for one raw project, or None without id/text."""
+    project_id = normalize_text(_first(record, ID_FIELDS))
+    abstract = normalize_text(_first(record, ABSTRACT_FIELDS))
+    name = normalize_text(_first(record, NAME_FIELDS))
+    description = f"{abstract} {name}".strip() if name and name not in abstract else abstract or name
+    if not project_id or not description:
+        return None
+    country = _first(record, COUNTRY_FIELDS)
+    if isinstance(country, (list, tuple)):
+        country = country[0] if country else None
+    country = normalize_text(country).split(';')[0].strip() or None
+    year_match = _YEAR.search(normalize_text(_first(record, YEAR_FIELDS) or _first(record, DATE_FIELDS)))
+    return project_id, country, int(year_match.group()) if year_match else None, description
+
+
+def record_hash(row):
+    return hashlib.sha1('\x1f'.join('' if v is None else str(v) for v in row).encode('utf-8')).hexdigest()[:16]
+
+
+def _json_records(path):
+    with open(path, encoding='utf-8') as fh:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(fh)
+    projects = data.get('projects', data) if isinstance(data, dict) else data
+    yield from (projects.values() if isinstance(projects, dict) else projects)
+
+
+def _csv_records(path):
+    import pandas as pd
+    for chunk in pd.read_csv(path, usecols=lambda c: c in CSV_FIELDS, dtype=str, chunksize=CSV_CHUNK_ROWS):
+        yield from chunk.to_dict('records')
+
+
+def parse_file(path):
+    """Normalized rows of one dump file, last occurrence per ProjectID, each with its content hash."""
+    records = _csv_records(path) if path.endswith('.csv') else _json_records(path)
+    rows = {}
+    for record in records:
+        row = normalize_record(record)
+        if row is not None:
+            rows[row[0]] = row
+    return [(row, record_hash(row)) for row in rows.values()]
+
+
+def file_state(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def find_dumps(inputs):
+    """Dump files named by `inputs` (files, directories or glob patterns), sorted."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, f) for f in files if f.endswith(DUMP_EXTENSIONS))
+        else:
+            paths.update(p for p in glob.glob(item) if p.endswith(DUMP_EXTENSIONS))
+    return sorted(os.path.abspath(p) for p in paths)
+
+
+class Checkpoint:
+    """Ingestion state: finished files, record hashes by ProjectID and written shards."""
+
+    def __init__(self, out_dir):
+        self.path = os.path.join(out_dir, 'checkpoint.json')
+        self.shard_dir = os.path.join(out_dir, 'shards')
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self.state = {'files': {}, 'records': {}, 'shards': []}
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as fh:
+                self.state = json.load(fh)
+
+    def unchanged(self, path):
+        return self.state['files'].get(path) == file_state(path)
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(self.state, fh)
+        os.replace(tmp, self.path)
+
+    def write_shard(self, rows, files):
+        """Write `rows` as the next shard and mark `files` (with their current state) done."""
+        import pandas as pd
+        if rows:
+            name = f"part-{len(self.state['shards']):05d}.parquet"
+            df = pd.DataFrame([row for row, _ in rows], columns=COLUMNS).astype({'Year': 'Int64'})
+            storage.write_corpus(df, os.path.join(self.shard_dir, name))
+            self.state['shards'].append(name)
+            for row, digest in rows:
+                self.state['records'][row[0]] = digest
+        for path in files:
+            self.state['files'][path] = file_state(path)
+        self.save()
+
+
+def ingest(inputs, out_dir, workers=None, shard_rows=50_000):
+    """Ingest dump files into shards under `out_dir`; returns a summary dict."""
+    checkpoint = Checkpoint(out_dir)
+    paths = find_dumps(inputs)
+    todo = [p for p in paths if not checkpoint.unchanged(p)]
+    summary = {'files': len(paths), 'files_skipped': len(paths) - len(todo), 'records': 0,
+               'new': 0, 'changed': 0, 'unchanged': 0, 'shards': 0}
+    pending, pending_files, seen = {}, [], dict(checkpoint.state['records'])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, rows in zip(todo, pool.map(parse_file, todo)):
+            for row, digest in rows:
+                summary['records'] += 1
+                previous = seen.get(row[0])
+                if previous == digest:
+                    summary['unchanged'] += 1
+                    continue
+                summary['changed' if previous is not None else 'new'] += 1
+                seen[row[0]] = digest
+                pending[row[0]] = (row, digest)  # a later file wins within the shard too
+            pending_files.append(path)
+            if len(pending) >= shard_rows:
+                checkpoint.write_shard(list(pending.values()), pending_files)
+                summary['shards'] += 1
+                pending, pending_files = {}, []
+    if pending or pending_files:
+        checkpoint.write_shard(list(pending.values()), pending_files)
+        summary['shards'] += bool(pending)
+    return summary
+
+
+def load_ingested(out_dir, columns=None):
+    """All shards as one DataFrame, latest version of each ProjectID."""
+    import pandas as pd
+    checkpoint = Checkpoint(out_dir)
+    frames = [storage.read_corpus(os.path.join(checkpoint.shard_dir, name), columns and ['ProjectID', *columns])
+              for name in checkpoint.state['shards']]
+    if not frames:
+        return pd.DataFrame(columns=list(columns or COLUMNS))
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop_duplicates('ProjectID', keep='last').reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ingest World Bank project dumps into columnar shards')
+    parser.add_argument('inputs', nargs='+', help='dump files, directories or glob patterns (.json/.jsonl/.csv)')
+    parser.add_argument('-o', '--out', default=os.path.join('data', 'ingest'), help='shard and checkpoint directory')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes (default: CPU count)')
+    parser.add_argument('--shard-rows', type=int, default=50_000)
+    parser.add_argument('--materialize', metavar='PATH',
+                        help='also write the deduplicated corpus to this CSV or Parquet file')
+    args = parser.parse_args(argv)
+
+    summary = ingest(args.inputs, args.out, args.workers, args.shard_rows)
+    print(f"Ingested {summary['files'] - summary['files_skipped']} of {summary['files']} files "
+          f"({summary['files_skipped']} unchanged): {summary['new']} new, {summary['changed']} changed, "
+          f"{summary['unchanged']} unchanged records in {summary['shards']} new shards")
+    if args.materialize:
+        df = load_ingested(args.out)
+        storage.write_corpus(df, args.materialize)
+        print(f"Wrote {len(df)} projects to {args.materialize}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Streaming helpers for scoring long project documents.
+
+Full appraisal documents can be hundreds of KB. Instead of lowercasing and
+tokenizing the whole string at once, text is walked in whitespace-aligned
+chunks: keyword phrases are matched per chunk (with a small overlap so phrases
+spanning a boundary are not missed; each match is reported for the chunk it
+ends in) and vocabulary counts are accumulated into a fixed-size array, so
+working memory is bounded by the chunk size and the vocabulary size rather than
+by the document length.
+"""
+import re
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+
+_WHITESPACE = (' ', '\n', '\t', '\r')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def iter_chunks(text, chunk_chars, start=0, end=None):
+    """Yield slices of text[start:end] of at most `chunk_chars` characters.
+    Cuts are moved back to the last whitespace so no token straddles two chunks
+    (a single token longer than `chunk_chars` is cut where it is).
+    """
+    end = len(text) if end is None else end
+    pos = start
+    while pos < end:
+        stop = min(end, pos + chunk_chars)
+        if stop < end:
+            cut = max(text.rfind(ws, pos, stop) for ws in _WHITESPACE)
+            if cut > pos:
+                stop = cut + 1
+        yield text[pos:stop]
+        pos = stop
+
+
+def split_sections(text, section_chars):
+    """Split `text` into (start, end) spans of roughly `section_chars` characters.
+    Paragraphs (blank-line separated) are grouped until a section is full;
+    paragraphs longer than a section are cut at whitespace.
+    """
+    spans = []
+    sec_start = 0
+    para_start = 0
+    breaks = [m.end() for m in _PARAGRAPH_BREAK.finditer(text)] + [len(text)]
+    for para_end in breaks:
+        if para_end - sec_start > section_chars and para_start > sec_start:
+            spans.append((sec_start, para_start))
+            sec_start = para_start
+        while para_end - sec_start > section_chars:
+            chunk = next(iter_chunks(text, section_chars, sec_start, para_end))
+            spans.append((sec_start, sec_start + len(chunk)))
+            sec_start += len(chunk)
+        para_start = para_end
+    if sec_start < len(text):
+        spans.append((sec_start, len(text)))
+    return spans
+
+
+class PhraseMatcher:
+    """Find which of a fixed set of lowercase phrases occur in a chunk stream.
+    Keeps the tail of the previous chunk so phrases spanning a boundary match.
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.overlap = max((len(t) for t in self.terms), default=1) - 1
+        self.found = set()
+        self._tail = ''
+
+    def feed(self, chunk):
+        """Match one chunk; returns the phrases with an occurrence ending in it."""
+        tail = self._tail
+        window = tail + chunk.lower()
+        # an occurrence starting at or after this index ends inside the new chunk
+        ends_after = len(tail) + 1
+        hits = {t for t in self.terms if window.find(t, max(0, ends_after - len(t))) >= 0}
+        self.found |= hits
+        self._tail = window[-self.overlap:] if self.overlap else ''
+        return hits
+
+
+def match_terms(chunks, terms):
+    """Return the subset of `terms` (lowercase phrases) found in the chunk stream.
+    Equivalent to `{t for t in terms if t in text.lower()}` without building the
+    lowercased copy of the whole text.
+    """
+    matcher = PhraseMatcher(terms)
+    for chunk in chunks:
+        matcher.feed(chunk)
+    return matcher.found
+
+
+class TermCounter:
+    """Accumulate term counts for a fitted TfidfVectorizer one chunk at a time.
+
+    `to_matrix()` returns the same 1 x n_features TF-IDF row that
+    `vectorizer.transform([whole_text])` would for word analyzers (n-grams that
+    span chunk boundaries are carried over). Other analyzers are applied per
+    chunk, which may miss character n-grams that cross a boundary.
+    """
+
+    def __init__(self, vectorizer):
+        self.vectorizer = vectorizer
+        self.vocabulary = vectorizer.vocabulary_
+        self.counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+        self.min_n, self.max_n = vectorizer.ngram_range
+        self._carry = []
+        if vectorizer.analyzer == 'word':
+            self._preprocess = vectorizer.build_preprocessor()
+            self._tokenize = vectorizer.build_tokenizer()
+            self._stop_words = vectorizer.get_stop_words()
+            self._analyze = None
+        else:
+            self._analyze = vectorizer.build_analyzer()
+
+    def _terms(self, chunk):
+        if self._analyze is not None:
+            return self._analyze(chunk)
+        tokens = self._tokenize(self._preprocess(chunk))
+        if self._stop_words is not None:
+            tokens = [t for t in tokens if t not in self._stop_words]
+        if self.max_n == 1:
+            return tokens
+        seq = self._carry + tokens
+        carried = len(self._carry)
+        terms = []
+        for n in range(self.min_n, self.max_n + 1):
+            # only n-grams ending in the new chunk; earlier ones were counted already
+            for i in range(max(0, carried - n + 1), len(seq) - n + 1):
+                terms.append(' '.join(seq[i:i + n]))
+        self._carry = seq[len(seq) - (self.max_n - 1):] if len(seq) >= self.max_n - 1 else seq
+        return terms
+
+    def feed(self, chunk):
+        """Count the vocabulary terms of one chunk."""
+        vocab = self.vocabulary
+        idx = [vocab[t] for t in self._terms(chunk) if t in vocab]
+        if idx:
+            self.counts += np.bincount(idx, minlength=len(self.counts))
+
+    def to_matrix(self):
+        """Return the accumulated counts as a TF-IDF weighted 1 x n_features CSR row."""
+        vec = self.vectorizer
+        cols = np.flatnonzero(self.counts)
+        data = self.counts[cols].astype(np.float64)
+        if vec.binary:
+            data[:] = 1.0
+        if vec.sublinear_tf:
+            data = np.log(data) + 1.0
+        if vec.use_idf:
+            data *= vec.idf_[cols]
+        row = csr_matrix((data.astype(vec.dtype), cols, [0, len(cols)]), shape=(1, len(self.counts)))
+        if vec.norm:
+            row = normalize(row, norm=vec.norm, copy=False)
+        return row
@@ -0,0 +1,136 @@
+"""Fit all targets of a linear head in one solve over the shared design matrix.
+
+`MultiOutputRegressor(LinearRegression())` clones one regressor per target
+and, on the sparse TF-IDF matrix, runs an independent lsqr solve for each:
+the 17 SDG targets re-read and re-center the same design matrix 17 times.
+All targets share the design matrix, so `fit_multi_target` solves them
+together:
+
+* 'cg': conjugate gradients on the normal equations for every
+  target in lockstep. Each iteration is one sparse product with the
+  (n_features, n_targets) block, reading the matrix once for all targets;
+  centering is applied implicitly, so the matrix is never densified.
+  Started from zero, it converges to the minimum-norm least-squares
+  solution, the one lsqr converges to.
+* 'direct': one factorization of the smaller of Xc^T Xc and Xc Xc^T
+  (+ alpha I). Cholesky is used, or an eigendecomposition (minimum norm)
+  when alpha = 0 and the matrix is singular. Dense and cubic in min(n, F),
+  so it only pays off for small problems.
+* 'lsqr': `LinearRegression(n_jobs=...)` on the 2-D target matrix, i.e.
+  the current per-target solves run in parallel from one centered operator.
+
+'auto' uses 'cg' from CG_MIN_TARGETS targets (or with alpha > 0), else 'lsqr'.
+
+The result is a plain fitted `LinearRegression` (alpha = 0) or `Ridge` with
+2-D `coef_`. It pickles, loads and predicts like any sklearn head (one
+`predict` for all targets), and explain.py / footprint.py read it
+unchanged. Predictions agree with the per-target fit up to the solvers'
+tolerance; see benchmarks/bench_multi_target.py.
+"""
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+from sklearn.linear_model import LinearRegression, Ridge
+
+SOLVERS = ('auto', 'cg', 'direct', 'lsqr')
+CG_MIN_TARGETS = 8  # below this, 'auto' uses the per-target lsqr solves (faster for few targets)
+
+
+def _dense(matrix):
+    return matrix.toarray() if sp.issparse(matrix) else np.asarray(matrix)
+
+
+def _solve_cg(X, Yc, mean, alpha, tol, max_iter):
+    """(n_features, n_targets) solution of (Xc^T Xc + alpha I) W = Xc^T Yc, all columns in lockstep."""
+    XT = X.T.tocsr() if sp.issparse(X) else X.T
+
+    def forward(P):  # Xc @ P
+        return X @ P - mean @ P
+
+    def backward(R):  # Xc^T @ R
+        return XT @ R - np.outer(mean, R.sum(axis=0))
+
+    W = np.zeros((X.shape[1], Yc.shape[1]))
+    R = Yc.copy()
+    S = backward(R)
+    P = S.copy()
+    gamma = (S * S).sum(axis=0)
+    stop = tol ** 2 * gamma
+    active = gamma > stop
+    for _ in range(max_iter or 2 * X.shape[1]):
+        if not active.any():
+            break
+        Q = forward(P)
+        delta = (Q * Q).sum(axis=0) + alpha * (P * P).sum(axis=0)
+        # converged targets get a zero step and keep their solution
+        step = np.where(active, gamma / np.where(delta > 0, delta, 1.0), 0.0)
+        W += step * P
+        R -= step * Q
+        S = backward(R) - alpha * W
+        gamma_new = (S * S).sum(axis=0)
+        active &= gamma_new > stop
+        P = S + np.where(active, gamma_new / np.where(gamma > 0, gamma, 1.0), 0.0) * P
+        gamma = gamma_new
+    return W
+
+
+def _solve_symmetric(gram, rhs, alpha):
+    """Solve gram @ W = rhs for all columns of rhs with one factorization of `gram` (overwritten)."""
+    gram.flat[::gram.shape[0] + 1] += alpha
+    try:
+        return scipy.linalg.cho_solve(scipy.linalg.cho_factor(gram), rhs)
+    except np.linalg.LinAlgError:
+        if alpha > 0:
+            raise
+    # singular (rank-deficient) least squares: minimum-norm solution
+    w, v = scipy.linalg.eigh(gram, overwrite_a=True)
+    inv = np.zeros_like(w)
+    keep = w > w.max() * len(w) * np.finfo(w.dtype).eps
+    inv[keep] = 1.0 / w[keep]
+    return v @ (inv[:, np.newaxis] * (v.T @ rhs))
+
+
+def _solve_direct(X, Yc, mean, alpha):
+    n, n_features = X.shape
+    if n >= n_features:
+        # Xc^T Xc = X^T X - n mean mean^T; Xc^T Yc = X^T Yc as the columns of Yc sum to 0
+        gram = _dense(X.T @ X) - n * np.outer(mean, mean)
+        return _solve_symmetric(gram, _dense(X.T @ Yc), alpha)
+    # dual: W = Xc^T (Xc Xc^T + alpha I)^-1 Yc
+    x_mean = np.asarray(X @ mean).ravel()
+    gram = _dense(X @ X.T) - x_mean[:, np.newaxis] - x_mean[np.newaxis, :] + mean @ mean
+    dual = _solve_symmetric(gram, Yc, alpha)
+    return _dense(X.T @ dual) - np.outer(mean, dual.sum(axis=0))
+
+
+def fit_multi_target(X, Y, alpha=0.0, solver='auto', n_jobs=None, tol=1e-6, max_iter=None):
+    """Fit a linear head with intercept for every column of `Y` (n_samples, n_targets).
+    Returns a fitted LinearRegression (alpha = 0) or Ridge (alpha > 0).
+    `tol` is the relative normal-equation residual at which 'cg' stops a
+    target; `n_jobs` parallelizes the 'lsqr' solver.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver!r}; expected one of {SOLVERS}")
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim != 2:
+        raise ValueError("Y must be a 2-D (n_samples, n_targets) array")
+    if solver == 'auto':
+        solver = 'lsqr' if alpha == 0 and Y.shape[1] < CG_MIN_TARGETS else 'cg'
+    if solver == 'lsqr':
+        if alpha > 0:
+            raise ValueError("solver='lsqr' fits LinearRegression only (alpha=0)")
+        return LinearRegression(n_jobs=n_jobs).fit(X, Y)
+
+    X = X.tocsr().astype(float) if sp.issparse(X) else np.asarray(X, dtype=float)
+    mean = np.asarray(X.mean(axis=0)).ravel()
+    y_mean = Y.mean(axis=0)
+    if solver == 'direct':
+        W = _solve_direct(X, Y - y_mean, mean, alpha)
+    else:
+        W = _solve_cg(X, Y - y_mean, mean, alpha, tol, max_iter)
+
+    model = Ridge(alpha=alpha) if alpha > 0 else LinearRegression()
+    model.coef_ = np.ascontiguousarray(W.T)
+    model.intercept_ = y_mean - model.coef_ @ mean
+    model.n_features_in_ = X.shape[1]
+    return model
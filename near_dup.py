@@ -0,0 +1,224 @@
+"""Near-duplicate detection for project descriptions (MinHash + LSH).
+
+Re-issued projects, additional financing and boilerplate variants produce
+descriptions that differ in a few words, so exact-match caching misses them.
+Each description is reduced to a MinHash signature over its word shingles;
+the fraction of equal signature slots estimates the Jaccard similarity of the
+shingle sets. An LSH index over signature bands finds candidate matches
+without comparing every pair.
+
+Used by `bulk_score.py` to score one representative per cluster and by the
+opt-in near-duplicate cache of the online service (see app.py).
+"""
+import collections
+import re
+import threading
+import zlib
+
+import numpy as np
+
+_TOKEN = re.compile(r'\w+')
+_PRIME = (1 << 31) - 1  # hashes are reduced mod p, so a*x+b fits in 64 bits
+_BLOCK = 4096
+
+
+def shingles(text, size=3):
+    """Set of lowercase word `size`-grams of `text` (the whole text if it is shorter)."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) <= size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures with `num_perm` universal hash functions (a*x + b mod p)."""
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.int64)[:, np.newaxis]
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.int64)[:, np.newaxis]
+
+    def signature(self, text):
+        """uint32 signature of `text`; an empty text gets an all-max signature."""
+        sig = np.full(self.num_perm, _PRIME, dtype=np.int64)
+        hashed = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles(text, self.shingle_size)),
+                             dtype=np.int64) % _PRIME
+        for start in range(0, len(hashed), _BLOCK):
+            block = hashed[np.newaxis, start:start + _BLOCK]
+            np.minimum(sig, ((self._a * block + self._b) % _PRIME).min(axis=1), out=sig)
+        return sig.astype(np.uint32)
+
+    def signatures(self, texts):
+        """(n_texts, num_perm) signature matrix."""
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            out[i] = self.signature(text)
+        return out
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+def lsh_params(num_perm, threshold):
+    """(bands, rows) with bands * rows == num_perm whose S-curve midpoint
+    (1/bands) ** (1/rows) is the highest one not above `threshold`, which
+    favours recall; candidates are verified against the threshold anyway.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    if below:
+        return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1]))
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class LSHIndex:
+    """Banded LSH index from keys to MinHash signatures."""
+
+    def __init__(self, num_perm=128, threshold=0.9):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        self._buckets = [collections.defaultdict(set) for _ in range(self.bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def add(self, key, sig):
+        self._signatures[key] = sig
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            bucket[band].add(key)
+
+    def remove(self, key):
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            members = bucket.get(band)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band]
+
+    def candidates(self, sig):
+        """Keys sharing at least one band with `sig`."""
+        found = set()
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            found.update(bucket.get(band, ()))
+        return found
+
+    def best_match(self, sig, threshold=None):
+        """(key, similarity) of the most similar indexed signature at or above
+        `threshold` (default: the index threshold), or None.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        best = None
+        for key in self.candidates(sig):
+            sim = similarity(sig, self._signatures[key])
+            if sim >= threshold and (best is None or sim > best[1]):
+                best = (key, sim)
+        return best
+
+
+def cluster(signatures, threshold=0.9):
+    """Assign every row of a signature matrix to a representative row.
+    Rows are visited in order; a row joins the most similar earlier
+    representative at or above `threshold`, else becomes a representative.
+    Every member is therefore within `threshold` of its own representative.
+    Returns an int array `rep` with rep[i] == i for representatives.
+    """
+    index = LSHIndex(signatures.shape[1], threshold)
+    reps = np.empty(len(signatures), dtype=np.int64)
+    for i, sig in enumerate(signatures):
+        match = index.best_match(sig)
+        if match is None:
+            index.add(i, sig)
+            reps[i] = i
+        else:
+            reps[i] = match[0]
+    return reps
+
+
+class NearDuplicateCache:
+    """Bounded LRU cache of results keyed by near-duplicate text.
+
+    Entries are tagged with the model version they were computed with; a
+    lookup under a different version drops the whole cache. Each entry keeps
+    the compute time it cost, so hits add up the compute saved.
+    """
+
+    def __init__(self, capacity, threshold=0.9, num_perm=128, shingle_size=3):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self._index = LSHIndex(num_perm, threshold)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._next_key = 0
+        self._lookups = 0
+        self._hits = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._saved_seconds = 0.0
+
+    def signature(self, text):
+        return self.hasher.signature(text)
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._index = LSHIndex(self.hasher.num_perm, self.threshold)
+            self._entries.clear()
+            self._version = version
+
+    def get(self, sig, version):
+        """Return (value, similarity) for a cached near-duplicate of `sig`, or None."""
+        with self._lock:
+            self._lookups += 1
+            self._check_version(version)
+            match = self._index.best_match(sig)
+            if match is None:
+                return None
+            key, sim = match
+            value, cost = self._entries[key]
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._saved_seconds += cost
+            return value, sim
+
+    def put(self, sig, value, version, cost):
+        """Cache `value`, which took `cost` seconds to compute under `version`."""
+        with self._lock:
+            self._check_version(version)
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = (value, cost)
+            self._index.add(key, sig)
+            while len(self._entries) > self.capacity:
+                old, _ = self._entries.popitem(last=False)
+                self._index.remove(old)
+                self._evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": True,
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "entries": len(self._entries),
+                "lookups": self._lookups,
+                "hits": self._hits,
+                "hit_rate": round(self._hits / self._lookups, 4) if self._lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "compute_saved_ms": round(self._saved_seconds * 1000, 3),
+            }
@@ -0,0 +1,202 @@
+"""Multi-process bulk scoring over model arrays in shared memory.
+
+    python bulk_score.py data/projects.csv --workers 32
+
+Pickling the fitted vectorizer and both heads into every worker costs time
+and one copy of the model per process. Instead, the parent flattens the
+model into plain arrays and places them in `multiprocessing.shared_memory`
+once:
+
+* `terms`: the vocabulary as a sorted fixed-width string array, with the
+  matching feature indices in `term_ids` (the `vocabulary_` dict as a
+  binary-searchable index);
+* `idf`: the IDF weights;
+* `kernel` / `intercept`: the ESG and SDG heads fused into one
+  (n_features, 3 + 17) linear kernel (see explain.linear_head_params);
+* `out`: the (n_rows, n_targets) result matrix.
+
+Workers attach to the blocks without copying them (and without
+registering them with the resource tracker, which would unlink them a
+second time or report them leaked before Python 3.13). Only the vectorizer's
+parameters travel by pickle, so each worker can rebuild the same analyzer.
+Workers then take (offset, texts) chunks from a work queue and reproduce
+TfidfVectorizer.transform (counts, binary / sublinear tf, IDF, row norm).
+Each worker writes its predictions straight into its rows of `out`, so the
+merged result is in input order whichever worker finishes first. Only
+linear heads (including quantize.py heads) can be fused this way.
+"""
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import clone
+from sklearn.preprocessing import normalize
+
+import explain
+
+_WORKER = {}
+_HAS_TRACK = sys.version_info >= (3, 13)  # SharedMemory(track=False)
+
+
+def fuse_heads(esg_model, sdg_model=None):
+    """(kernel (n_features, n_targets), intercept (n_targets,), n_esg) of the linear heads side by side."""
+    coefs, intercepts = [], []
+    for head in (esg_model, sdg_model):
+        if head is None:
+            continue
+        params = explain.linear_head_params(head)
+        if params is None:
+            raise ValueError(f"{type(head).__name__} is not a linear model; parallel scoring needs linear heads")
+        coefs.append(params[0])
+        intercepts.append(params[1])
+    return np.ascontiguousarray(np.vstack(coefs).T), np.concatenate(intercepts), coefs[0].shape[0]
+
+
+def model_arrays(vectorizer, esg_model, sdg_model=None):
+    """The shareable arrays of a fitted TfidfVectorizer and its heads, and the ESG output count."""
+    terms = np.array(sorted(vectorizer.vocabulary_))
+    term_ids = np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int64)
+    n_features = len(terms)
+    idf = np.asarray(vectorizer.idf_) if getattr(vectorizer, 'use_idf', False) else np.ones(n_features)
+    kernel, intercept, n_esg = fuse_heads(esg_model, sdg_model)
+    if kernel.shape[0] != n_features:
+        raise ValueError(f"Heads expect {kernel.shape[0]} features, the vectorizer has {n_features}")
+    return {'terms': terms, 'term_ids': term_ids, 'idf': idf, 'kernel': kernel, 'intercept': intercept}, n_esg
+
+
+class SharedArrays:
+    """Named numpy arrays in shared memory blocks, owned (and unlinked) by the creating process."""
+
+    def __init__(self, arrays):
+        self.blocks = {}
+        self.arrays = {}
+        try:
+            for name, arr in arrays.items():
+                self.allocate(name, arr.shape, arr.dtype)[...] = arr
+        except BaseException:
+            self.close()
+            raise
+
+    def allocate(self, name, shape, dtype):
+        dtype = np.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        self.blocks[name] = block
+        self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        return self.arrays[name]
+
+    def spec(self):
+        """Picklable {name: (block name, shape, dtype)} for `attach`."""
+        return {name: (self.blocks[name].name, arr.shape, arr.dtype.str) for name, arr in self.arrays.items()}
+
+    def close(self):
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_block(name):
+    """Attach to an existing block without registering it with the resource tracker.
+    The creating process owns (and unlinks) the block; before Python 3.13 a plain
+    attach registers it too, so the tracker may unlink it twice or report it leaked.
+    """
+    if _HAS_TRACK:
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+
+    def register_unless_shared_memory(rname, rtype):
+        if rtype != 'shared_memory':
+            register(rname, rtype)
+
+    resource_tracker.register = register_unless_shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def attach(spec):
+    """({name: zero-copy array view}, blocks to keep open) for a SharedArrays.spec()."""
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = _open_block(block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def _init_worker(spec, analyzer_params):
+    arrays, blocks = attach(spec)
+    _WORKER.update(arrays)
+    _WORKER['blocks'] = blocks
+    _WORKER['analyzer'] = analyzer_params.build_analyzer()
+    _WORKER['params'] = analyzer_params
+
+
+def transform(texts, analyzer, params, terms, term_ids, idf):
+    """TfidfVectorizer.transform over the shared vocabulary arrays (same values, same dtype)."""
+    # number the chunk's distinct tokens, then binary-search only those in the vocabulary
+    seen = {}
+    token_ids = []
+    indptr = [0]
+    for text in texts:
+        token_ids.extend([seen.setdefault(token, len(seen)) for token in analyzer(text)])
+        indptr.append(len(token_ids))
+    distinct = np.array(list(seen) or [''])
+    pos = np.minimum(np.searchsorted(terms, distinct), len(terms) - 1)
+    feature = np.where(terms[pos] == distinct, term_ids[pos], -1)[np.array(token_ids, dtype=np.int64)]
+    rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+    hit = feature >= 0
+    counts = sp.csr_matrix((np.ones(int(hit.sum())), (rows[hit], feature[hit])),
+                           shape=(len(texts), len(terms)), dtype=np.float64)  # duplicates are summed
+    if params.binary:
+        counts.data[:] = 1
+    elif params.sublinear_tf:
+        np.log(counts.data, out=counts.data)
+        counts.data += 1
+    counts.data *= idf[counts.indices]
+    if params.norm:
+        counts = normalize(counts, norm=params.norm, copy=False)
+    return counts.astype(params.dtype, copy=False)
+
+
+def _score_chunk(task):
+    offset, texts = task
+    w = _WORKER
+    X = transform(texts, w['analyzer'], w['params'], w['terms'], w['term_ids'], w['idf'])
+    w['out'][offset:offset + len(texts)] = X @ w['kernel'] + w['intercept']
+    return offset, len(texts)
+
+
+def score_parallel(vectorizer, esg_model, sdg_model, descriptions, workers=None, chunk_size=1024,
+                   start_method=None):
+    """Score `descriptions` in `workers` processes over shared model arrays.
+    Returns (esg (n, 3), sdg (n, 17) or None) in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    arrays, n_esg = model_arrays(vectorizer, esg_model, sdg_model)
+    params = clone(vectorizer)  # parameters only: the analyzer, not the fitted vocabulary
+    n_targets = arrays['kernel'].shape[1]
+    ctx = multiprocessing.get_context(start_method)
+    with SharedArrays(arrays) as shared:
+        out = shared.allocate('out', (len(descriptions), n_targets), np.float64)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(shared.spec(), params)) as pool:
+            futures = [pool.submit(_score_chunk, (start, descriptions[start:start + chunk_size]))
+                       for start in range(0, len(descriptions), chunk_size)]
+            for future in as_completed(futures):
+                future.result()  # re-raise a worker's error here
+        result = np.array(out)
+        del out
+    return result[:, :n_esg], (result[:, n_esg:] if sdg_model is not None else None)
@@ -0,0 +1,339 @@
+"""On-demand profiling of live workers.
+
+Nothing here runs until a profile is requested, so there is no overhead in
+normal operation:
+
+* ``sample`` mode starts a thread that reads every other thread's stack from
+  ``sys._current_frames()`` at a fixed interval and returns collapsed stacks
+  (``frame;frame;frame count`` lines, ready for flamegraph.pl / speedscope).
+* ``cprofile`` mode temporarily swaps a few entry points (the WSGI app, the
+  scoring function, the micro-batcher) for wrappers that run each call under
+  ``cProfile`` and returns a merged pstats dump. The originals are restored
+  when the window ends. (On Python 3.12+, where one profiler covers every
+  thread, a single profiler runs for the window instead.)
+
+For sync gunicorn workers a profile request only sees its own (blocked)
+worker, so `trigger_siblings` writes a trigger file and sends SIGUSR2 to the
+other workers of the same master; each runs the same profile and writes its
+result next to the trigger for the requesting worker to merge. Every profile
+has its own trigger file (`trigger-<id>.json`, written atomically), and a
+signalled worker runs each pending trigger it has not run yet, so concurrent
+profile requests neither overwrite each other's parameters nor get lost when
+their signals coalesce.
+"""
+import collections
+import cProfile
+import json
+import os
+import pstats
+import signal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+PROFILE_MODES = ('sample', 'cprofile')
+PROFILE_SIGNAL = getattr(signal, 'SIGUSR2', None)
+# a trigger is honoured until its profile window plus this margin has passed
+TRIGGER_GRACE_SECONDS = 5
+
+_local = threading.local()
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Sample the stacks of all other threads every `interval` seconds."""
+
+    def __init__(self, interval=0.01, exclude=()):
+        self.interval = interval
+        self.exclude = set(exclude)
+        self.counts = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident in self.exclude:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.counts[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+
+# From 3.12 cProfile is built on sys.monitoring: one enabled profiler sees
+# every thread, and a second one cannot be enabled concurrently.
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+
+
+class CallProfiler:
+    """Profile calls to `points` ((owner, attribute) pairs) with cProfile while active.
+    On Python 3.12+ a single process-wide profiler is used instead of wrappers.
+    """
+
+    def __init__(self, points):
+        self.points = [(owner, attr) for owner, attr in points if owner is not None]
+        self.stats = None
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._originals = []
+        self._global = None
+
+    def _wrap(self, fn):
+        def profiled(*args, **kwargs):
+            if getattr(_local, 'profiling', False):
+                return fn(*args, **kwargs)  # already inside a profiled call on this thread
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                return fn(*args, **kwargs)  # another profiler owns the interpreter hook
+            _local.profiling = True
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.disable()
+                _local.profiling = False
+                with self._lock:
+                    self.calls += 1
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profiler)
+                    else:
+                        self.stats.add(profiler)
+        profiled.__wrapped__ = fn
+        return profiled
+
+    def start(self):
+        if PROCESS_WIDE_CPROFILE:
+            self._global = cProfile.Profile()
+            self._global.enable()
+            return
+        for owner, attr in self.points:
+            original = getattr(owner, attr)
+            self._originals.append((owner, attr, original))
+            setattr(owner, attr, self._wrap(original))
+
+    def stop(self):
+        if self._global is not None:
+            self._global.disable()
+            self.stats, self._global = pstats.Stats(self._global), None
+            return self.stats
+        for owner, attr, original in reversed(self._originals):
+            setattr(owner, attr, original)
+        self._originals = []
+        return self.stats
+
+
+def collapsed_text(counts):
+    """Render sampler counts as collapsed-stack lines."""
+    return ''.join(f"{stack} {n}\n" for stack, n in counts.most_common())
+
+
+def merge_collapsed(texts):
+    counts = collections.Counter()
+    for text in texts:
+        for line in text.splitlines():
+            stack, _, n = line.rpartition(' ')
+            if stack:
+                counts[stack] += int(n)
+    return collapsed_text(counts)
+
+
+def pstats_bytes(stats_list):
+    """Merge pstats.Stats objects / dump files into one marshalled pstats dump."""
+    stats_list = [s for s in stats_list if s is not None]
+    merged = pstats.Stats()
+    for s in stats_list:
+        merged.add(s)
+    fd, path = tempfile.mkstemp(suffix='.prof')
+    os.close(fd)
+    try:
+        merged.dump_stats(path)
+        with open(path, 'rb') as fh:
+            return fh.read()
+    finally:
+        os.remove(path)
+
+
+def run_profile(mode, seconds, points=(), interval=0.01, exclude=()):
+    """Profile this process for `seconds`; returns collapsed-stack text or pstats bytes."""
+    if mode == 'sample':
+        sampler = StackSampler(interval, exclude)
+        sampler.start()
+        time.sleep(seconds)
+        return collapsed_text(sampler.stop())
+    profiler = CallProfiler(points)
+    profiler.start()
+    try:
+        time.sleep(seconds)
+    finally:
+        stats = profiler.stop()
+    return pstats_bytes([stats])
+
+
+def _result_path(directory, profile_id, pid, mode):
+    ext = 'collapsed' if mode == 'sample' else 'prof'
+    return os.path.join(directory, f"{profile_id}-{pid}.{ext}")
+
+
+def write_result(directory, profile_id, mode, result):
+    path = _result_path(directory, profile_id, os.getpid(), mode)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fh:
+        fh.write(result.encode('utf-8') if isinstance(result, str) else result)
+    os.replace(tmp, path)
+
+
+def _catches_signal(pid, signum):
+    """True if `pid` has a handler installed for `signum` (SigCgt in /proc/<pid>/status)."""
+    with open(f'/proc/{pid}/status') as fh:
+        for line in fh:
+            if line.startswith('SigCgt:'):
+                return bool(int(line.split()[1], 16) >> (signum - 1) & 1)
+    return False
+
+
+def sibling_workers():
+    """PIDs of the other workers of our gunicorn master (same parent, same command line).
+    Only workers that installed the profile signal handler are returned, so a
+    worker that would be terminated by the signal is never signalled.
+    """
+    ppid, own = os.getppid(), os.getpid()
+    try:
+        with open(f'/proc/{own}/cmdline', 'rb') as fh:
+            cmdline = fh.read()
+        pids = [int(p) for p in os.listdir('/proc') if p.isdigit() and int(p) != own]
+    except OSError:
+        return []
+    siblings = []
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as fh:
+                parent = int(fh.read().rsplit(')', 1)[1].split()[1])
+            if parent != ppid:
+                continue
+            with open(f'/proc/{pid}/cmdline', 'rb') as fh:
+                if fh.read() != cmdline:
+                    continue
+            if _catches_signal(pid, PROFILE_SIGNAL):
+                siblings.append(pid)
+        except (OSError, ValueError, IndexError):
+            continue
+    return siblings
+
+
+def _trigger_path(directory, profile_id):
+    return os.path.join(directory, f"trigger-{profile_id}.json")
+
+
+def trigger_siblings(directory, mode, seconds, interval):
+    """Ask the other workers to profile themselves; returns (profile_id, pids signalled)."""
+    profile_id = uuid.uuid4().hex[:12]
+    os.makedirs(directory, exist_ok=True)
+    path = _trigger_path(directory, profile_id)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump({'id': profile_id, 'mode': mode, 'seconds': seconds, 'interval': interval,
+                   'expires': time.time() + seconds + TRIGGER_GRACE_SECONDS}, fh)
+    os.replace(tmp, path)
+    signalled = []
+    if PROFILE_SIGNAL is not None:
+        for pid in sibling_workers():
+            try:
+                os.kill(pid, PROFILE_SIGNAL)
+                signalled.append(pid)
+            except OSError:
+                pass
+    return profile_id, signalled
+
+
+def remove_trigger(directory, profile_id):
+    try:
+        os.remove(_trigger_path(directory, profile_id))
+    except OSError:
+        pass
+
+
+def pending_triggers(directory, handled):
+    """Unexpired triggers in `directory` whose id is not in `handled`."""
+    try:
+        names = [n for n in os.listdir(directory) if n.startswith('trigger-') and n.endswith('.json')]
+    except OSError:
+        return []
+    triggers = []
+    now = time.time()
+    for name in sorted(names):
+        if name[len('trigger-'):-len('.json')] in handled:
+            continue
+        try:
+            with open(os.path.join(directory, name)) as fh:
+                trigger = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        if trigger.get('expires', 0) > now:
+            triggers.append(trigger)
+    return triggers
+
+
+def collect_results(directory, profile_id, mode, expected, timeout):
+    """Wait up to `timeout` seconds for `expected` sibling results and merge them with ours."""
+    ext = 'collapsed' if mode == 'sample' else 'prof'
+    deadline = time.monotonic() + timeout
+    while True:
+        paths = [os.path.join(directory, f) for f in os.listdir(directory)
+                 if f.startswith(profile_id + '-') and f.endswith('.' + ext)]
+        if len(paths) >= expected or time.monotonic() > deadline:
+            break
+        time.sleep(0.1)
+    try:
+        if mode == 'sample':
+            texts = []
+            for path in paths:
+                with open(path, encoding='utf-8') as fh:
+                    texts.append(fh.read())
+            return merge_collapsed(texts), len(paths)
+        return pstats_bytes([pstats.Stats(path) for path in paths]), len(paths)
+    finally:
+        for path in paths:
+            os.remove(path)
+
+
+def install_signal_handler(directory, points_factory):
+    """Make this worker run a profile when signalled by a sibling (main thread only)."""
+    if PROFILE_SIGNAL is None or threading.current_thread() is not threading.main_thread():
+        return False
+
+    handled = set()
+
+    def work(trigger):
+        result = run_profile(trigger['mode'], trigger['seconds'], points_factory(), trigger['interval'],
+                             exclude={threading.get_ident()})
+        write_result(directory, trigger['id'], trigger['mode'], result)
+
+    def handle(signum, frame):
+        # signals sent close together may arrive as one, so run every trigger not run yet
+        for trigger in pending_triggers(directory, handled):
+            handled.add(trigger['id'])
+            threading.Thread(target=work, args=(trigger,), name='profile-trigger', daemon=True).start()
+
+    signal.signal(PROFILE_SIGNAL, handle)
+    return True
@@ -0,0 +1,173 @@
+"""Drop TF-IDF features whose weight is negligible in every head.
+
+    python prune.py models/ -o models_pruned/ --threshold 1e-3 --eval data/projects.csv --tolerance 0.02
+
+TF-IDF rows are L2-normalized, so |x_j| <= 1 and a feature whose absolute
+coefficient is below `threshold` in every ESG and SDG output changes no
+output by more than `threshold` through its own term. Such features are
+removed from the vocabulary, and the vocabulary, IDF and coefficient arrays
+(MultiOutputRegressor estimators, fused linear heads and quantize.py heads)
+are reindexed consistently. The vectorizer's `stop_words_`, kept by sklearn
+only for introspection, is dropped as well. `--keep N` instead keeps the N
+features with the largest weight.
+
+Dropped terms no longer count towards a row's L2 norm either, which
+rescales the remaining TF-IDF values slightly. The export therefore
+measures the real output shift on the held-out evaluation split. Like
+quantize.py, it refuses to write above `--tolerance`, and it reports
+the weak-label MAE before and after and the transform / predict speedup.
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+import explain
+
+
+def feature_weights(heads):
+    """Largest absolute coefficient of every feature over all outputs of all heads."""
+    weights = None
+    for head in heads:
+        if head is None:
+            continue
+        params = explain.linear_head_params(head)
+        if params is None:
+            raise ValueError(f"{type(head).__name__} is not a linear model")
+        w = np.abs(params[0]).max(axis=0)
+        weights = w if weights is None else np.maximum(weights, w)
+    return weights
+
+
+def select_features(weights, threshold=None, keep=None):
+    """Sorted indices of the features to keep: weight >= threshold, or the `keep` heaviest."""
+    if keep is not None:
+        keep = min(keep, len(weights))
+        return np.sort(np.argsort(-weights, kind='stable')[:keep])
+    return np.flatnonzero(weights >= threshold)
+
+
+def prune_vectorizer(vectorizer, keep):
+    """Copy of a fitted TfidfVectorizer restricted to the features `keep` (old indices, sorted)."""
+    remap = np.full(len(vectorizer.vocabulary_), -1, dtype=np.int64)
+    remap[keep] = np.arange(len(keep))
+    pruned = copy.deepcopy(vectorizer)
+    pruned.vocabulary_ = {term: int(remap[i]) for term, i in vectorizer.vocabulary_.items() if remap[i] >= 0}
+    if getattr(vectorizer, 'use_idf', False):
+        pruned.idf_ = np.asarray(vectorizer.idf_)[keep]
+    if hasattr(pruned, '_tfidf'):
+        pruned._tfidf.n_features_in_ = len(keep)
+    if hasattr(pruned, 'stop_words_'):
+        pruned.stop_words_ = None
+    return pruned
+
+
+def prune_head(head, keep):
+    """Copy of a linear head restricted to the feature columns `keep`."""
+    if head is None:
+        return None
+    pruned = copy.deepcopy(head)
+    for est in getattr(pruned, 'estimators_', None) or [pruned]:
+        if hasattr(est, 'kernel_'):  # quantize.QuantizedLinearHead, feature-major
+            est.kernel_ = np.ascontiguousarray(est.kernel_[keep])
+        else:
+            est.coef_ = np.ascontiguousarray(np.asarray(est.coef_)[..., keep])
+        est.n_features_in_ = len(keep)
+    pruned.n_features_in_ = len(keep)
+    return pruned
+
+
+def prune_artifacts(models, threshold=None, keep=None):
+    """Return (pruned {'vectorizer', 'esg', 'sdg'}, kept feature indices)."""
+    weights = feature_weights([models['esg'], models.get('sdg')])
+    kept = select_features(weights, threshold, keep)
+    return {
+        'vectorizer': prune_vectorizer(models['vectorizer'], kept),
+        'esg': prune_head(models['esg'], kept),
+        'sdg': prune_head(models.get('sdg'), kept),
+    }, kept
+
+
+def stage_seconds(models, texts, batch_size=256, repeat=3):
+    """Best-of-`repeat` (transform seconds, predict seconds) over `texts` in batches."""
+    best = (float('inf'), float('inf'))
+    for _ in range(repeat):
+        transform = predict = 0.0
+        for start in range(0, len(texts), batch_size):
+            began = time.perf_counter()
+            vec = models['vectorizer'].transform(texts[start:start + batch_size])
+            mid = time.perf_counter()
+            for key in ('esg', 'sdg'):
+                if models[key] is not None:
+                    models[key].predict(vec)
+            transform += mid - began
+            predict += time.perf_counter() - mid
+        best = (min(best[0], transform), min(best[1], predict))
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prune TF-IDF features with negligible weight in every head')
+    parser.add_argument('models', help='directory with vectorizer.pkl, esg_regression.pkl, sdg_regression.pkl')
+    parser.add_argument('-o', '--output', required=True, help='directory for the pruned artifacts')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--threshold', type=float, default=1e-3, help='drop features below this |coef| everywhere')
+    group.add_argument('--keep', type=int, help='keep this many features with the largest |coef|')
+    parser.add_argument('--eval', required=True, metavar='CORPUS', help='CSV or Parquet corpus with Description')
+    parser.add_argument('--tolerance', type=float, default=0.02, help='largest allowed change of any output')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import joblib
+
+    import evaluate
+    import storage
+    import weak_labels
+    from quantize import output_shift
+    from sweep import split_indices
+
+    original, _ = evaluate.load_artifacts(args.models, repeat=1)
+    pruned, kept = prune_artifacts(original, None if args.keep else args.threshold, args.keep)
+    n_features = len(original['vectorizer'].vocabulary_)
+    print(f"Keeping {len(kept)} of {n_features} features ({n_features - len(kept)} dropped)")
+    if len(kept) == 0:
+        print("❌ Nothing left to keep; lower --threshold")
+        return 1
+
+    texts = storage.read_corpus(args.eval, columns=['Description'])['Description'].fillna('').astype(str).tolist()
+    _, test = split_indices(len(texts), args.test_size, args.seed)
+    texts = [texts[i] for i in test]
+    shift = output_shift(original, pruned, texts)
+    labels = weak_labels.label_matrix(texts)
+    print(f"Largest output shift on {len(texts)} evaluation descriptions: "
+          f"ESG {shift['esg']:.6f}, SDG {shift['sdg']:.6f} (tolerance {args.tolerance})")
+    timings = {}
+    for label, models in (('original', original), ('pruned', pruned)):
+        esg, sdg = evaluate.predict(models, texts)
+        pred = esg if sdg is None else np.hstack([esg, sdg])
+        timings[label] = stage_seconds(models, texts)
+        print(f"{label:>9}: weak-label MAE {np.abs(pred - labels[:, :pred.shape[1]]).mean():.5f}  "
+              f"memory {evaluate.memory_bytes(models):>10,} B  "
+              f"transform {timings[label][0] * 1000:.1f} ms  predict {timings[label][1] * 1000:.1f} ms")
+    print(f"Speedup: transform {timings['original'][0] / timings['pruned'][0]:.2f}x, "
+          f"predict {timings['original'][1] / timings['pruned'][1]:.2f}x")
+    if max(shift.values()) > args.tolerance:
+        print(f"❌ Refusing to publish: outputs shift by more than {args.tolerance}")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    for key, name in evaluate.ARTIFACTS:
+        if pruned[key] is not None:
+            joblib.dump(pruned[key], os.path.join(args.output, name))
+    print(f"✅ Wrote pruned artifacts to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    # run through the importable module so pruned quantize.py heads keep their module path
+    import prune
+    sys.exit(prune.main())
@@ -0,0 +1,171 @@
+"""Reduced-precision (float32 / int8) variants of the model artifacts.
+
+    python quantize.py models/ -o models_q/ --dtype int8 --eval data/projects.csv --tolerance 0.01
+
+The vectorizer keeps its vocabulary but stores its IDF weights as float32
+and emits float32 TF-IDF rows. Each ESG / SDG head, whether a
+MultiOutputRegressor of linear estimators or a fused multi-target one,
+becomes a `QuantizedLinearHead`: one feature-major (n_features, n_targets)
+kernel, either float32 or int8 with one float32 scale per column (target),
+plus float32 intercepts. Inference accumulates in float32: float32 kernels
+use a sparse float32 product; int8 kernels gather only the kernel rows of
+the features present in the input, so the int8 matrix is never expanded as
+a whole.
+
+The export refuses to write anything if any ESG or SDG output moves by more
+than `--tolerance` on the evaluation set (the held-out split of
+evaluate.py / sweep.py). It reports the largest shift per head and the
+memory, size and latency of both artifact sets.
+"""
+import argparse
+import copy
+import os
+import sys
+
+import numpy as np
+import scipy.sparse as sp
+
+import explain
+
+DTYPES = ('float32', 'int8')
+
+
+class QuantizedLinearHead:
+    """Linear multi-output head with a float32 or per-column scaled int8 kernel."""
+
+    def __init__(self, coef, intercept, dtype='float32'):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown dtype {dtype!r}; expected one of {DTYPES}")
+        coef = np.asarray(coef, dtype=np.float64)
+        self.dtype = dtype
+        self.n_features_in_ = coef.shape[1]
+        self.intercept_ = np.asarray(intercept, dtype=np.float32)
+        kernel = np.ascontiguousarray(coef.T)  # (n_features, n_targets)
+        if dtype == 'int8':
+            peak = np.abs(kernel).max(axis=0)
+            self.scale_ = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+            self.kernel_ = np.clip(np.rint(kernel / self.scale_), -127, 127).astype(np.int8)
+        else:
+            self.scale_ = None
+            self.kernel_ = kernel.astype(np.float32)
+
+    @classmethod
+    def from_model(cls, model, dtype='float32'):
+        params = explain.linear_head_params(model)
+        if params is None:
+            raise ValueError(f"{type(model).__name__} is not a linear model")
+        return cls(params[0], params[1], dtype)
+
+    @property
+    def coef_(self):
+        """Dequantized (n_targets, n_features) float32 coefficients (for explanations)."""
+        kernel = self.kernel_.astype(np.float32)
+        if self.scale_ is not None:
+            kernel *= self.scale_
+        return kernel.T
+
+    def predict(self, X):
+        """(n_rows, n_targets) float32 predictions for a sparse (or dense) TF-IDF matrix."""
+        if not sp.issparse(X):
+            X = sp.csr_matrix(np.atleast_2d(X))
+        X = X.tocsr()
+        if X.dtype != np.float32:
+            X = X.astype(np.float32)
+        if self.scale_ is None:
+            out = np.asarray(X @ self.kernel_)
+        else:
+            # x_j * kernel[j] for the stored entries only, summed per row
+            rows = self.kernel_[X.indices].astype(np.float32)
+            rows *= X.data[:, np.newaxis]
+            out = np.zeros((X.shape[0], self.kernel_.shape[1]), dtype=np.float32)
+            starts = X.indptr[:-1]
+            present = X.indptr[1:] > starts
+            if present.any():
+                out[present] = np.add.reduceat(rows, starts[present], axis=0)
+            out *= self.scale_
+        out += self.intercept_
+        return out
+
+
+def quantize_vectorizer(vectorizer):
+    """Copy of a fitted TfidfVectorizer with float32 IDF weights and float32 output."""
+    quantized = copy.deepcopy(vectorizer)
+    quantized.dtype = np.float32
+    if getattr(vectorizer, 'use_idf', False):
+        quantized.idf_ = np.asarray(vectorizer.idf_, dtype=np.float32)
+    return quantized
+
+
+def quantize_artifacts(models, dtype='float32'):
+    """{'vectorizer', 'esg', 'sdg'} -> the same keys with reduced-precision objects."""
+    return {
+        'vectorizer': quantize_vectorizer(models['vectorizer']),
+        'esg': QuantizedLinearHead.from_model(models['esg'], dtype),
+        'sdg': QuantizedLinearHead.from_model(models['sdg'], dtype) if models.get('sdg') is not None else None,
+    }
+
+
+def output_shift(original, quantized, texts, batch_size=1024):
+    """Largest absolute change of any ESG / SDG output over `texts`, per head."""
+    import evaluate
+
+    shift = {'esg': 0.0, 'sdg': 0.0}
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        for before, after, key in zip(evaluate.predict(original, batch), evaluate.predict(quantized, batch),
+                                      ('esg', 'sdg')):
+            if before is not None:
+                shift[key] = max(shift[key], float(np.abs(before - after).max()))
+    return shift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export float32 / int8 model artifacts with an accuracy guard')
+    parser.add_argument('models', help='directory with vectorizer.pkl, esg_regression.pkl, sdg_regression.pkl')
+    parser.add_argument('-o', '--output', required=True, help='directory for the quantized artifacts')
+    parser.add_argument('--dtype', choices=DTYPES, default='float32')
+    parser.add_argument('--eval', required=True, metavar='CORPUS', help='CSV or Parquet corpus with Description')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='largest allowed change of any output')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-samples', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    import joblib
+
+    import evaluate
+    import storage
+    from sweep import split_indices
+
+    original, _ = evaluate.load_artifacts(args.models, repeat=1)
+    quantized = quantize_artifacts(original, args.dtype)
+    texts = storage.read_corpus(args.eval, columns=['Description'])['Description'].fillna('').astype(str).tolist()
+    _, test = split_indices(len(texts), args.test_size, args.seed)
+    texts = [texts[i] for i in test]
+
+    shift = output_shift(original, quantized, texts)
+    print(f"Largest output shift on {len(texts)} evaluation descriptions: "
+          f"ESG {shift['esg']:.6f}, SDG {shift['sdg']:.6f} (tolerance {args.tolerance})")
+    if max(shift.values()) > args.tolerance:
+        print(f"❌ Refusing to publish {args.dtype} artifacts: outputs shift by more than {args.tolerance}")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    for key, name in evaluate.ARTIFACTS:
+        if quantized[key] is not None:
+            joblib.dump(quantized[key], os.path.join(args.output, name))
+    sample = texts[:args.latency_samples]
+    for label, path, models in (('original', args.models, original), (args.dtype, args.output, quantized)):
+        p50, p99, throughput = evaluate.latency(models, sample, 256)
+        disk = sum(os.path.getsize(os.path.join(path, name)) for key, name in evaluate.ARTIFACTS
+                   if models[key] is not None and os.path.exists(os.path.join(path, name)))
+        print(f"{label:>9}: memory {evaluate.memory_bytes(models):>10,} B  disk {disk:>10,} B  "
+              f"p50 {p50:.3f} ms  p99 {p99:.3f} ms  {throughput:,.0f} descriptions/s")
+    print(f"✅ Wrote {args.dtype} artifacts to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    # run through the importable module so pickles reference quantize.QuantizedLinearHead, not __main__
+    import quantize
+    sys.exit(quantize.main())
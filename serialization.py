@@ -0,0 +1,128 @@
+"""Response serialization helpers for the scoring API.
+
+orjson is used when it is installed: it writes numpy arrays directly, so model
+outputs never go through a per-element ``float(round(...))`` pass in Python.
+Without orjson we fall back to the stdlib encoder with a numpy-aware default.
+
+MessagePack (`application/msgpack`, optional `msgpack` package) is the
+binary alternative for high-volume clients. Bodies have the same structure
+as JSON, but numpy arrays (the score matrices of compact responses) are
+written as one ExtType(EXT_NDARRAY) each instead of lists of floats. The
+ext payload is the dtype string length (1 byte), the numpy dtype string
+(e.g. `<f8`), the number of dimensions (1 byte), each dimension as a
+little-endian uint32 and then the raw C-order data. `unpackb` turns these
+back into numpy arrays; api_client.py is the matching client.
+"""
+import json
+import struct
+
+import numpy as np
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+EXT_NDARRAY = 1
+
+
+def _json_default(obj):
+    """Encode numpy values the fast path cannot (stdlib fallback, non-contiguous arrays)."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Serialize `obj` (which may contain numpy arrays/scalars) to JSON bytes."""
+    if orjson is not None:
+        # orjson writes C-contiguous arrays natively and hands views (e.g. the
+        # transposed output of MultiOutputRegressor) to the default
+        return orjson.dumps(obj, default=_json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(obj, status: int = 200) -> Response:
+    """Build a Flask JSON response using the fast serializer."""
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise RuntimeError("MessagePack support needs the msgpack package (pip install msgpack)")
+
+
+def _pack_default(obj):
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in 'biuf':
+        arr = np.ascontiguousarray(obj, dtype=obj.dtype.newbyteorder('<'))
+        dtype = arr.dtype.str.encode('ascii')
+        header = struct.pack(f'<B{len(dtype)}sB{arr.ndim}I', len(dtype), dtype, arr.ndim, *arr.shape)
+        return msgpack.ExtType(EXT_NDARRAY, header + arr.tobytes())
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+def _unpack_ext(code, data):
+    if code != EXT_NDARRAY:
+        return msgpack.ExtType(code, data)
+    size = data[0]
+    dtype = data[1:1 + size].decode('ascii')
+    ndim = data[1 + size]
+    offset = 2 + size + 4 * ndim
+    shape = struct.unpack_from(f'<{ndim}I', data, 2 + size)
+    return np.frombuffer(data, dtype=dtype, offset=offset).reshape(shape)
+
+
+def packb(obj) -> bytes:
+    """Serialize `obj` to MessagePack bytes, numpy number arrays as EXT_NDARRAY."""
+    _require_msgpack()
+    return msgpack.packb(obj, default=_pack_default, use_bin_type=True)
+
+
+def unpackb(data):
+    """Deserialize MessagePack bytes; EXT_NDARRAY values become (read-only) numpy arrays.
+    Raises ValueError for malformed, truncated or trailing-garbage input.
+    """
+    _require_msgpack()
+    try:
+        return msgpack.unpackb(data, ext_hook=_unpack_ext, raw=False, strict_map_key=False)
+    except (msgpack.UnpackException, ValueError, TypeError, IndexError, struct.error) as e:
+        # ExtraData / FormatError / StackError are ValueErrors; a bad ndarray ext fails in _unpack_ext
+        raise ValueError(f"Invalid MessagePack body: {str(e) or type(e).__name__}") from None
+
+
+def is_msgpack(mimetype) -> bool:
+    return mimetype in MSGPACK_MIMETYPES
+
+
+def negotiated_response(obj, status: int = 200) -> Response:
+    """JSON or MessagePack response, whichever the request's Accept header prefers.
+    Without a preference the response uses the request body's own format.
+    """
+    from flask import request
+
+    offers = [JSON_MIMETYPE, MSGPACK_MIMETYPE]
+    if is_msgpack(request.mimetype):
+        offers.reverse()
+    best = request.accept_mimetypes.best_match(offers + [MSGPACK_MIMETYPES[1]], default=offers[0])
+    if msgpack is not None and is_msgpack(best):
+        response = Response(packb(obj), status=status, mimetype=best)
+    else:
+        response = json_response(obj, status)
+    response.vary.add('Accept')
+    return response
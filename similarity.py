@@ -0,0 +1,162 @@
+"""Nearest-neighbour search over TF-IDF vectors of the project corpus.
+
+Rows are L2-normalized, so cosine similarity is a dot product.
+
+* `ExactIndex` keeps the corpus term-major (an inverted index), so a sparse
+  query-by-corpus product only reads the postings of the query's terms;
+  queries are multiplied in blocks that bound the dense score matrix.
+* `ApproxIndex` (IVF over an SVD embedding) projects rows to a small dense
+  space with TruncatedSVD, clusters them with spherical k-means and, per
+  query, scans only the rows of the `n_probe` closest clusters; candidates
+  are re-ranked with the exact sparse cosine.
+
+`build_index(..., mode='auto')` picks the exact index below `approx_min_docs`
+rows: exact queries cost roughly 5 ms per 100k documents, so the
+approximate index (slow to build, lossy) only pays off for very large
+corpora. See benchmarks/bench_similarity.py for build time, memory, latency
+and recall.
+"""
+import time
+
+import numpy as np
+from sklearn.preprocessing import normalize
+
+
+def _csr_nbytes(matrix):
+    return int(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes)
+
+
+def _top_k(scores, k, idx=None):
+    """Best `k` of each row of `scores` by decreasing score, as (scores, idx).
+    `idx` maps columns to row ids (default: the column numbers).
+    """
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-scores, axis=1, kind='stable')
+    part = np.take_along_axis(part, order, axis=1)
+    return np.take_along_axis(scores, order, axis=1), (part if idx is None else idx[part])
+
+
+class ExactIndex:
+    """Exact cosine top-k over an inverted (term-major) copy of the corpus matrix.
+    A query only reads the postings of its own terms; queries are scored in
+    blocks so the dense (block, n_docs) score matrix stays under
+    `max_block_cells` entries.
+    """
+
+    mode = 'exact'
+
+    def __init__(self, matrix, max_block_cells=1 << 23):
+        started = time.perf_counter()
+        self.postings = normalize(matrix.tocsr(), copy=True).T.tocsr()
+        self.query_block = max(1, max_block_cells // max(1, matrix.shape[0]))
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return self.postings.shape[1]
+
+    def query(self, queries, k):
+        """Return (scores, rows), both (n_queries, k), best first."""
+        queries = normalize(queries.tocsr())
+        k = min(k, len(self))
+        parts = []
+        for start in range(0, queries.shape[0], self.query_block):
+            scores = (queries[start:start + self.query_block] @ self.postings).toarray()
+            parts.append(_top_k(scores, k))
+        return np.vstack([p[0] for p in parts]), np.vstack([p[1] for p in parts])
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "documents": len(self),
+            "build_seconds": round(self.build_seconds, 3),
+            "bytes": _csr_nbytes(self.postings),
+        }
+
+
+def _spherical_kmeans(points, n_clusters, iterations=10, seed=0):
+    """Unit-norm centroids of `points` (unit rows) by spherical k-means."""
+    rng = np.random.default_rng(seed)
+    centroids = points[rng.choice(len(points), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(points @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, points)
+        filled = np.linalg.norm(sums, axis=1) > 0
+        centroids[filled] = normalize(sums[filled])
+    return centroids
+
+
+class ApproxIndex:
+    """Inverted-file index over an SVD embedding, re-ranked with exact sparse cosine."""
+
+    mode = 'approx'
+
+    def __init__(self, matrix, dims=128, n_lists=None, n_probe=32, train_size=50_000, seed=0):
+        from sklearn.decomposition import TruncatedSVD
+
+        started = time.perf_counter()
+        self.matrix = normalize(matrix.tocsr(), copy=True)
+        n_docs, n_features = self.matrix.shape
+        dims = max(1, min(dims, n_features - 1, n_docs - 1))
+        self.svd = TruncatedSVD(dims, random_state=seed).fit(self.matrix)
+        embedding = normalize(self.svd.transform(self.matrix)).astype(np.float32)
+
+        n_lists = n_lists or max(1, int(np.sqrt(n_docs)))
+        rng = np.random.default_rng(seed)
+        sample = embedding[rng.choice(n_docs, min(train_size, n_docs), replace=False)]
+        self.centroids = _spherical_kmeans(sample, min(n_lists, len(sample)), seed=seed).astype(np.float32)
+        assign = np.concatenate([
+            np.argmax(embedding[s:s + 65536] @ self.centroids.T, axis=1)
+            for s in range(0, n_docs, 65536)
+        ])
+        # rows grouped by list, CSR-style: rows of list j are order[offsets[j]:offsets[j + 1]]
+        self.order = np.argsort(assign, kind='stable')
+        self.offsets = np.searchsorted(assign[self.order], np.arange(len(self.centroids) + 1))
+        self.n_probe = min(n_probe, len(self.centroids))
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def query(self, queries, k):
+        """Return (scores, rows), both (n_queries, k), best first; rows of -1 pad short results."""
+        queries = normalize(queries.tocsr())
+        embedded = normalize(self.svd.transform(queries)).astype(np.float32)
+        probes = np.argsort(-(embedded @ self.centroids.T), axis=1)[:, :self.n_probe]
+        scores = np.full((queries.shape[0], k), -np.inf)
+        rows = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        for i, lists in enumerate(probes):
+            candidates = np.concatenate([self.order[self.offsets[j]:self.offsets[j + 1]] for j in lists])
+            if len(candidates) == 0:
+                continue
+            exact = (self.matrix[candidates] @ queries[i].T).toarray().ravel()
+            top_scores, top_rows = _top_k(exact[np.newaxis, :], min(k, len(candidates)), candidates)
+            scores[i, :top_scores.shape[1]] = top_scores[0]
+            rows[i, :top_rows.shape[1]] = top_rows[0]
+        return scores, rows
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "documents": len(self),
+            "build_seconds": round(self.build_seconds, 3),
+            "bytes": _csr_nbytes(self.matrix) + int(self.svd.components_.nbytes + self.centroids.nbytes
+                                                    + self.order.nbytes + self.offsets.nbytes),
+            "lists": len(self.centroids),
+            "n_probe": self.n_probe,
+        }
+
+
+def build_index(matrix, mode='auto', approx_min_docs=1_000_000, **approx_options):
+    """Build an exact or approximate index; 'auto' is exact below `approx_min_docs` rows."""
+    if mode == 'auto':
+        mode = 'approx' if matrix.shape[0] >= approx_min_docs else 'exact'
+    if mode == 'approx':
+        return ApproxIndex(matrix, **approx_options)
+    if mode == 'exact':
+        return ExactIndex(matrix)
+    raise ValueError(f"Unknown similarity index mode: {mode}")
@@ -0,0 +1,94 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+The first caller of `do(key, fn, ...)` (the leader) runs `fn`. Callers that
+arrive with the same key while it runs (followers) wait for its outcome
+instead of computing it again: they get the same result or the leader's
+exception. A follower waits at most `timeout` seconds, then gives up with
+`Overloaded` (503). The leader keeps running and is not cancelled. Once the
+call finishes, the key is free again and the next caller starts a fresh
+call; results are not cached.
+"""
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeout
+
+from admission import Overloaded
+
+
+class SingleFlight:
+    """Share one in-flight call per key among concurrent callers."""
+
+    def __init__(self, timeout=30.0):
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+        self._errors = 0
+        self._shared_errors = 0
+        self._timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return (result of `fn(*args, **kwargs)`, shared) where `shared` is True for followers."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+        if leader:
+            return self._lead(key, call, fn, args, kwargs), False
+        return self._follow(call), True
+
+    def _lead(self, key, call, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            with self._lock:
+                self._errors += 1
+                del self._calls[key]
+            call.set_exception(exc)
+            raise
+        with self._lock:
+            del self._calls[key]
+        call.set_result(result)
+        return result
+
+    def _follow(self, call):
+        started = time.monotonic()
+        try:
+            return call.result(timeout=self.timeout)
+        except FuturesTimeout:
+            with self._lock:
+                self._timed_out += 1
+            raise Overloaded(f"Identical request did not complete within {self.timeout}s", 503,
+                             max(1, int(self.timeout))) from None
+        except Exception:
+            with self._lock:
+                self._shared_errors += 1
+            raise
+        finally:
+            waited = time.monotonic() - started
+            with self._lock:
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def stats(self):
+        """Snapshot of in-flight keys and coalescing counters."""
+        with self._lock:
+            return {
+                "enabled": True,
+                "timeout_seconds": self.timeout,
+                "in_flight": len(self._calls),
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "errors": self._errors,
+                "shared_errors": self._shared_errors,
+                "timed_out": self._timed_out,
+                "avg_wait_ms": round(self._wait_total / self._coalesced * 1000, 3) if self._coalesced else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
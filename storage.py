@@ -0,0 +1,106 @@
+"""Columnar storage for project corpora and scored outputs.
+
+Corpora and scores are stored as Parquet: `Country` (and other repetitive
+text columns) dictionary-encoded, zstd-compressed, in row groups sized for
+streaming. Reads are memory-mapped and fetch only the requested columns, so
+a training script that needs `Description` or a rollup that needs `Country`
+and the score columns never parses the rest of the file.
+
+CSV paths are still accepted everywhere (read with `usecols`), so existing
+`projects.csv` / `projects_scored.csv` files keep working.
+
+    python storage.py projects_scored.csv projects_scored.parquet
+"""
+import os
+import sys
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency; CSV paths work without it
+    pa = pq = None
+
+ROW_GROUP_SIZE = 65_536
+DICTIONARY_COLUMNS = ('Country', 'Region', 'Sector', 'Status')
+
+
+def is_parquet(path):
+    return str(path).endswith(('.parquet', '.pq'))
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("pyarrow is required for Parquet files (pip install pyarrow)")
+
+
+def columns_of(path):
+    """Column names stored in `path` (read from the Parquet schema or the CSV header)."""
+    if is_parquet(path):
+        _require_pyarrow()
+        return pq.read_schema(path).names
+    import pandas as pd
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_corpus(path, columns=None, filters=None):
+    """Read a corpus into a DataFrame, only the `columns` that exist in it (all if None).
+    For Parquet, `filters` (pyarrow DNF, e.g. [('Country', '=', 'Kenya')])
+    skips row groups by their statistics; the file is memory-mapped.
+    """
+    if columns is not None:
+        present = set(columns_of(path))
+        columns = [c for c in columns if c in present]
+    if is_parquet(path):
+        _require_pyarrow()
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+        return table.to_pandas()
+    import pandas as pd
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_corpus(path, columns=None, batch_size=ROW_GROUP_SIZE):
+    """Yield DataFrames of at most `batch_size` rows, reading only `columns`."""
+    if columns is not None:
+        present = set(columns_of(path))
+        columns = [c for c in columns if c in present]
+    if is_parquet(path):
+        _require_pyarrow()
+        parquet = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+        return
+    import pandas as pd
+    yield from pd.read_csv(path, usecols=columns, chunksize=batch_size)
+
+
+def write_corpus(df, path, row_group_size=ROW_GROUP_SIZE):
+    """Write a DataFrame as Parquet (dictionary-encoded text columns) or, for other paths, CSV.
+    The file is written next to `path` and renamed into place.
+    """
+    tmp = f"{path}.tmp"
+    if is_parquet(path):
+        _require_pyarrow()
+        dictionary = [c for c in DICTIONARY_COLUMNS if c in df.columns]
+        # categorical columns are stored as Arrow dictionaries and read back as categoricals
+        df = df.astype({c: 'category' for c in dictionary})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, tmp, row_group_size=row_group_size, compression='zstd',
+                       use_dictionary=dictionary or False)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python storage.py INPUT OUTPUT  (.csv <-> .parquet)")
+        return 2
+    df = read_corpus(argv[0])
+    write_corpus(df, argv[1])
+    print(f"Wrote {len(df)} rows from {argv[0]} to {argv[1]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Hyperparameter sweep over featurizer and head settings with cached featurization.
+
+    python sweep.py data/projects.csv --max-features 2000 5000 --ngram 1,1 1,2 \\
+        --min-df 1 2 --sublinear 0 1 --alpha 0 0.1 1 -o sweeps/leaderboard.csv
+
+Every sweep point is a featurizer setting (max_features, ngram_range,
+min_df, sublinear_tf) plus a head setting (Ridge alpha, 0 for
+LinearRegression). Most points share a featurizer, so:
+
+1. every distinct featurizer is fitted once on the training split and the
+   fitted vectorizer and the transformed train/test matrices are cached
+   under `--cache-dir`, keyed by a hash of the corpus, the split and the
+   featurizer parameters; later sweeps over the same corpus reuse them;
+2. the heads (multi_target.fit_multi_target, all weak-label targets in one
+   solve) are fitted and scored in a process pool from the cached matrices;
+3. size and single-description latency (transform + predict) are measured
+   in this process, one point at a time, so pool workers do not skew them.
+
+The leaderboard (CSV or Parquet, sorted by test MAE) holds MAE and R^2 on a
+fixed held-out split, vectorizer + head size, and p50 latency.
+`--save-best DIR` writes the best point as vectorizer.pkl,
+esg_regression.pkl and sdg_regression.pkl, which the API serves.
+"""
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+
+import multi_target
+import storage
+import weak_labels
+
+FEATURIZER_PARAMS = ('max_features', 'ngram_range', 'min_df', 'sublinear_tf')
+LATENCY_SAMPLES = 200
+
+
+def corpus_hash(texts):
+    digest = hashlib.sha1()
+    for text in texts:
+        digest.update(str(text).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def split_indices(n, test_size=0.2, seed=0):
+    """Fixed (train, test) row indices: a seeded permutation, the last `test_size` held out."""
+    order = np.random.default_rng(seed).permutation(n)
+    n_test = max(1, int(round(n * test_size)))
+    return np.sort(order[:-n_test]), np.sort(order[-n_test:])
+
+
+def featurizer_key(data_key, params):
+    blob = json.dumps({'data': data_key, **params}, sort_keys=True)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()[:16]
+
+
+def featurize(cache_dir, key, params, train_texts, test_texts):
+    """Fit the vectorizer on the training texts and cache it with both matrices; no-op if cached."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    entry = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(entry, 'done')):
+        return key, 0.0
+    started = time.perf_counter()
+    os.makedirs(entry, exist_ok=True)
+    vectorizer = TfidfVectorizer(max_features=params['max_features'], ngram_range=tuple(params['ngram_range']),
+                                 min_df=params['min_df'], sublinear_tf=params['sublinear_tf'])
+    sp.save_npz(os.path.join(entry, 'X_train.npz'), vectorizer.fit_transform(train_texts).tocsr())
+    sp.save_npz(os.path.join(entry, 'X_test.npz'), vectorizer.transform(test_texts).tocsr())
+    joblib.dump(vectorizer, os.path.join(entry, 'vectorizer.pkl'))
+    with open(os.path.join(entry, 'params.json'), 'w', encoding='utf-8') as fh:
+        json.dump(params, fh)
+    open(os.path.join(entry, 'done'), 'w').close()
+    return key, time.perf_counter() - started
+
+
+def fit_point(cache_dir, key, alpha, Y_train, Y_test, n_esg):
+    """Fit one head on cached features; returns (metrics, head)."""
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    entry = os.path.join(cache_dir, key)
+    X_train = sp.load_npz(os.path.join(entry, 'X_train.npz'))
+    X_test = sp.load_npz(os.path.join(entry, 'X_test.npz'))
+    started = time.perf_counter()
+    head = multi_target.fit_multi_target(X_train, Y_train, alpha=alpha)
+    fit_seconds = time.perf_counter() - started
+    pred = head.predict(X_test)
+    metrics = {
+        'mae': mean_absolute_error(Y_test, pred),
+        'r2': r2_score(Y_test, pred),
+        'fit_s': fit_seconds,
+        'features': X_train.shape[1],
+    }
+    if 0 < n_esg < Y_test.shape[1]:
+        metrics['esg_mae'] = mean_absolute_error(Y_test[:, :n_esg], pred[:, :n_esg])
+        metrics['sdg_mae'] = mean_absolute_error(Y_test[:, n_esg:], pred[:, n_esg:])
+    return metrics, head
+
+
+def pickled_size(obj):
+    buf = io.BytesIO()
+    joblib.dump(obj, buf)
+    return buf.tell()
+
+
+def latency_ms(vectorizer, head, texts):
+    """p50 milliseconds of transform + predict for one description at a time."""
+    samples = []
+    for text in texts:
+        started = time.perf_counter()
+        head.predict(vectorizer.transform([text]))
+        samples.append(time.perf_counter() - started)
+    return float(np.percentile(samples, 50)) * 1000 if samples else 0.0
+
+
+def grid(args):
+    featurizers = [dict(zip(FEATURIZER_PARAMS, values)) for values in itertools.product(
+        args.max_features, args.ngram, args.min_df, [bool(s) for s in args.sublinear])]
+    return featurizers, args.alpha
+
+
+def save_best(path, vectorizer, head, targets):
+    """Write the API artifacts for one sweep point (ESG and SDG heads split from the fused head)."""
+    os.makedirs(path, exist_ok=True)
+    joblib.dump(vectorizer, os.path.join(path, 'vectorizer.pkl'))
+    columns = weak_labels.label_columns(targets)
+    n_esg = len(weak_labels.ESG_COLUMNS) if targets != 'sdg' else 0
+    for name, rows in (('esg_regression.pkl', slice(0, n_esg)), ('sdg_regression.pkl', slice(n_esg, len(columns)))):
+        if rows.stop > rows.start:
+            part = type(head)(**head.get_params())
+            part.coef_ = np.ascontiguousarray(head.coef_[rows])
+            part.intercept_ = head.intercept_[rows]
+            part.n_features_in_ = head.n_features_in_
+            joblib.dump(part, os.path.join(path, name))
+
+
+def parse_ngram(value):
+    low, _, high = value.partition(',')
+    return (int(low), int(high or low))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sweep TF-IDF and head settings with cached featurization')
+    parser.add_argument('input', help='CSV or Parquet corpus with a Description column')
+    parser.add_argument('-o', '--output', default=os.path.join('sweeps', 'leaderboard.csv'),
+                        help='leaderboard file (.csv or .parquet)')
+    parser.add_argument('--cache-dir', default=os.path.join('sweeps', 'cache'))
+    parser.add_argument('--targets', choices=('all', 'esg', 'sdg'), default='all')
+    parser.add_argument('--max-features', type=int, nargs='+', default=[5000])
+    parser.add_argument('--ngram', type=parse_ngram, nargs='+', default=[(1, 1)], help='e.g. 1,1 1,2')
+    parser.add_argument('--min-df', type=int, nargs='+', default=[1])
+    parser.add_argument('--sublinear', type=int, nargs='+', choices=(0, 1), default=[0])
+    parser.add_argument('--alpha', type=float, nargs='+', default=[0.0], help='Ridge alpha (0: LinearRegression)')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: CPU count)')
+    parser.add_argument('--save-best', metavar='DIR', help='write the best point as API model artifacts')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    texts = storage.read_corpus(args.input, columns=['Description'])['Description'].fillna('').astype(str).tolist()
+    train, test = split_indices(len(texts), args.test_size, args.seed)
+    train_texts, test_texts = [texts[i] for i in train], [texts[i] for i in test]
+    Y = weak_labels.label_matrix(texts, args.targets)
+    n_esg = len(weak_labels.ESG_COLUMNS) if args.targets != 'sdg' else 0
+    data_key = {'corpus': corpus_hash(texts), 'test_size': args.test_size, 'seed': args.seed}
+    featurizers, alphas = grid(args)
+    keys = [featurizer_key(data_key, params) for params in featurizers]
+    os.makedirs(args.cache_dir, exist_ok=True)
+    print(f"Sweeping {len(featurizers)} featurizers x {len(alphas)} heads on {len(train)} train / {len(test)} test")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        cached = sum(os.path.exists(os.path.join(args.cache_dir, k, 'done')) for k in keys)
+        jobs = [pool.submit(featurize, args.cache_dir, key, params, train_texts, test_texts)
+                for key, params in zip(keys, featurizers)]
+        featurize_seconds = dict(job.result() for job in jobs)
+        print(f"Featurized {len(keys) - cached} settings ({cached} cached)")
+        points = [(key, params, alpha) for key, params in zip(keys, featurizers) for alpha in alphas]
+        jobs = [pool.submit(fit_point, args.cache_dir, key, alpha, Y[train], Y[test], n_esg)
+                for key, _, alpha in points]
+        results = [job.result() for job in jobs]
+
+    rows, best = [], None
+    latency_texts = test_texts[:LATENCY_SAMPLES]
+    for (key, params, alpha), (metrics, head) in zip(points, results):
+        vectorizer = joblib.load(os.path.join(args.cache_dir, key, 'vectorizer.pkl'))
+        row = {**params, 'ngram_range': '{},{}'.format(*params['ngram_range']), 'alpha': alpha, **metrics,
+               'featurize_s': featurize_seconds[key],
+               'size_bytes': pickled_size(vectorizer) + pickled_size(head),
+               'latency_p50_ms': latency_ms(vectorizer, head, latency_texts), 'cache_key': key}
+        rows.append(row)
+        if best is None or row['mae'] < best[0]['mae']:
+            best = (row, vectorizer, head)
+
+    board = pd.DataFrame(rows).sort_values(['mae', 'size_bytes']).reset_index(drop=True)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    storage.write_corpus(board, args.output)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(board.drop(columns=['cache_key']).round(4).to_string())
+    print(f"Wrote leaderboard to {args.output}")
+    if args.save_best:
+        save_best(args.save_best, best[1], best[2], args.targets)
+        print(f"Saved best point (mae={best[0]['mae']:.4f}) to {args.save_best}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
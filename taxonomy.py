@@ -0,0 +1,256 @@
+"""Keyword taxonomy shared by the API keyword scorer and the weak labelers.
+
+taxonomy.json holds, under one `version`:
+
+* `esg`: the tiered, weighted ESG phrases the API scores with;
+* `esg_labels`: the flat E/S/G keyword lists (matches / `divisor`) used as
+  ESG training labels;
+* `sdg_labels`: the per-goal keyword lists used as SDG training labels.
+
+`Taxonomy` compiles these once into one Aho-Corasick automaton per scope
+('esg' for the API, 'labels' for the weak labelers, 'all'). Every distinct
+phrase is a single entry in the automaton, even when several lists share it.
+One `scan` reads the lowercased text once, character by character, and
+returns the set of phrases present; the cost grows with the text length,
+not with the number of phrases. All scorers read their tiers, labels and SDG
+hits from that set. Matching is plain substring containment, as before, so
+overlapping and nested phrases ('energy' inside 'renewable energy') are all
+reported.
+
+`current()` returns the compiled taxonomy of TAXONOMY_PATH and recompiles it
+when the file changes (checked at most every TAXONOMY_RELOAD_SECONDS). A file
+that fails to load or validate keeps the previous taxonomy in service.
+`stats()` reports the version, compile time, reloads and scan counts and time.
+Scan counters are kept per thread, so scanning takes no lock.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+TAXONOMY_PATH = os.environ.get('TAXONOMY_PATH',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taxonomy.json'))
+RELOAD_CHECK_SECONDS = float(os.environ.get('TAXONOMY_RELOAD_SECONDS', '2'))
+SCOPES = ('esg', 'labels', 'all')
+SDG_GOALS = tuple(range(1, 18))
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over a fixed set of lowercase phrases.
+
+    Transitions are precomputed for every state (failure links folded in), so
+    each character costs one dict lookup. `advance` can be called chunk by
+    chunk with the returned state, which finds phrases spanning chunk cuts.
+    """
+
+    def __init__(self, terms):
+        self.terms = frozenset(terms)
+        goto = [{}]
+        out = [set()]
+        for term in sorted(self.terms):
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(set())
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state].add(term)
+
+        # breadth-first, so a state's failure target is complete before the state itself
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            out[state] |= out[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+        self._delta = delta
+        self._out = [frozenset(o) if o else None for o in out]
+
+    @property
+    def states(self):
+        return len(self._delta)
+
+    def advance(self, text, state=0):
+        """(end state, phrases ending in `text`) after reading lowercase `text` from `state`."""
+        delta, out = self._delta, self._out
+        found = set()
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state] is not None:
+                found |= out[state]
+        return state, found
+
+    def scan(self, text):
+        """Set of the phrases contained in lowercase `text`."""
+        return self.advance(text)[1]
+
+
+class Taxonomy:
+    """A compiled keyword taxonomy (see module docstring)."""
+
+    def __init__(self, data, source=None):
+        started = time.perf_counter()
+        self.source = source
+        self.version = str(data.get('version', ''))
+        self.digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        esg = data['esg']
+        self.tiers = [(tier, float(weight)) for tier, weight in esg['tiers'].items()]
+        self.esg = {category: {tier: [t.lower() for t in levels.get(tier, ())] for tier, _ in self.tiers}
+                    for category, levels in esg['categories'].items()}
+        labels = data['esg_labels']
+        self.label_divisor = float(labels.get('divisor', 5))
+        self.esg_labels = {name: [t.lower() for t in words] for name, words in labels['categories'].items()}
+        goals = {int(goal): [t.lower() for t in words] for goal, words in data['sdg_labels']['goals'].items()}
+        if tuple(sorted(goals)) != SDG_GOALS:
+            raise ValueError(f"sdg_labels must define goals 1-17, got {sorted(goals)}")
+        self.sdg_labels = [goals[g] for g in SDG_GOALS]
+
+        esg_terms = {t for levels in self.esg.values() for terms in levels.values() for t in terms}
+        label_terms = {t for words in self.esg_labels.values() for t in words}
+        label_terms.update(t for words in self.sdg_labels for t in words)
+        self._terms = {'esg': frozenset(esg_terms), 'labels': frozenset(label_terms),
+                       'all': frozenset(esg_terms | label_terms)}
+        self._automata = {scope: PhraseAutomaton(terms) for scope, terms in self._terms.items()}
+        self.compile_seconds = time.perf_counter() - started
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as fh:
+            return cls(json.load(fh), source=path)
+
+    def terms(self, scope='all'):
+        return self._terms[scope]
+
+    def automaton(self, scope='all'):
+        return self._automata[scope]
+
+    def scan(self, text, scope='all'):
+        """Set of the scope's phrases contained in `text` (case-insensitive substring match)."""
+        started = time.perf_counter()
+        found = self._automata[scope].scan(text.lower())
+        counter = _scan_counter()
+        counter[0] += 1
+        counter[1] += time.perf_counter() - started
+        return found
+
+    def esg_scores(self, found):
+        """(scores, details) of the tiered ESG scorer for a set of found phrases."""
+        scores = {}
+        details = {}
+        for category, levels in self.esg.items():
+            score = 0
+            matched_terms = []
+            for tier, weight in self.tiers:
+                for term in levels[tier]:
+                    if term in found:
+                        score += weight
+                        matched_terms.append(f"{term} ({tier.replace('_', ' ')})")
+            # Normalize score to 0-1 range and round to 2 decimal places
+            scores[category] = round(min(1.0, score), 2)
+            details[category] = matched_terms
+        return scores, details
+
+    def esg_label(self, found):
+        """(E, S, G) weak labels: matched keywords / divisor, capped at 1."""
+        return tuple(round(min(1, sum(w in found for w in words) / self.label_divisor), 2)
+                     for words in self.esg_labels.values())
+
+    def sdg_label(self, found):
+        """17 SDG weak labels: fraction of the goal's keywords present."""
+        return [round(min(1.0, sum(w in found for w in words) / max(1, len(words))), 2) for words in self.sdg_labels]
+
+
+_LOCK = threading.Lock()
+_STATE = {'taxonomy': None, 'file': None, 'checked': 0.0}
+_STATS = {'loads': 0, 'reloads': 0, 'errors': 0, 'last_error': None, 'scans': 0, 'scan_seconds': 0.0}
+# [scans, seconds] per thread; only the owning thread writes its counter, so scans take no lock
+_SCAN_COUNTERS = {}
+_LOCAL = threading.local()
+
+
+def _scan_counter():
+    counter = getattr(_LOCAL, 'counter', None)
+    if counter is None:
+        counter = _LOCAL.counter = [0, 0.0]
+        with _LOCK:
+            # fold in threads that have exited, so the registry stays bounded
+            for thread in [t for t in _SCAN_COUNTERS if not t.is_alive()]:
+                scans, seconds = _SCAN_COUNTERS.pop(thread)
+                _STATS['scans'] += scans
+                _STATS['scan_seconds'] += seconds
+            _SCAN_COUNTERS[threading.current_thread()] = counter
+    return counter
+
+
+def _file_state(path):
+    try:
+        st = os.stat(path)
+        return (st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+def current():
+    """The compiled taxonomy of TAXONOMY_PATH, recompiled when the file has changed."""
+    tax = _STATE['taxonomy']
+    now = time.monotonic()
+    if tax is not None and now - _STATE['checked'] < RELOAD_CHECK_SECONDS:
+        return tax
+    with _LOCK:
+        if _STATE['taxonomy'] is not None and now - _STATE['checked'] < RELOAD_CHECK_SECONDS:
+            return _STATE['taxonomy']
+        _STATE['checked'] = now
+        state = _file_state(TAXONOMY_PATH)
+        if _STATE['taxonomy'] is not None and state == _STATE['file']:
+            return _STATE['taxonomy']
+        try:
+            tax = Taxonomy.load(TAXONOMY_PATH)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            _STATS['errors'] += 1
+            _STATS['last_error'] = f"{type(exc).__name__}: {exc}"
+            _STATE['file'] = state  # do not retry until the file changes again
+            if _STATE['taxonomy'] is None:
+                raise
+            print(f"⚠️ Keeping taxonomy {_STATE['taxonomy'].version}; {TAXONOMY_PATH} failed to load: {exc}")
+            return _STATE['taxonomy']
+        if _STATE['taxonomy'] is not None:
+            _STATS['reloads'] += 1
+            print(f"🔄 Reloaded taxonomy {tax.version} ({tax.digest}) from {TAXONOMY_PATH}")
+        _STATS['loads'] += 1
+        _STATE['taxonomy'], _STATE['file'] = tax, state
+        return tax
+
+
+def stats():
+    tax = _STATE['taxonomy']
+    with _LOCK:
+        scans = _STATS['scans'] + sum(c[0] for c in _SCAN_COUNTERS.values())
+        scan_seconds = _STATS['scan_seconds'] + sum(c[1] for c in _SCAN_COUNTERS.values())
+        out = {
+            "loaded": tax is not None,
+            "path": TAXONOMY_PATH,
+            "loads": _STATS['loads'],
+            "reloads": _STATS['reloads'],
+            "errors": _STATS['errors'],
+            "last_error": _STATS['last_error'],
+            "scans": scans,
+            "scan_ms_total": round(scan_seconds * 1000, 3),
+            "scan_us_mean": round(scan_seconds / scans * 1e6, 2) if scans else 0.0,
+        }
+    if tax is not None:
+        out.update({
+            "version": tax.version,
+            "digest": tax.digest,
+            "compile_ms": round(tax.compile_seconds * 1000, 3),
+            "terms": {scope: len(tax.terms(scope)) for scope in SCOPES},
+            "automaton_states": {scope: tax.automaton(scope).states for scope in SCOPES},
+        })
+    return out
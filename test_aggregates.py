@@ -0,0 +1,88 @@
+"""RollupStore updates per ProjectID and the /aggregates endpoint."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+
+
+def scored_frame(n=30, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ProjectID': [f'P{i}' for i in range(n)],
+        'Country': [('India', 'Kenya', None)[i % 3] for i in range(n)],
+        'Year': [2018 + i % 4 for i in range(n)],
+    })
+    for name in aggregates.DIMENSIONS:
+        df[name] = np.round(rng.random(n), 4)
+    return df
+
+
+def rebuilt(df):
+    store = aggregates.RollupStore()
+    aggregates.update_from_frame(store, df.drop(columns='ProjectID'))
+    return store
+
+
+def assert_same(store, expected):
+    for level in aggregates.LEVELS:
+        assert sorted(store.groups(level)) == sorted(expected.groups(level))
+        for key in expected.groups(level):
+            got, want = store.summary(level, key), expected.summary(level, key)
+            assert got['count'] == want['count']
+            assert got['dimensions'].keys() == want['dimensions'].keys()
+            for name, dim in want['dimensions'].items():
+                # replaced contributions are subtracted, so a rounded mean or std may flip in the last digit
+                assert got['dimensions'][name]['count'] == dim['count']
+                assert got['dimensions'][name]['histogram'] == dim['histogram']
+                assert got['dimensions'][name]['mean'] == pytest.approx(dim['mean'], abs=2e-4)
+                assert got['dimensions'][name]['std'] == pytest.approx(dim['std'], abs=2e-4)
+
+
+def test_readding_projects_does_not_double_count(tmp_path):
+    df = scored_frame()
+    store = aggregates.RollupStore()
+    assert aggregates.update_from_frame(store, df) == {"added": 30, "replaced": 0, "unchanged": 0}
+    path = str(tmp_path / 'aggregates.npz')
+    store.save(path)
+
+    store = aggregates.RollupStore.load(path)
+    assert aggregates.update_from_frame(store, df) == {"added": 0, "replaced": 0, "unchanged": 30}
+    assert_same(store, rebuilt(df))
+
+
+def test_rescored_projects_replace_their_contribution():
+    df = scored_frame()
+    store = aggregates.RollupStore()
+    aggregates.update_from_frame(store, df)
+
+    changed = df.copy()
+    changed.loc[:4, 'E'] = 0.99
+    changed.loc[0, 'Country'] = 'Brazil'  # moves between groups
+    changed.loc[1, 'Year'] = 2030
+    assert aggregates.update_from_frame(store, changed.iloc[:10]) == {"added": 0, "replaced": 5, "unchanged": 5}
+    assert_same(store, rebuilt(changed))
+
+
+def test_lookup_and_rows_without_ids():
+    store = aggregates.RollupStore()
+    scores = np.full((2, len(aggregates.DIMENSIONS)), 0.5)
+    store.update(scores, ['India', 'India'], ['2020', '2020'])
+    store.update(scores, ['India', 'India'], ['2020', '2020'])
+    assert store.lookup('country', 'India')['count'] == 4
+    assert store.lookup('country_year', 'India', '2020')['dimensions']['E']['mean'] == pytest.approx(0.5)
+    assert store.lookup('country_year', 'India') is None
+
+
+def test_aggregates_endpoint(client, api, tmp_path, monkeypatch):
+    path = str(tmp_path / 'aggregates.npz')
+    store = aggregates.RollupStore()
+    aggregates.update_from_frame(store, scored_frame())
+    store.save(path)
+    monkeypatch.setattr(api, 'AGGREGATES_PATH', path)
+
+    body = client.get('/aggregates?country=India&year=2018').get_json()
+    assert body['key'] == 'India|2018'
+    assert body['count'] == store.lookup('country_year', 'India', '2018')['count']
+    assert client.get('/aggregates?country=Nowhere').status_code == 404
+    assert client.get('/aggregates?level=planet').status_code == 400
@@ -0,0 +1,169 @@
+"""Request/response contract of /predict and /predict/batch (in-process, Flask test client)."""
+import threading
+
+import numpy as np
+import pytest
+
+import explain
+from admission import AdmissionController, Overloaded
+
+
+def test_predict_full_response(client):
+    body = client.post('/predict', json={'description': 'renewable energy solar wind'}).get_json()
+    assert body['input'] == {'description': 'renewable energy solar wind'}
+    assert set(body['scores']) == {'Environmental', 'Social', 'Governance'}
+    assert set(body['model_scores']) == {'Environment', 'Social', 'Governance'}
+    assert list(body['sdgs']) == [f'SDG{i}' for i in range(1, 18)]
+
+
+def test_compact_response_matches_full(client, descriptions):
+    full = client.post('/predict', json={'description': descriptions[0]}).get_json()
+    compact = client.post('/predict?format=compact', json={'description': descriptions[0]}).get_json()
+    header = compact['header']
+    assert 'input' not in compact and 'details' not in compact
+    assert compact['scores'] == [full['scores'][c] for c in header['scores']]
+    assert compact['overall_score'] == full['overall_score']
+    assert compact['model_scores'] == pytest.approx([full['model_scores'][c] for c in header['model_scores']])
+    assert compact['sdgs'] == pytest.approx([full['sdgs'][g] for g in header['sdgs']])
+
+
+@pytest.mark.parametrize('fmt', ['full', 'compact'])
+def test_batch_matches_single_predictions(client, descriptions, fmt):
+    batch = client.post('/predict/batch', json={'descriptions': descriptions[:5], 'format': fmt}).get_json()
+    assert batch['count'] == 5
+    for i, text in enumerate(descriptions[:5]):
+        single = client.post('/predict', json={'description': text, 'format': fmt}).get_json()
+        if fmt == 'compact':
+            assert batch['model_scores'][i] == pytest.approx(single['model_scores'])
+            assert batch['sdgs'][i] == pytest.approx(single['sdgs'])
+        else:
+            assert batch['results'][i]['model_scores'] == pytest.approx(single['model_scores'])
+            assert batch['results'][i]['sdgs'] == pytest.approx(single['sdgs'])
+
+
+def test_sdg_top_k_and_min_score(client, api, descriptions):
+    text = descriptions[1]
+    full = client.post('/predict', json={'description': text}).get_json()['sdgs']
+    _, sdg = api.predict_model_arrays([text])  # unrounded, so ties in the response do not matter
+    strongest = [f'SDG{g + 1}' for g in np.argsort(-sdg[0], kind='stable')[:3]]
+
+    top = client.post('/predict', json={'description': text, 'sdg_top_k': 3}).get_json()['sdgs']
+    assert list(top) == strongest
+    compact = client.post('/predict?format=compact', json={'description': text, 'sdg_top_k': 3}).get_json()
+    assert compact['sdgs']['goals'] == [int(g[3:]) for g in strongest]
+
+    threshold = full[strongest[1]]
+    selected = client.post('/predict', json={'description': text, 'sdg_min_score': threshold}).get_json()['sdgs']
+    assert selected and all(score >= threshold for score in selected.values())
+
+
+@pytest.mark.parametrize('body', [
+    {'description': 'solar', 'sdg_top_k': 0},
+    {'description': 'solar', 'sdg_top_k': 'three'},
+    {'description': 'solar', 'sdg_min_score': 'high'},
+    {'description': 'solar', 'explain': True, 'explain_top_k': 51},
+    {'text': 'no description field'},
+])
+def test_predict_rejects_invalid_options(client, body):
+    response = client.post('/predict', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('body', [
+    {'descriptions': 'not a list'},
+    {'descriptions': ['ok', 3]},
+    {'descriptions': ['ok'], 'sdg_top_k': -1},
+])
+def test_batch_rejects_invalid_input(client, body):
+    response = client.post('/predict/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_size_limits(client, api, monkeypatch):
+    monkeypatch.setattr(api, 'MAX_DESCRIPTION_CHARS', 20)
+    monkeypatch.setattr(api, 'MAX_BATCH_ITEMS', 2)
+    response = client.post('/predict', json={'description': 'x' * 21})
+    assert response.status_code == 413
+    assert response.get_json()['limits']['max_description_chars'] == 20
+    assert client.post('/predict', json={'description': 'x' * 20}).status_code == 200
+    assert client.post('/predict/batch', json={'descriptions': ['a', 'b', 'c']}).status_code == 413
+    assert client.post('/predict/batch', json={'descriptions': ['x' * 21]}).status_code == 413
+
+
+def test_explanations_sum_to_prediction(api, descriptions):
+    vec = api.VECTORIZER.transform(descriptions[:3])
+    for model in (api.ESG_MODEL, api.SDG_MODEL):
+        explainer = explain.LinearExplainer(model)
+        _, contributions = explainer.top_terms(vec, vec.shape[1])
+        np.testing.assert_allclose(contributions.sum(axis=2) + explainer.intercept, model.predict(vec), atol=1e-8)
+
+
+def test_explain_response(client, api, descriptions):
+    text = descriptions[2]
+    body = client.post('/predict', json={'description': text, 'explain': True, 'explain_top_k': 50}).get_json()
+    explanations = body['explanations']['model_scores']
+    assert set(explanations) == {'Environment', 'Social', 'Governance'}
+    _, intercept = explain.linear_head_params(api.ESG_MODEL)
+    vocabulary = set(api.VECTORIZER.get_feature_names_out())
+    for i, name in enumerate(('Environment', 'Social', 'Governance')):
+        terms = explanations[name]
+        assert terms and all(t['term'] in vocabulary for t in terms)
+        contributions = [t['contribution'] for t in terms]
+        assert contributions == sorted(contributions, reverse=True)
+        # fewer than 50 distinct terms, so the terms cover the whole prediction
+        assert sum(contributions) + intercept[i] == pytest.approx(body['model_scores'][name], abs=0.01)
+
+
+def occupy(controller):
+    """Hold every worker of `controller` until the returned event is set."""
+    release = threading.Event()
+    started = threading.Barrier(controller.workers + 1)
+
+    def hold():
+        started.wait()
+        release.wait()
+
+    def run():
+        try:
+            controller.run(hold)
+        except Overloaded:  # the holder itself may time out; its slot stays taken until release
+            pass
+
+    threads = [threading.Thread(target=run) for _ in range(controller.workers)]
+    for t in threads:
+        t.start()
+    started.wait()
+    return release, threads
+
+
+def test_admission_rejects_with_429(client, api, monkeypatch):
+    controller = AdmissionController(workers=1, queue_size=0, timeout=5)
+    monkeypatch.setattr(api, 'ADMISSION', controller)
+    release, threads = occupy(controller)
+    try:
+        response = client.post('/predict', json={'description': 'solar power'})
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        assert response.get_json()['retry_after'] == int(response.headers['Retry-After'])
+        assert client.get('/metrics').get_json()['admission']['rejected'] == 1
+    finally:
+        release.set()
+        for t in threads:
+            t.join()
+    assert client.post('/predict', json={'description': 'solar power'}).status_code == 200
+
+
+def test_admission_times_out_with_503(client, api, monkeypatch):
+    controller = AdmissionController(workers=1, queue_size=1, timeout=0.05)
+    monkeypatch.setattr(api, 'ADMISSION', controller)
+    release, threads = occupy(controller)
+    try:
+        response = client.post('/predict', json={'description': 'solar power'})
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+    finally:
+        release.set()
+        for t in threads:
+            t.join()
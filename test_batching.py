@@ -0,0 +1,117 @@
+"""Micro-batching scheduler (batching.py) and its use by /predict."""
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from admission import Overloaded
+from batching import MicroBatcher
+
+
+def submit_all(batcher, texts):
+    futures = [batcher.submit(text) for text in texts]
+    return [future.result(timeout=5) for future in futures]
+
+
+def test_batched_rows_equal_unbatched(api, descriptions):
+    batcher = MicroBatcher(api.predict_model_arrays, max_batch=8, window=0.01)
+    rows = submit_all(batcher, descriptions)
+    esg, sdg = api.predict_model_arrays(descriptions)
+    for i, (esg_row, sdg_row) in enumerate(rows):
+        np.testing.assert_allclose(esg_row, esg[i], atol=1e-12)
+        np.testing.assert_allclose(sdg_row, sdg[i], atol=1e-12)
+    assert batcher.stats()['items'] == len(descriptions)
+
+
+def test_batches_are_capped_at_max_batch():
+    release = threading.Event()
+    sizes = []
+
+    def predict_batch(texts):
+        release.wait()
+        sizes.append(len(texts))
+        return (np.arange(len(texts)),)
+
+    batcher = MicroBatcher(predict_batch, max_batch=4, window=0.01)
+    first = batcher.submit('first')  # holds the scheduler while the rest queue up
+    time.sleep(0.05)
+    futures = [batcher.submit(str(i)) for i in range(10)]
+    release.set()
+    assert first.result(timeout=5) == (0,)
+    assert [f.result(timeout=5)[0] for f in futures] == [0, 1, 2, 3, 0, 1, 2, 3, 0, 1]
+    assert sizes == [1, 4, 4, 2]
+    assert batcher.stats()['max_batch_seen'] == 4
+
+
+def test_partial_batch_is_flushed_after_the_window():
+    sizes = []
+
+    def predict_batch(texts):
+        sizes.append(len(texts))
+        return (np.zeros(len(texts)),)
+
+    batcher = MicroBatcher(predict_batch, max_batch=64, window=0.05)
+    batcher._last_done, batcher._last_size = time.monotonic() + 60, 8  # as if traffic were concurrent
+    started = time.monotonic()
+    assert batcher.predict('alone') == (0.0,)
+    waited = time.monotonic() - started
+    assert sizes == [1] and 0.04 <= waited < 2
+
+
+def test_prediction_times_out_with_503():
+    release = threading.Event()
+
+    def predict_batch(texts):
+        release.wait()
+        return (np.zeros(len(texts)),)
+
+    batcher = MicroBatcher(predict_batch, window=0, timeout=0.05)
+    try:
+        with pytest.raises(Overloaded) as exc:
+            batcher.predict('slow')
+        assert exc.value.status == 503 and exc.value.retry_after >= 1
+        assert batcher.stats()['timed_out'] == 1
+    finally:
+        release.set()
+    assert batcher.predict('fast') == (0.0,)
+
+
+def _predict_in_child(batcher, results):
+    try:
+        results.put(('ok', batcher.predict('in child')))
+    except Exception as exc:
+        results.put(('error', repr(exc)))
+
+
+def test_forked_child_starts_its_own_scheduler():
+    batcher = MicroBatcher(lambda texts: (np.ones(len(texts)),), window=0, timeout=5)
+    assert batcher.predict('in parent') == (1.0,)  # the parent's thread is running
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    child = ctx.Process(target=_predict_in_child, args=(batcher, results))
+    child.start()
+    child.join(timeout=10)
+    assert child.exitcode == 0
+    assert results.get(timeout=1) == ('ok', (1.0,))
+
+
+def test_predict_through_the_batcher(client, api, monkeypatch, descriptions):
+    unbatched = client.post('/predict', json={'description': descriptions[0]}).get_json()
+    monkeypatch.setattr(api, 'BATCHER', MicroBatcher(api.predict_model_arrays, window=0.005, timeout=5))
+    batched = client.post('/predict', json={'description': descriptions[0]}).get_json()
+    assert batched['model_scores'] == unbatched['model_scores'] and batched['sdgs'] == unbatched['sdgs']
+
+    release = threading.Event()
+
+    def stuck(texts):
+        release.wait()
+        return api.predict_model_arrays(texts)
+
+    monkeypatch.setattr(api, 'BATCHER', MicroBatcher(stuck, window=0, timeout=0.05))
+    try:
+        response = client.post('/predict', json={'description': 'solar power'})
+        assert response.status_code == 503 and 'Retry-After' in response.headers
+    finally:
+        release.set()
@@ -0,0 +1,61 @@
+"""Candidate artifact evaluation (evaluate.py): metrics and the per-target-set Pareto frontier."""
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import evaluate
+
+
+def row(targets, mae, latency, memory, esg_mae=None):
+    return {'targets': targets, 'mae': mae, 'esg_mae': mae if esg_mae is None else esg_mae,
+            'latency_p50_ms': latency, 'memory_bytes': memory}
+
+
+def test_pareto_front_is_per_target_set():
+    rows = [
+        row('esg', 0.05, 1.0, 100),               # ESG-only: fewer targets, so lower MAE, faster and smaller
+        row('all', 0.10, 2.0, 500, esg_mae=0.04),
+        row('all', 0.12, 2.5, 600, esg_mae=0.06),  # dominated by the other full set
+        row('all', 0.20, 1.5, 400, esg_mae=0.08),
+    ]
+    assert evaluate.pareto_front(rows) == [True, True, False, True]
+    # on the shared ESG targets the full set with ESG MAE 0.04 is not beaten by the ESG-only one
+    assert evaluate.pareto_front(rows, evaluate.ESG_PARETO_OBJECTIVES, None) == [True, True, False, False]
+    # ignoring the target sets, the ESG-only row would hide every full set
+    assert evaluate.pareto_front(rows, group=None) == [True, False, False, False]
+    assert evaluate.pareto_front([]) == []
+
+
+@pytest.fixture
+def candidates(models_dir, tmp_path):
+    esg_only = tmp_path / 'esg_only'
+    esg_only.mkdir()
+    for name in ('vectorizer.pkl', 'esg_regression.pkl'):
+        shutil.copy(os.path.join(models_dir, name), esg_only / name)
+    return [('full', models_dir), ('esg_only', str(esg_only))]
+
+
+def test_evaluate_reports_targets_and_frontiers(api, candidates, descriptions):
+    rows = {r['candidate']: r for r in evaluate.evaluate(candidates, descriptions, latency_samples=5)}
+    full, esg_only = rows['full'], rows['esg_only']
+    assert (full['targets'], esg_only['targets']) == ('all', 'esg')
+    assert 'sdg_mae' in full and 'sdg_mae' not in esg_only and 'mae_SDG1' not in esg_only
+    assert esg_only['mae'] == pytest.approx(esg_only['esg_mae'])
+    # same ESG head: same ESG accuracy, and each candidate leads its own target set
+    assert esg_only['esg_mae'] == pytest.approx(full['esg_mae'])
+    assert full['pareto'] and esg_only['pareto']
+    assert esg_only['memory_bytes'] < full['memory_bytes']
+
+
+def test_main_groups_the_table_by_target_set(api, candidates, descriptions, tmp_path, capsys):
+    corpus = tmp_path / 'projects.csv'
+    pd.DataFrame({'Description': descriptions * 3}).to_csv(corpus, index=False)
+    output = tmp_path / 'eval.csv'
+    assert evaluate.main([str(corpus), *(f'{name}={path}' for name, path in candidates), '-o', str(output),
+                          '--latency-samples', '5']) == 0
+    table = pd.read_csv(output)
+    assert table['targets'].tolist() == ['all', 'esg'] and table['candidate'].tolist() == ['full', 'esg_only']
+    assert {'pareto', 'pareto_esg'} <= set(table.columns)
+    assert 'Evaluated esg_only' in capsys.readouterr().out
@@ -0,0 +1,63 @@
+"""Normalization and resumable ingestion of project dumps (ingest.py)."""
+import json
+import os
+
+import pytest
+
+import ingest
+
+pytest.importorskip('pyarrow')
+
+
+def write_page(path, projects):
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'projects': {p['id']: p for p in projects}}, fh)
+
+
+def project(i, abstract=None):
+    return {
+        'id': f'P{i:06d}',
+        'project_abstract': {'cdata': abstract or f'Solar &amp; <b>wind</b>\n power {i}'},
+        'project_name': f'Energy {i}',
+        'countryname': ['Republic of Kenya;Uganda'],
+        'boardapprovaldate': '2019-05-01T00:00:00Z',
+    }
+
+
+def test_normalize_record():
+    assert ingest.normalize_record(project(1)) == ('P000001', 'Republic of Kenya', 2019,
+                                                   'Solar & wind power 1 Energy 1')
+    assert ingest.normalize_record({'id': 'P1'}) is None
+
+
+def test_rerun_skips_files_and_unchanged_records(tmp_path):
+    dumps, out = tmp_path / 'dumps', str(tmp_path / 'out')
+    dumps.mkdir()
+    write_page(dumps / 'page0.json', [project(i) for i in range(5)])
+    first = ingest.ingest([str(dumps)], out, workers=1)
+    assert (first['new'], first['files_skipped']) == (5, 0)
+    assert ingest.ingest([str(dumps)], out, workers=1)['files_skipped'] == 1
+
+    # a new dump repeating two projects, one of them changed
+    write_page(dumps / 'page1.json', [project(0), project(1, 'Updated abstract'), project(9)])
+    summary = ingest.ingest([str(dumps)], out, workers=1)
+    assert (summary['files_skipped'], summary['new'], summary['changed'], summary['unchanged']) == (1, 1, 1, 1)
+    df = ingest.load_ingested(out).set_index('ProjectID')
+    assert len(df) == 6
+    assert df.loc['P000001', 'Description'] == 'Updated abstract Energy 1'
+
+
+def test_interrupted_run_resumes_with_unfinished_files(tmp_path):
+    dumps, out = tmp_path / 'dumps', str(tmp_path / 'out')
+    dumps.mkdir()
+    write_page(dumps / 'page0.json', [project(i) for i in range(3)])
+    (dumps / 'page1.json').write_text('{"projects": {', encoding='utf-8')  # truncated download
+    with pytest.raises(ValueError):
+        ingest.ingest([str(dumps)], out, workers=1, shard_rows=1)
+    checkpoint = ingest.Checkpoint(out)
+    assert [os.path.basename(p) for p in checkpoint.state['files']] == ['page0.json']
+
+    write_page(dumps / 'page1.json', [project(i) for i in range(3, 6)])
+    summary = ingest.ingest([str(dumps)], out, workers=1)
+    assert (summary['files_skipped'], summary['new']) == (1, 3)
+    assert sorted(ingest.load_ingested(out)['ProjectID']) == [f'P{i:06d}' for i in range(6)]
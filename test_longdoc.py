@@ -0,0 +1,93 @@
+"""Chunked long-document scoring (longdoc.py) and the long mode of /predict."""
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import longdoc
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'ngram_range': (1, 2)},
+    {'ngram_range': (1, 3), 'stop_words': 'english', 'sublinear_tf': True},
+    {'binary': True, 'norm': 'l1', 'use_idf': False},
+])
+@pytest.mark.parametrize('chunk_chars', [20, 64, 10_000])  # longer than any token
+def test_chunked_counts_match_vectorizer_transform(descriptions, params, chunk_chars):
+    vectorizer = TfidfVectorizer(**params).fit(descriptions)
+    text = '\n\n'.join(descriptions)
+    counter = longdoc.TermCounter(vectorizer)
+    for chunk in longdoc.iter_chunks(text, chunk_chars):
+        counter.feed(chunk)
+    np.testing.assert_allclose(counter.to_matrix().toarray(), vectorizer.transform([text]).toarray(), atol=1e-12)
+
+
+def test_chunked_counts_match_the_served_vectorizer(api, descriptions):
+    text = ' '.join(descriptions)
+    counter = longdoc.TermCounter(api.VECTORIZER)
+    for chunk in longdoc.iter_chunks(text, 50):
+        counter.feed(chunk)
+    np.testing.assert_allclose(counter.to_matrix().toarray(), api.VECTORIZER.transform([text]).toarray(), atol=1e-12)
+
+
+def test_phrases_are_reported_for_the_chunk_they_end_in():
+    terms = ['renewable energy', 'energy', 'solar']
+    matcher = longdoc.PhraseMatcher(terms)
+    assert matcher.feed('solar and renewable ') == {'solar'}
+    assert matcher.feed('energy storage') == {'renewable energy', 'energy'}
+    assert matcher.feed(' more text') == set()  # 'energy' is in the carried tail, but ends earlier
+    assert matcher.found == set(terms)
+    text = 'Solar and renewable energy storage more text'
+    assert longdoc.match_terms(longdoc.iter_chunks(text, 5), terms) == {t for t in terms if t in text.lower()}
+
+
+def straddling_document(api, phrase='renewable energy'):
+    """A one-paragraph document and a section size that cuts `phrase` in two."""
+    words = ' '.join(f'filler{i}' for i in range(40))
+    text = f'{words} {phrase} {words} solar {words}'
+    start = text.index(phrase)
+    for section_chars in range(40, 400):
+        spans = longdoc.split_sections(text, section_chars)
+        if any(start < end < start + len(phrase) for _, end in spans):
+            return text, section_chars
+    raise AssertionError('no section size splits the phrase')
+
+
+def test_sections_do_not_change_the_document_score(api, monkeypatch):
+    text, section_chars = straddling_document(api)
+    monkeypatch.setattr(api, 'LONGDOC_SECTION_CHARS', section_chars)
+    monkeypatch.setattr(api, 'LONGDOC_CHUNK_CHARS', 32)
+    whole = api.score_long_document(text)
+    sectioned = api.score_long_document(text, with_sections=True)
+    assert len(sectioned['spans']) > 1
+    assert sectioned['scores'] == whole['scores'] == api.calculate_esg_scores(text)[0]
+    assert any('renewable energy' in d for d in sectioned['details']['Environmental'])
+    np.testing.assert_allclose(sectioned['esg_row'], whole['esg_row'])
+    np.testing.assert_allclose(sectioned['sdg_row'], whole['sdg_row'])
+
+    # the cut phrase counts for the section it ends in
+    end = text.index('renewable energy') + len('renewable energy')
+    owner = next(i for i, (start, stop) in enumerate(sectioned['spans']) if start < end <= stop)
+    assert sectioned['section_scores'][owner][0] >= 0.5
+
+
+def test_long_mode_matches_short_mode(client, descriptions):
+    text = ' '.join(descriptions) + ' renewable energy and community development'
+    short = client.post('/predict', json={'description': text}).get_json()
+    long = client.post('/predict', json={'description': text, 'mode': 'long', 'sections': True}).get_json()
+    assert long['mode'] == 'long' and long['sections']
+    assert long['scores'] == short['scores']
+    assert long['model_scores'] == pytest.approx(short['model_scores'], abs=0.011)
+
+
+@pytest.mark.parametrize('body', [
+    {'description': 123},
+    {'description': None},
+    {'description': ['a', 'list']},
+    {'description': {'text': 'nested'}, 'mode': 'long'},
+    ['description'],
+])
+def test_non_string_description_is_rejected(client, body):
+    response = client.post('/predict', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,131 @@
+"""Fused multi-target linear heads (multi_target.py) and their use by train_sdg.py."""
+import os
+import shutil
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.multioutput import MultiOutputRegressor
+
+import multi_target
+import synthetic
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+# the per-target reference is an lsqr solve with its own stopping tolerance, which
+# bounds the agreement; it is looser when the system is underdetermined (wide)
+@pytest.fixture(scope='module', params=[(600, 300, 1e-5), (1000, 800, 1e-5), (150, 400, 2e-5)],
+                ids=['tall', 'production-shaped', 'wide'])
+def problem(request):
+    n_docs, max_features, tolerance = request.param
+    X = TfidfVectorizer(max_features=max_features).fit_transform(synthetic.make_corpus(n_docs, seed=3))
+    rng = np.random.default_rng(3)
+    Y = X @ rng.normal(size=(X.shape[1], 17)) + rng.normal(scale=0.1, size=(n_docs, 17))
+    reference = MultiOutputRegressor(LinearRegression()).fit(X, Y)
+    return X, Y, reference.predict(X), tolerance
+
+
+@pytest.mark.parametrize('solver', ['cg', 'direct', 'lsqr'])
+def test_solvers_match_the_per_target_fit(problem, solver):
+    X, Y, expected, tolerance = problem
+    model = multi_target.fit_multi_target(X, Y, solver=solver, tol=1e-10)
+    assert isinstance(model, LinearRegression) and model.coef_.shape == (17, X.shape[1])
+    np.testing.assert_allclose(model.predict(X), expected, atol=tolerance)
+
+
+def test_cg_converges_to_the_direct_solution(problem):
+    X, Y, _, _ = problem
+    cg = multi_target.fit_multi_target(X, Y, solver='cg', tol=1e-10)
+    direct = multi_target.fit_multi_target(X, Y, solver='direct')
+    np.testing.assert_allclose(cg.predict(X), direct.predict(X), atol=1e-8)
+    np.testing.assert_allclose(cg.coef_, direct.coef_, atol=1e-6)  # both minimum-norm when underdetermined
+
+
+@pytest.mark.parametrize('solver', ['cg', 'direct'])
+def test_ridge_solvers_match_sklearn_ridge(problem, solver):
+    X, Y, _, _ = problem
+    model = multi_target.fit_multi_target(X, Y, alpha=0.5, solver=solver, tol=1e-10)
+    assert isinstance(model, Ridge)
+    expected = Ridge(alpha=0.5, solver='sparse_cg', tol=1e-10).fit(X, Y).predict(X)
+    np.testing.assert_allclose(model.predict(X), expected, atol=1e-5)
+
+
+def test_auto_solver_choice(problem, monkeypatch):
+    X, Y, _, _ = problem
+    used = []
+
+    def solve_cg(X, Yc, *args):
+        used.append('cg')
+        return np.zeros((X.shape[1], Yc.shape[1]))
+
+    monkeypatch.setattr(multi_target, '_solve_cg', solve_cg)
+    few = Y[:, :multi_target.CG_MIN_TARGETS - 1]
+    assert len(multi_target.fit_multi_target(X, few).coef_) == len(few.T) and used == []  # lsqr
+    multi_target.fit_multi_target(X, Y[:, :multi_target.CG_MIN_TARGETS])
+    multi_target.fit_multi_target(X, few, alpha=1.0)  # ridge is never lsqr
+    assert used == ['cg', 'cg']
+
+
+def test_invalid_arguments(problem):
+    X, Y, _, _ = problem
+    with pytest.raises(ValueError, match='Unknown solver'):
+        multi_target.fit_multi_target(X, Y, solver='svd')
+    with pytest.raises(ValueError, match='2-D'):
+        multi_target.fit_multi_target(X, Y[:, 0])
+    with pytest.raises(ValueError, match='lsqr'):
+        multi_target.fit_multi_target(X, Y, alpha=1.0, solver='lsqr')
+
+
+@pytest.fixture(scope='module')
+def train_sdg(tmp_path_factory):
+    """Run a copy of train_sdg.py whose base directory (its parent) is a temporary one."""
+    base = tmp_path_factory.mktemp('train_sdg')
+    (base / 'scripts').mkdir()
+    shutil.copy(os.path.join(ROOT, 'train_sdg.py'), base / 'scripts' / 'train_sdg.py')
+    docs = synthetic.make_corpus(300, seed=4)
+    pd.DataFrame({'Description': docs}).to_csv(base / 'projects.csv', index=False)
+
+    def run(**env):
+        for name in ('vectorizer.pkl', 'sdg_regression.pkl'):
+            (base / 'app' / 'models' / name).unlink(missing_ok=True)
+        result = subprocess.run([sys.executable, str(base / 'scripts' / 'train_sdg.py')], capture_output=True, text=True,
+                                env={**os.environ, 'PYTHONPATH': ROOT, 'SDG_N_JOBS': '1', **env}, timeout=300)
+        model_path = base / 'app' / 'models' / 'sdg_regression.pkl'
+        model = joblib.load(model_path) if model_path.exists() else None
+        vectorizer = joblib.load(base / 'app' / 'models' / 'vectorizer.pkl') if model is not None else None
+        return result, model, (vectorizer.transform(docs) if vectorizer is not None else None)
+
+    return run
+
+
+def test_train_sdg_solver_setting(train_sdg):
+    result, per_target, X = train_sdg()
+    assert result.returncode == 0, result.stderr
+    assert isinstance(per_target, MultiOutputRegressor) and len(per_target.estimators_) == 17
+
+    result, fused, _ = train_sdg(SDG_SOLVER='auto')
+    assert result.returncode == 0, result.stderr
+    assert 'solver=auto' in result.stdout
+    assert isinstance(fused, LinearRegression) and fused.coef_.shape[0] == 17
+    np.testing.assert_allclose(fused.predict(X), per_target.predict(X), atol=1e-5)
+
+    result, ridge, _ = train_sdg(SDG_SOLVER='cg', SDG_RIDGE_ALPHA='1.0')
+    assert result.returncode == 0, result.stderr
+    assert isinstance(ridge, Ridge) and ridge.alpha == 1.0
+
+
+@pytest.mark.parametrize('env, message', [
+    ({'SDG_SOLVER': 'svd'}, "Unknown SDG_SOLVER 'svd'"),
+    ({'SDG_RIDGE_ALPHA': '1.0'}, 'SDG_RIDGE_ALPHA needs'),
+    ({'SDG_SOLVER': 'lsqr', 'SDG_RIDGE_ALPHA': '1.0'}, 'SDG_RIDGE_ALPHA needs'),
+])
+def test_train_sdg_rejects_bad_settings_before_training(train_sdg, env, message):
+    result, model, _ = train_sdg(**env)
+    assert result.returncode != 0 and message in result.stderr
+    assert 'Loading data' not in result.stdout and model is None
@@ -0,0 +1,117 @@
+"""MinHash/LSH near-duplicate detection (near_dup.py) and its use in bulk scoring and /predict."""
+import numpy as np
+import pytest
+
+import bulk_score
+import near_dup
+from near_dup import NearDuplicateCache
+
+
+def random_text(rng, n_words=80):
+    return ' '.join(f'w{i}' for i in rng.integers(0, 5000, n_words))
+
+
+def edited(rng, text, n_edits):
+    words = text.split()
+    for i in rng.choice(len(words), n_edits, replace=False):
+        words[i] = f'x{rng.integers(1_000_000)}'
+    return ' '.join(words)
+
+
+def jaccard(a, b):
+    sa, sb = near_dup.shingles(a), near_dup.shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_minhash_estimates_jaccard():
+    rng = np.random.default_rng(0)
+    hasher = near_dup.MinHasher(num_perm=256)
+    errors = []
+    for n_edits in (0, 1, 2, 4, 8, 16, 30):
+        for _ in range(10):
+            a = random_text(rng)
+            b = edited(rng, a, n_edits)
+            errors.append(near_dup.similarity(hasher.signature(a), hasher.signature(b)) - jaccard(a, b))
+    errors = np.abs(errors)
+    # the standard error of a 256-slot estimate is at most 0.5 / sqrt(256) = 0.031
+    assert errors.mean() < 0.03 and errors.max() < 0.12
+    assert near_dup.similarity(hasher.signature('same text here'), hasher.signature('Same text, here!')) == 1.0
+
+
+@pytest.mark.parametrize('threshold', [0.8, 0.9])
+def test_lsh_recall_at_configured_bands_and_rows(threshold):
+    rng = np.random.default_rng(1)
+    hasher = near_dup.MinHasher(num_perm=128)
+    index = near_dup.LSHIndex(128, threshold)
+    bands, rows = near_dup.lsh_params(128, threshold)
+    assert (index.bands, index.rows) == (bands, rows) and bands * rows == 128
+    assert (1 / bands) ** (1 / rows) <= threshold  # the S-curve midpoint favours recall
+
+    originals = [random_text(rng) for _ in range(300)]
+    for i, text in enumerate(originals):
+        index.add(i, hasher.signature(text))
+    found = similar = unrelated = 0
+    for i, text in enumerate(originals):
+        near = edited(rng, text, 1)
+        if jaccard(text, near) >= threshold:
+            similar += 1
+            found += i in index.candidates(hasher.signature(near))
+        unrelated += len(index.candidates(hasher.signature(random_text(rng))))
+    assert similar > 100
+    # probability of sharing a band at similarity s is 1 - (1 - s**rows) ** bands
+    expected = 1 - (1 - threshold ** rows) ** bands
+    assert found / similar >= min(expected, 0.99) - 0.02
+    assert unrelated == 0
+
+
+def test_cluster_keeps_members_within_threshold():
+    rng = np.random.default_rng(2)
+    texts = []
+    for _ in range(20):
+        base = random_text(rng)
+        texts += [base, edited(rng, base, 1), edited(rng, base, 2)]
+    hasher = near_dup.MinHasher()
+    signatures = hasher.signatures(texts)
+    reps = near_dup.cluster(signatures, 0.8)
+    assert len(set(reps.tolist())) < len(texts)
+    for i, rep in enumerate(reps):
+        assert rep <= i and near_dup.similarity(signatures[i], signatures[rep]) >= 0.8
+
+
+def test_bulk_scoring_reuses_representative_scores(api, descriptions):
+    extra = sorted(api.VECTORIZER.vocabulary_)[0]
+    corpus = list(descriptions[:8])
+    corpus += [f'{text} {extra}' for text in corpus[:4]]  # near-duplicates of the first four
+    esg, sdg, reps, stats = bulk_score.score_corpus(corpus, 0.7)
+    assert stats['scored'] == len(set(reps.tolist())) and stats['skipped'] == len(corpus) - stats['scored']
+    assert reps[8:].tolist() == [0, 1, 2, 3]
+    np.testing.assert_array_equal(esg[8:], esg[:4])
+    np.testing.assert_array_equal(sdg[8:], sdg[:4])
+    direct_esg, direct_sdg = api.predict_model_arrays(corpus[:8])
+    np.testing.assert_allclose(esg[:8], direct_esg)
+    np.testing.assert_allclose(sdg[:8], direct_sdg)
+
+    esg_all, _, reps_all, stats_all = bulk_score.score_corpus(corpus)
+    assert stats_all['skipped'] == 0 and reps_all.tolist() == list(range(len(corpus)))
+    assert not np.allclose(esg_all[8:], esg_all[:4])  # the edits do change the exact scores
+
+
+def test_predict_reuses_cached_near_duplicates(client, api, monkeypatch, descriptions):
+    cache = NearDuplicateCache(capacity=2, threshold=0.8)
+    monkeypatch.setattr(api, 'NEAR_DUP_CACHE', cache)
+    text = descriptions[0]
+    first = client.post('/predict', json={'description': text, 'near_duplicate': True}).get_json()
+    assert 'near_duplicate' not in first
+    second = client.post('/predict', json={'description': text + ' again', 'near_duplicate': True}).get_json()
+    assert second['near_duplicate']['similarity'] >= 0.8
+    assert second['model_scores'] == first['model_scores'] and second['sdgs'] == first['sdgs']
+    assert cache.stats()['hits'] == 1 and cache.stats()['compute_saved_ms'] > 0
+
+    # without opting in, and for a different text, the models run
+    assert 'near_duplicate' not in client.post('/predict', json={'description': text + ' again'}).get_json()
+    other = client.post('/predict', json={'description': descriptions[1], 'near_duplicate': True}).get_json()
+    assert 'near_duplicate' not in other
+
+    # a new model version drops the cache
+    sig = cache.signature(text)
+    assert cache.get(sig, 'another-version') is None and cache.stats()['invalidations'] == 1
@@ -0,0 +1,50 @@
+"""Shared-memory parallel scoring (parallel_score.py)."""
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import parallel_score
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'binary': True, 'norm': 'l1'},
+    {'sublinear_tf': True, 'use_idf': False, 'ngram_range': (1, 2)},
+    {'dtype': np.float32, 'norm': None},
+])
+def test_transform_matches_tfidf_vectorizer(descriptions, params):
+    vectorizer = TfidfVectorizer(**params).fit(descriptions[:15])
+    terms = np.array(sorted(vectorizer.vocabulary_))
+    term_ids = np.array([vectorizer.vocabulary_[t] for t in terms])
+    idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(terms))
+    expected = vectorizer.transform(descriptions)
+    got = parallel_score.transform(descriptions, vectorizer.build_analyzer(), clone(vectorizer), terms, term_ids, idf)
+    assert got.dtype == expected.dtype
+    np.testing.assert_allclose(got.toarray(), expected.toarray(), rtol=1e-6)
+
+
+def test_score_parallel_matches_in_process(api, descriptions):
+    esg, sdg = parallel_score.score_parallel(api.VECTORIZER, api.ESG_MODEL, api.SDG_MODEL, descriptions,
+                                             workers=2, chunk_size=7, start_method='spawn')
+    expected_esg, expected_sdg = api.predict_model_arrays(descriptions)
+    np.testing.assert_allclose(esg, expected_esg, atol=1e-9)
+    np.testing.assert_allclose(sdg, expected_sdg, atol=1e-9)
+
+
+@pytest.mark.parametrize('has_track', [True, False], ids=['track-argument', 'before-3.13'])
+def test_attaching_does_not_register_blocks_with_the_resource_tracker(monkeypatch, has_track):
+    if has_track and not parallel_score._HAS_TRACK:
+        pytest.skip('SharedMemory(track=False) needs Python 3.13')
+    monkeypatch.setattr(parallel_score, '_HAS_TRACK', has_track)
+    calls = []
+    register = parallel_score.resource_tracker.register
+    monkeypatch.setattr(parallel_score.resource_tracker, 'register', lambda *args: calls.append(args) or register(*args))
+    with parallel_score.SharedArrays({'x': np.arange(6.0)}) as shared:
+        created = len(calls)
+        arrays, blocks = parallel_score.attach(shared.spec())
+        np.testing.assert_array_equal(arrays['x'], np.arange(6.0))
+        assert len(calls) == created == 1  # only the owner's registration
+        del arrays
+        for block in blocks:
+            block.close()
@@ -0,0 +1,117 @@
+"""On-demand profiling: /debug/profile and the sibling trigger handshake (profiling.py)."""
+import json
+import os
+import pstats
+import signal
+import threading
+import time
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture
+def profiled(api, monkeypatch, tmp_path):
+    monkeypatch.setattr(api, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(api, 'PROFILING_TOKEN', None)
+    monkeypatch.setattr(api, 'PROFILING_DIR', str(tmp_path))
+    return api
+
+
+def busy(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy, args=(stop,), name='busy')
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_disabled_by_default(client):
+    assert client.get('/debug/profile?seconds=0.1').status_code == 404
+
+
+def test_token_and_parameters_are_checked(profiled, client, monkeypatch):
+    monkeypatch.setattr(profiled, 'PROFILING_TOKEN', 'secret')
+    assert client.get('/debug/profile?seconds=0.1').status_code == 403
+    headers = {'X-Profile-Token': 'secret'}
+    for query in ('seconds=abc', 'seconds=0', 'seconds=1000', 'mode=perf', 'scope=cluster', 'scope=all'):
+        assert client.get(f'/debug/profile?{query}', headers=headers).status_code == 400, query
+
+
+def test_sample_mode_returns_collapsed_stacks(profiled, client, busy_thread):
+    response = client.get('/debug/profile?seconds=0.3&interval_ms=5&mode=sample')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    assert response.headers['X-Profile-Workers'] == '1'
+    lines = response.get_data(as_text=True).splitlines()
+    stacks = dict(line.rsplit(' ', 1) for line in lines)
+    assert all(int(n) > 0 for n in stacks.values())
+    assert any(stack.startswith('busy;') and 'busy (test_profiling.py' in stack for stack in stacks)
+
+
+def test_cprofile_mode_returns_a_pstats_dump(profiled, client, tmp_path):
+    def predict_during_window():
+        time.sleep(0.05)
+        profiled.app.test_client().post('/predict', json={'description': 'solar power'})
+
+    caller = threading.Thread(target=predict_during_window)
+    caller.start()
+    response = client.get('/debug/profile?seconds=0.4&mode=cprofile')
+    caller.join()
+    assert response.status_code == 200 and response.mimetype == 'application/octet-stream'
+    path = tmp_path / 'worker.prof'
+    path.write_bytes(response.get_data())
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert 'build_predict_response' in functions
+
+
+@pytest.fixture
+def signal_handler(tmp_path):
+    if profiling.PROFILE_SIGNAL is None:
+        pytest.skip('no SIGUSR2 on this platform')
+    previous = signal.getsignal(profiling.PROFILE_SIGNAL)
+    assert profiling.install_signal_handler(str(tmp_path), lambda: [])
+    yield str(tmp_path)
+    signal.signal(profiling.PROFILE_SIGNAL, previous)
+
+
+def test_trigger_files_are_per_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'sibling_workers', lambda: [])
+    first, _ = profiling.trigger_siblings(str(tmp_path), 'sample', 1.0, 0.01)
+    second, _ = profiling.trigger_siblings(str(tmp_path), 'cprofile', 2.0, 0.02)
+    assert first != second
+    triggers = {t['id']: t for t in profiling.pending_triggers(str(tmp_path), set())}
+    assert (triggers[first]['mode'], triggers[first]['seconds']) == ('sample', 1.0)
+    assert (triggers[second]['mode'], triggers[second]['seconds']) == ('cprofile', 2.0)
+    assert [t['id'] for t in profiling.pending_triggers(str(tmp_path), {first})] == [second]
+    assert not [n for n in os.listdir(tmp_path) if n.endswith('.tmp')]
+
+    profiling.remove_trigger(str(tmp_path), first)
+    (tmp_path / f'trigger-{second}.json').write_text(json.dumps({**triggers[second], 'expires': time.time() - 1}))
+    assert profiling.pending_triggers(str(tmp_path), set()) == []
+
+
+def test_signalled_worker_runs_every_pending_trigger(signal_handler, monkeypatch, busy_thread):
+    directory = signal_handler
+    monkeypatch.setattr(profiling, 'sibling_workers', lambda: [])
+    # two concurrent requests, one signal: both profiles still run, each with its own parameters
+    sample_id, _ = profiling.trigger_siblings(directory, 'sample', 0.2, 0.005)
+    cprofile_id, _ = profiling.trigger_siblings(directory, 'cprofile', 0.1, 0.01)
+    os.kill(os.getpid(), profiling.PROFILE_SIGNAL)
+
+    collapsed, workers = profiling.collect_results(directory, sample_id, 'sample', 1, timeout=5)
+    assert workers == 1 and 'busy' in collapsed
+    dump, workers = profiling.collect_results(directory, cprofile_id, 'cprofile', 1, timeout=5)
+    assert workers == 1 and dump
+
+    # a second signal does not run them again
+    os.kill(os.getpid(), profiling.PROFILE_SIGNAL)
+    time.sleep(0.3)
+    assert not [n for n in os.listdir(directory) if n.startswith(sample_id + '-')]
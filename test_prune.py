@@ -0,0 +1,57 @@
+"""Vocabulary pruning and its accuracy guard (prune.py)."""
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import evaluate
+import prune
+import quantize
+
+
+@pytest.fixture(scope='module')
+def models(models_dir):
+    return evaluate.load_artifacts(models_dir, repeat=1)[0]
+
+
+def test_select_features(models):
+    weights = prune.feature_weights([models['esg'], models['sdg']])
+    assert weights.shape == (len(models['vectorizer'].vocabulary_),)
+    kept = prune.select_features(weights, keep=10)
+    assert len(kept) == 10 and np.all(np.diff(kept) > 0)
+    assert weights[kept].min() >= np.delete(weights, kept).max()
+    np.testing.assert_array_equal(prune.select_features(weights, threshold=np.median(weights)),
+                                  np.flatnonzero(weights >= np.median(weights)))
+
+
+@pytest.mark.parametrize('dtype', [None, 'int8'])
+def test_dropping_zero_weight_features_keeps_outputs(models, descriptions, dtype):
+    models = copy.deepcopy(models)
+    # zero the weights of terms the texts do not contain, so dropping them cannot rescale the rows either
+    absent = np.flatnonzero(models['vectorizer'].transform(descriptions).getnnz(axis=0) == 0)
+    assert absent.size
+    for head in ('esg', 'sdg'):
+        for est in models[head].estimators_:
+            est.coef_[absent] = 0.0
+        if dtype:
+            models[head] = quantize.QuantizedLinearHead.from_model(models[head], dtype)
+    pruned, kept = prune.prune_artifacts(models, threshold=1e-12)
+    assert len(kept) == len(models['vectorizer'].vocabulary_) - len(absent)
+    assert len(pruned['vectorizer'].vocabulary_) == len(kept) == pruned['esg'].n_features_in_
+    for before, after in zip(evaluate.predict(models, descriptions), evaluate.predict(pruned, descriptions)):
+        np.testing.assert_allclose(after, before, atol=1e-5)
+
+
+def test_export_guard(models_dir, descriptions, tmp_path):
+    eval_csv = str(tmp_path / 'eval.csv')
+    pd.DataFrame({'Description': descriptions * 5}).to_csv(eval_csv, index=False)
+    refused = str(tmp_path / 'refused')
+    assert prune.main([models_dir, '-o', refused, '--keep', '50', '--eval', eval_csv, '--tolerance', '0.02']) == 1
+    assert not os.path.exists(refused)
+
+    output = str(tmp_path / 'pruned')
+    assert prune.main([models_dir, '-o', output, '--threshold', '0', '--eval', eval_csv]) == 0
+    loaded, _ = evaluate.load_artifacts(output, repeat=1)
+    assert len(loaded['vectorizer'].vocabulary_) == loaded['esg'].n_features_in_
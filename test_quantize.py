@@ -0,0 +1,52 @@
+"""float32 / int8 artifact export and its accuracy guard (quantize.py)."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import evaluate
+import quantize
+
+
+@pytest.fixture(scope='module')
+def models(models_dir):
+    return evaluate.load_artifacts(models_dir, repeat=1)[0]
+
+
+@pytest.fixture(scope='module')
+def eval_csv(tmp_path_factory, descriptions):
+    path = str(tmp_path_factory.mktemp('eval') / 'eval.csv')
+    pd.DataFrame({'Description': descriptions * 5}).to_csv(path, index=False)
+    return path
+
+
+def test_float32_artifacts_match(models, descriptions):
+    quantized = quantize.quantize_artifacts(models, 'float32')
+    assert quantized['esg'].kernel_.dtype == np.float32
+    assert max(quantize.output_shift(models, quantized, descriptions).values()) < 1e-4
+
+
+def test_int8_head_uses_its_dequantized_kernel(models, descriptions):
+    head = quantize.QuantizedLinearHead.from_model(models['sdg'], 'int8')
+    assert head.kernel_.dtype == np.int8 and head.scale_.shape == (17,)
+    X = quantize.quantize_vectorizer(models['vectorizer']).transform(descriptions + ['zzz unknown words'])
+    np.testing.assert_allclose(head.predict(X), X @ head.coef_.T + head.intercept_, atol=1e-5)
+    np.testing.assert_allclose(head.predict(X)[-1], head.intercept_)  # a row without known terms
+
+
+def test_export_refuses_above_tolerance(models_dir, eval_csv, tmp_path):
+    output = str(tmp_path / 'int8')
+    assert quantize.main([models_dir, '-o', output, '--dtype', 'int8', '--eval', eval_csv,
+                          '--tolerance', '1e-6']) == 1
+    assert not os.path.exists(output)
+
+
+def test_export_writes_loadable_artifacts(models_dir, models, eval_csv, descriptions, tmp_path):
+    output = str(tmp_path / 'float32')
+    assert quantize.main([models_dir, '-o', output, '--eval', eval_csv, '--tolerance', '1e-3',
+                          '--latency-samples', '10']) == 0
+    loaded, _ = evaluate.load_artifacts(output, repeat=1)
+    assert isinstance(loaded['esg'], quantize.QuantizedLinearHead)
+    for before, after in zip(evaluate.predict(models, descriptions), evaluate.predict(loaded, descriptions)):
+        np.testing.assert_allclose(after, before, atol=1e-4)
@@ -0,0 +1,73 @@
+"""Background preload, /ready and /models/status."""
+import threading
+import time
+
+import pytest
+
+
+def wait_for_state(client, states, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get('/ready')
+        if response.get_json()['state'] in states or time.monotonic() > deadline:
+            return response
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def cold_worker(api, monkeypatch, tmp_path):
+    """The app with no models loaded and a model path that has none."""
+    for name in ('VECTORIZER', 'ESG_MODEL', 'SDG_MODEL'):
+        monkeypatch.setattr(api, name, None)
+    monkeypatch.setattr(api, 'MODEL_PATHS', [str(tmp_path)])
+    monkeypatch.setattr(api, 'WARMUP_LENGTHS', (8, 64))
+    monkeypatch.setattr(api, 'PRELOAD_RETRY_SECONDS', 0.2)
+    monkeypatch.setattr(api, '_READINESS', {'state': 'idle', 'pid': None, 'load_seconds': None,
+                                            'warmup_seconds': None, 'warmup_predictions': 0, 'error': None,
+                                            'attempts': 0, 'retry_at': 0.0})
+    return api
+
+
+def test_failed_preload_is_retried(cold_worker, client, models_dir):
+    api = cold_worker
+    response = wait_for_state(client, {'failed'})
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+    assert response.get_json()['attempts'] == 1
+    assert client.get('/ready').get_json()['state'] == 'failed'  # still backing off
+
+    time.sleep(0.25)
+    response = wait_for_state(client, {'failed'})
+    assert response.get_json()['attempts'] == 2
+    assert api._READINESS['retry_at'] - time.monotonic() > 0.2  # the backoff doubled
+
+    # a request loads the models lazily: the next /ready warms up and turns ready without waiting
+    api.MODEL_PATHS[:] = [models_dir]
+    assert client.post('/predict', json={'description': 'solar power'}).status_code == 200
+    response = wait_for_state(client, {'ready'})
+    assert response.status_code == 200
+    assert response.get_json()['warmup_predictions'] > 0
+    assert client.get('/health').get_json()['ready'] is True
+
+
+def test_models_status_reports_without_loading_or_blocking(cold_worker, client):
+    api = cold_worker
+    api._LOAD_LOCK.acquire()
+    try:
+        result = {}
+        probe = threading.Thread(target=lambda: result.update(client.get('/models/status').get_json()))
+        probe.start()
+        probe.join(timeout=5)
+        assert not probe.is_alive()
+    finally:
+        api._LOAD_LOCK.release()
+    assert result['loading'] is True
+    assert result['esg_model_loaded'] is False and api.ESG_MODEL is None
+    assert 'memory' in result
+
+
+def test_models_status_does_not_load_present_artifacts(cold_worker, client, monkeypatch, models_dir):
+    monkeypatch.setattr(cold_worker, 'MODEL_PATHS', [models_dir])
+    result = client.get('/models/status').get_json()
+    assert result['loading'] is False
+    assert result['esg_model_loaded'] is False and cold_worker.ESG_MODEL is None
+    assert all(result['found_files'][models_dir].values())
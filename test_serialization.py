@@ -0,0 +1,78 @@
+"""JSON / MessagePack encoding and content negotiation (serialization.py)."""
+import json
+
+import numpy as np
+import pytest
+
+import api_client
+import serialization
+
+pytest.importorskip('msgpack')
+
+MSGPACK = serialization.MSGPACK_MIMETYPE
+
+
+def test_dumps_numpy_values():
+    data = {'a': np.arange(3, dtype=np.float32)[::-1], 'b': np.float64(0.5), 'c': np.zeros((2, 2))}
+    assert json.loads(serialization.dumps(data)) == {'a': [2.0, 1.0, 0.0], 'b': 0.5, 'c': [[0.0, 0.0], [0.0, 0.0]]}
+
+
+@pytest.mark.parametrize('array', [
+    np.arange(6, dtype=np.float64).reshape(2, 3),
+    np.arange(4, dtype=np.float32)[::2],  # non-contiguous
+    np.array([1, -2, 3], dtype=np.int8),
+    np.zeros((0, 17)),
+    np.arange(3, dtype='>f8'),  # big-endian input is packed little-endian
+])
+def test_msgpack_ndarray_round_trip(array):
+    decoded = serialization.unpackb(serialization.packb({'x': array, 'n': np.int64(7), 's': 'text'}))
+    np.testing.assert_array_equal(decoded['x'], array)
+    assert decoded['x'].shape == array.shape and decoded['x'].dtype == array.dtype.newbyteorder('<')
+    assert decoded['n'] == 7 and decoded['s'] == 'text'
+
+
+@pytest.mark.parametrize('data', [b'\x92\x01', serialization.packb({'a': 1}) + b'\x01', b'\xc1',
+                                  b'\xc7\x03\x01\x05<f'])
+def test_unpackb_rejects_malformed_input(data):
+    with pytest.raises(ValueError, match='Invalid MessagePack body'):
+        serialization.unpackb(data)
+
+
+def test_predict_msgpack_matches_json(client, descriptions):
+    body = {'descriptions': descriptions[:4], 'format': 'compact', 'sdg_top_k': 3}
+    expected = client.post('/predict/batch', json=body).get_json()
+    response = client.post('/predict/batch', data=serialization.packb(body), content_type=MSGPACK)
+    assert response.mimetype == MSGPACK and 'Accept' in response.vary
+    decoded = serialization.unpackb(response.get_data())
+    assert isinstance(decoded['model_scores'], np.ndarray) and decoded['model_scores'].shape == (4, 3)
+    np.testing.assert_allclose(decoded['model_scores'], expected['model_scores'])
+    assert [g.tolist() for g in decoded['sdgs']['goals']] == expected['sdgs']['goals']
+
+
+@pytest.mark.parametrize('content_type, accept, expected', [
+    (MSGPACK, None, MSGPACK),
+    (MSGPACK, 'application/json', 'application/json'),
+    ('application/json', MSGPACK, MSGPACK),
+    ('application/json', None, 'application/json'),
+    ('application/json', 'application/x-msgpack', 'application/x-msgpack'),
+])
+def test_accept_negotiation(client, content_type, accept, expected):
+    body = {'description': 'solar power'}
+    data = serialization.packb(body) if content_type == MSGPACK else json.dumps(body)
+    headers = {'Accept': accept} if accept else {}
+    response = client.post('/predict', data=data, content_type=content_type, headers=headers)
+    assert response.status_code == 200 and response.mimetype == expected
+    assert api_client.decode(response.content_type, response.get_data())['input'] == body
+
+
+@pytest.mark.parametrize('path', ['/predict', '/predict/batch'])
+@pytest.mark.parametrize('data, content_type', [
+    (b'\x92\x01', MSGPACK),
+    (serialization.packb({'description': 'solar'}) + b'\x00', MSGPACK),
+    (b'{"description": "solar"', 'application/json'),
+    (b'', 'application/json'),
+])
+def test_unparsable_bodies_are_client_errors(client, path, data, content_type):
+    response = client.post(path, data=data, content_type=content_type)
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid')
@@ -0,0 +1,102 @@
+"""Nearest-neighbour indexes (similarity.py) and the /similar endpoint."""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+import similarity
+import synthetic
+
+
+@pytest.fixture(scope='module')
+def topic_matrices():
+    vectorizer = TfidfVectorizer(max_features=2000).fit(synthetic.make_topic_corpus(2000, n_topics=40, seed=0))
+    corpus = vectorizer.transform(synthetic.make_topic_corpus(3000, n_topics=40, seed=1))
+    queries = vectorizer.transform(synthetic.make_topic_corpus(50, n_topics=40, seed=2))
+    return corpus, queries
+
+
+def brute_force(corpus, queries, k):
+    scores = (normalize(queries) @ normalize(corpus).T).toarray()
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(scores, order, axis=1), order
+
+
+def test_exact_index_matches_brute_force_cosine(topic_matrices):
+    corpus, queries = topic_matrices
+    index = similarity.ExactIndex(corpus, max_block_cells=10 * corpus.shape[0])  # several query blocks
+    assert index.query_block == 10
+    scores, rows = index.query(queries, 10)
+    expected_scores, expected_rows = brute_force(corpus, queries, 10)
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-12)
+    # ties may come back in either order; the scores at each rank are what must agree
+    np.testing.assert_allclose((normalize(queries) @ normalize(corpus).T).toarray()[np.arange(50)[:, None], rows],
+                               expected_scores, atol=1e-12)
+    assert (rows == expected_rows).mean() > 0.99
+
+
+def recall(truth, rows):
+    return np.mean([len(set(a) & set(b)) / truth.shape[1] for a, b in zip(truth.tolist(), rows.tolist())])
+
+
+def test_approx_index_recall_against_exact(topic_matrices):
+    corpus, queries = topic_matrices
+    _, truth = similarity.ExactIndex(corpus).query(queries, 10)
+    index = similarity.ApproxIndex(corpus, dims=64, n_lists=30)
+    recalls = []
+    for n_probe in (4, 16, 30):  # probing all 30 lists is exhaustive
+        index.n_probe = n_probe
+        scores, rows = index.query(queries, 10)
+        assert np.all(np.diff(scores, axis=1) <= 0)
+        recalls.append(recall(truth, rows))
+    assert recalls[0] < recalls[1] < recalls[2] == 1.0
+    assert recalls[1] >= 0.85
+
+
+def test_build_index_modes(topic_matrices):
+    corpus, _ = topic_matrices
+    assert similarity.build_index(corpus, 'auto', approx_min_docs=10_000).mode == 'exact'
+    assert similarity.build_index(corpus, 'auto', approx_min_docs=1000, dims=16).mode == 'approx'
+    with pytest.raises(ValueError):
+        similarity.build_index(corpus, 'nearest')
+
+
+@pytest.fixture
+def similar_corpus(api, monkeypatch, tmp_path, descriptions):
+    path = tmp_path / 'projects.csv'
+    pd.DataFrame({'ProjectID': [f'P{i}' for i in range(len(descriptions))],
+                  'Country': ['Kenya'] * len(descriptions),
+                  'Description': descriptions}).to_csv(path, index=False)
+    monkeypatch.setattr(api, 'SIMILARITY_CORPUS', str(path))
+    monkeypatch.setattr(api, 'SIMILARITY_MODE', 'exact')
+    monkeypatch.setitem(api._SIMILARITY, 'vectorizer', None)  # rebuild for this corpus
+    return descriptions
+
+
+def test_similar_ranks_the_corpus(client, similar_corpus):
+    body = client.get('/similar?project_id=P3&k=5').get_json()
+    assert body['mode'] == 'exact' and 0 < len(body['results']) <= 5
+    assert 'P3' not in [r['project_id'] for r in body['results']]
+    assert [r['similarity'] for r in body['results']] == sorted((r['similarity'] for r in body['results']), reverse=True)
+
+    body = client.post('/similar', json={'description': similar_corpus[3], 'k': 3}).get_json()
+    assert body['results'][0]['project_id'] == 'P3' and body['results'][0]['similarity'] == pytest.approx(1.0)
+
+
+def test_query_without_shared_terms_has_no_results(client, api, similar_corpus, monkeypatch):
+    response = client.post('/similar', json={'description': 'qqqzzz xxyyzz', 'k': 10})
+    assert response.status_code == 200 and response.get_json()['results'] == []
+
+    # the rarest corpus term returns only the projects that contain it
+    vocabulary = api.VECTORIZER.vocabulary_
+    counts = {}
+    for text in similar_corpus:
+        for word in set(text.lower().split()) & set(vocabulary):
+            counts[word] = counts.get(word, 0) + 1
+    rare = min(counts, key=counts.get)
+    results = client.post('/similar', json={'description': rare, 'k': 10}).get_json()['results']
+    assert len(results) == counts[rare] and all(r['similarity'] > 0 for r in results)
+
+    monkeypatch.setattr(api, 'SIMILARITY_MIN_SCORE', 0.99)
+    assert client.get('/similar?project_id=P3&k=5').get_json()['results'] == []
@@ -0,0 +1,126 @@
+"""Coalescing of identical in-flight calls (singleflight.py) and of /predict requests."""
+import threading
+import time
+
+import pytest
+
+from admission import Overloaded
+from singleflight import SingleFlight
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def run_concurrently(n, target):
+    results = [None] * n
+
+    def call(i):
+        try:
+            results[i] = target()
+        except Exception as exc:
+            results[i] = exc
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait()
+        return {'value': 42}
+
+    threads, results = run_concurrently(4, lambda: flight.do('key', work))
+    wait_until(lambda: flight.stats()['coalesced'] == 3)
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(result == {'value': 42} for result, _ in results)
+    assert flight.stats()['in_flight'] == 0
+    assert flight.do('key', lambda: 'fresh') == ('fresh', False)  # results are not cached
+
+
+def test_errors_are_shared_and_followers_time_out():
+    flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+
+    def fail():
+        release.wait()
+        raise RuntimeError('boom')
+
+    threads, results = run_concurrently(2, lambda: flight.do('key', fail))
+    wait_until(lambda: flight.stats()['coalesced'] == 1)
+    wait_until(lambda: any(isinstance(r, Overloaded) for r in results))
+    release.set()
+    for t in threads:
+        t.join()
+    timed_out = [r for r in results if isinstance(r, Overloaded)]
+    assert len(timed_out) == 1 and timed_out[0].status == 503
+    assert sum(isinstance(r, RuntimeError) for r in results) == 1
+
+    flight.timeout = 5
+    release.clear()
+    threads, results = run_concurrently(3, lambda: flight.do('key', fail))
+    wait_until(lambda: flight.stats()['coalesced'] == 3)
+    release.set()
+    for t in threads:
+        t.join()
+    assert all(isinstance(r, RuntimeError) for r in results)
+    stats = flight.stats()
+    assert (stats['errors'], stats['shared_errors'], stats['timed_out']) == (2, 2, 1)
+
+
+def test_identical_predict_requests_run_once(client, api, monkeypatch):
+    monkeypatch.setattr(api, 'SINGLEFLIGHT', SingleFlight(timeout=5))
+    release = threading.Event()
+    calls = []
+    build = api.build_predict_response
+
+    def slow_build(*args):
+        calls.append(args[0])
+        release.wait()
+        return build(*args)
+
+    monkeypatch.setattr(api, 'build_predict_response', slow_build)
+    texts = ['solar power plant', '  solar power plant ', 'solar power plant']
+    threads, responses = [], [None] * len(texts)
+    for i, text in enumerate(texts):
+        def post(i=i, text=text):
+            responses[i] = api.app.test_client().post('/predict', json={'description': text}).get_json()
+        threads.append(threading.Thread(target=post))
+        threads[-1].start()
+    wait_until(lambda: api.SINGLEFLIGHT.stats()['coalesced'] == 2)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    for text, body in zip(texts, responses):
+        assert body['input'] == {'description': text}  # each caller gets its own input echoed
+        assert body['model_scores'] == responses[0]['model_scores']
+    assert client.get('/metrics').get_json()['coalescing']['coalesced'] == 2
+
+
+@pytest.mark.parametrize('other', [
+    {'description': 'solar power plant', 'format': 'compact'},
+    {'description': 'solar power plant', 'sdg_top_k': 2},
+    {'description': 'wind farm'},
+])
+def test_different_requests_are_not_coalesced(api, other):
+    base = {'description': 'solar power plant'}
+    key = api.coalescing_key(base['description'], base, False, (None, None), None)
+    compact = other.get('format') == 'compact'
+    other_key = api.coalescing_key(other['description'], other, compact, api.parse_sdg_options(other), None)
+    assert key != other_key
@@ -0,0 +1,46 @@
+"""CSV / Parquet corpus reading and writing (storage.py)."""
+import pandas as pd
+import pytest
+
+import storage
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def corpus():
+    return pd.DataFrame({
+        'ProjectID': [f'P{i}' for i in range(10)],
+        'Country': ['India', 'Kenya'] * 5,
+        'Description': [f'solar project {i}' for i in range(10)],
+        'E': [i / 10 for i in range(10)],
+    })
+
+
+@pytest.mark.parametrize('name', ['corpus.csv', 'corpus.parquet'])
+def test_round_trip(tmp_path, corpus, name):
+    path = str(tmp_path / name)
+    storage.write_corpus(corpus, path)
+    df = storage.read_corpus(path)
+    assert df['Country'].astype(str).tolist() == corpus['Country'].tolist()
+    pd.testing.assert_frame_equal(df.drop(columns='Country'), corpus.drop(columns='Country'))
+    assert storage.columns_of(path) == list(corpus.columns)
+
+
+@pytest.mark.parametrize('name', ['corpus.csv', 'corpus.parquet'])
+def test_reads_only_present_requested_columns(tmp_path, corpus, name):
+    path = str(tmp_path / name)
+    storage.write_corpus(corpus, path)
+    df = storage.read_corpus(path, ['Description', 'Year'])
+    assert list(df.columns) == ['Description']
+    batches = list(storage.iter_corpus(path, ['ProjectID'], batch_size=4))
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert pd.concat(batches)['ProjectID'].tolist() == corpus['ProjectID'].tolist()
+
+
+def test_parquet_dictionary_columns_and_filters(tmp_path, corpus):
+    path = str(tmp_path / 'corpus.parquet')
+    storage.write_corpus(corpus, path, row_group_size=2)
+    assert isinstance(storage.read_corpus(path)['Country'].dtype, pd.CategoricalDtype)
+    kenya = storage.read_corpus(path, ['ProjectID', 'Country'], filters=[('Country', '=', 'Kenya')])
+    assert kenya['ProjectID'].tolist() == corpus.loc[corpus['Country'] == 'Kenya', 'ProjectID'].tolist()
@@ -0,0 +1,99 @@
+"""NDJSON streaming endpoint /predict/stream."""
+import json
+
+import pytest
+
+from admission import Overloaded
+
+
+def ndjson(items):
+    return ''.join(json.dumps(item) + '\n' for item in items).encode('utf-8')
+
+
+def stream(client, body, query=''):
+    response = client.post(f'/predict/stream{query}', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data().splitlines()]
+    return lines[:-1], lines[-1]
+
+
+@pytest.mark.parametrize('fmt', ['full', 'compact'])
+def test_stream_matches_batch(client, descriptions, fmt):
+    items = [{'id': f'P{i}', 'description': d} if i % 2 else d for i, d in enumerate(descriptions)]
+    results, done = stream(client, ndjson(items), f'?format={fmt}&sdg_top_k=3')
+    assert done == {'done': True, 'count': len(descriptions), 'errors': 0}
+    assert [r['index'] for r in results] == list(range(len(descriptions)))
+    assert [r.get('id') for r in results] == [f'P{i}' if i % 2 else None for i in range(len(descriptions))]
+
+    batch = client.post('/predict/batch', json={'descriptions': descriptions, 'format': fmt, 'sdg_top_k': 3})
+    batch = batch.get_json()
+    for i, result in enumerate(results):
+        if fmt == 'compact':
+            assert result['model_scores'] == batch['model_scores'][i]
+            assert result['sdgs'] == {'goals': batch['sdgs']['goals'][i], 'scores': batch['sdgs']['scores'][i]}
+        else:
+            assert {k: result[k] for k in batch['results'][i]} == batch['results'][i]
+
+
+def test_invalid_lines_get_error_lines(client, api, monkeypatch):
+    monkeypatch.setattr(api, 'MAX_REQUEST_BYTES', 200)
+    body = b'\n'.join([
+        b'"solar power"',
+        b'{not json',
+        b'',  # blank lines are skipped
+        b'{"id": 7, "text": "no description"}',
+        json.dumps('x' * 300).encode('utf-8'),  # longer than MAX_REQUEST_BYTES
+        b'{"id": 8, "description": "wind farm"}',
+    ]) + b'\n'
+    results, done = stream(client, body)
+    assert done == {'done': True, 'count': 5, 'errors': 3}
+    assert [r['index'] for r in results] == [0, 1, 2, 3, 4]
+    assert ['error' in r for r in results] == [False, True, True, True, False]
+    assert results[1]['error'].startswith('invalid JSON')
+    assert results[2]['id'] == 7 and 'description' in results[2]['error']
+    assert 'exceeds 200 bytes' in results[3]['error']
+    assert results[4]['id'] == 8 and 'model_scores' in results[4]
+
+
+@pytest.mark.parametrize('query', ['?sdg_top_k=many', '?sdg_top_k=0', '?explain=1&explain_top_k=500'])
+def test_invalid_options_are_rejected(client, query):
+    response = client.post(f'/predict/stream{query}', data=b'"solar"\n')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_batches_grow_to_stream_batch_size(api, monkeypatch):
+    monkeypatch.setattr(api, 'STREAM_BATCH_SIZE', 4)
+    items = [(i, None, f'solar {i}', None) for i in range(12)]
+    chunks = list(api.stream_results(iter(items), True, (None, None), None))
+    sizes = [len(chunk.splitlines()) for chunk in chunks[:-1]]
+    assert sizes == [1, 2, 4, 4, 1]
+    assert json.loads(chunks[-1]) == {'done': True, 'count': 12, 'errors': 0}
+
+
+def test_closing_the_stream_stops_reading(api):
+    consumed = []
+
+    def lines():
+        for i in range(1000):
+            consumed.append(i)
+            yield i, None, f'solar {i}', None
+
+    before = dict(api._STREAM_STATS)
+    results = api.stream_results(lines(), True, (None, None), None)
+    next(results)
+    next(results)
+    results.close()  # what the server does when the client disconnects
+    assert len(consumed) == 3
+    assert api._STREAM_STATS['cancelled'] == before['cancelled'] + 1
+    assert api._STREAM_STATS['active'] == before['active']
+
+
+def test_overload_ends_the_stream_with_retry_after(client, api, monkeypatch):
+    def refuse(*args):
+        raise Overloaded("Inference queue is full", 429, 3)
+
+    monkeypatch.setattr(api, 'run_inference', refuse)
+    results, done = stream(client, ndjson(['solar power', 'wind farm']))
+    assert results == []
+    assert done == {'done': False, 'count': 0, 'error': 'Inference queue is full', 'retry_after': 3}
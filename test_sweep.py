@@ -0,0 +1,79 @@
+"""Hyperparameter sweep with cached featurization (sweep.py)."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error
+
+import sweep
+import synthetic
+import weak_labels
+
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory):
+    path = tmp_path_factory.mktemp('sweep') / 'projects.csv'
+    texts = synthetic.make_corpus(240, words_per_doc=40, seed=5)
+    pd.DataFrame({'Description': texts}).to_csv(path, index=False)
+    return str(path), texts
+
+
+def run_sweep(corpus_path, tmp_path, *extra):
+    output = str(tmp_path / 'leaderboard.csv')
+    argv = [corpus_path, '-o', output, '--cache-dir', str(tmp_path / 'cache'), '--workers', '2',
+            '--max-features', '300', '600', '--alpha', '0', '0.5', *extra]
+    assert sweep.main(argv) == 0
+    return pd.read_csv(output)
+
+
+def test_featurization_is_cached_across_grid_points_and_runs(corpus, tmp_path, capsys):
+    board = run_sweep(corpus[0], tmp_path)
+    assert len(board) == 4 and 'Featurized 2 settings (0 cached)' in capsys.readouterr().out
+    # two heads per featurizer, one cache entry each
+    assert sorted(board.groupby('cache_key')['alpha'].apply(sorted).tolist()) == [[0.0, 0.5], [0.0, 0.5]]
+    assert sorted(os.listdir(tmp_path / 'cache')) == sorted(board['cache_key'].unique())
+    stamps = {key: os.stat(tmp_path / 'cache' / key / 'X_train.npz').st_mtime_ns for key in board['cache_key']}
+
+    again = run_sweep(corpus[0], tmp_path)
+    assert 'Featurized 0 settings (2 cached)' in capsys.readouterr().out
+    assert (again['featurize_s'] == 0).all()
+    assert {key: os.stat(tmp_path / 'cache' / key / 'X_train.npz').st_mtime_ns for key in again['cache_key']} == stamps
+    pd.testing.assert_frame_equal(again[['cache_key', 'alpha', 'mae', 'r2']], board[['cache_key', 'alpha', 'mae', 'r2']])
+
+    # another split is another cache entry
+    run_sweep(corpus[0], tmp_path, '--seed', '1')
+    assert 'Featurized 2 settings (0 cached)' in capsys.readouterr().out
+    assert len(os.listdir(tmp_path / 'cache')) == 4
+
+
+def test_results_match_a_direct_fit(corpus, tmp_path):
+    path, texts = corpus
+    board = run_sweep(path, tmp_path, '--ngram', '1,2', '--sublinear', '1')
+    row = board[(board['max_features'] == 600) & (board['alpha'] == 0.5)].iloc[0]
+    assert (row['ngram_range'], bool(row['sublinear_tf'])) == ('1,2', True)
+
+    train, test = sweep.split_indices(len(texts), 0.2, 0)
+    vectorizer = TfidfVectorizer(max_features=600, ngram_range=(1, 2), sublinear_tf=True)
+    X_train = vectorizer.fit_transform([texts[i] for i in train])
+    X_test = vectorizer.transform([texts[i] for i in test])
+    Y = weak_labels.label_matrix(texts)
+    pred = Ridge(alpha=0.5).fit(X_train, Y[train]).predict(X_test)
+    assert row['features'] == X_train.shape[1]
+    assert row['mae'] == pytest.approx(mean_absolute_error(Y[test], pred), abs=1e-6)
+    assert row['esg_mae'] == pytest.approx(mean_absolute_error(Y[test][:, :3], pred[:, :3]), abs=1e-6)
+    assert list(board['mae']) == sorted(board['mae'])
+
+
+def test_best_point_is_saved_as_api_artifacts(corpus, tmp_path):
+    import joblib
+
+    board = run_sweep(corpus[0], tmp_path, '--save-best', str(tmp_path / 'best'))
+    vectorizer = joblib.load(tmp_path / 'best' / 'vectorizer.pkl')
+    esg, sdg = (joblib.load(tmp_path / 'best' / name) for name in ('esg_regression.pkl', 'sdg_regression.pkl'))
+    assert len(vectorizer.vocabulary_) == board.iloc[0]['features']
+    X = vectorizer.transform(corpus[1][:5])
+    assert esg.predict(X).shape == (5, 3) and sdg.predict(X).shape == (5, 17)
+    assert np.isfinite(esg.predict(X)).all()
@@ -0,0 +1,97 @@
+"""Keyword taxonomy automaton, scan counters and hot reload (taxonomy.py)."""
+import json
+import os
+import threading
+
+import pytest
+
+import taxonomy
+import weak_labels
+
+TEXTS = [
+    "Renewable energy and solar power with community training and a transparent governance structure",
+    "Water conservation, recycling and biodiversity; anti-corruption accountability framework",
+    "Nothing relevant here",
+]
+
+
+@pytest.mark.parametrize('text', TEXTS)
+@pytest.mark.parametrize('scope', taxonomy.SCOPES)
+def test_scan_matches_plain_substring_search(text, scope):
+    tax = taxonomy.Taxonomy.load(taxonomy.TAXONOMY_PATH)
+    assert tax.scan(text, scope) == {t for t in tax.terms(scope) if t in text.lower()}
+
+
+def test_automaton_reports_nested_and_overlapping_phrases():
+    automaton = taxonomy.PhraseAutomaton(['he', 'she', 'his', 'hers', 'energy', 'renewable energy', 'wind'])
+    assert automaton.scan('ushers') == {'she', 'he', 'hers'}
+    assert automaton.scan('renewable energy from windows') == {'renewable energy', 'energy', 'wind'}
+    assert automaton.scan('nothing here') == {'he'}
+    # state carried across chunks finds phrases cut in two, each reported where it ends
+    state, first = automaton.advance('renewable en')
+    state, second = automaton.advance('ergy and wi', state)
+    assert first == set() and second == {'renewable energy', 'energy'}
+    assert automaton.advance('nd', state)[1] == {'wind'}
+
+
+def test_scan_counters_are_per_thread(taxonomy_file):
+    tax = taxonomy.current()
+    threads = [threading.Thread(target=lambda: [tax.scan(t) for t in TEXTS]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tax.scan(TEXTS[0])
+    assert taxonomy.stats()['scans'] == 4 * len(TEXTS) + 1
+    late = threading.Thread(target=tax.scan, args=(TEXTS[1],))
+    late.start()
+    late.join()
+    assert len(taxonomy._SCAN_COUNTERS) == 2  # registering folded in the exited threads
+    assert taxonomy.stats()['scans'] == 4 * len(TEXTS) + 2
+
+
+def test_api_scorer_and_weak_labels_share_one_scan():
+    tax = taxonomy.Taxonomy.load(taxonomy.TAXONOMY_PATH)
+    found = tax.scan(TEXTS[0])
+    scores, details = tax.esg_scores(found)
+    assert scores['Environmental'] > 0 and any('renewable energy' in d for d in details['Environmental'])
+    assert weak_labels.label_matrix([TEXTS[0]])[0, :3].tolist() == list(tax.esg_label(found))
+
+
+@pytest.fixture
+def taxonomy_file(tmp_path, monkeypatch):
+    path = tmp_path / 'taxonomy.json'
+    with open(taxonomy.TAXONOMY_PATH, encoding='utf-8') as fh:
+        data = json.load(fh)
+    path.write_text(json.dumps(data), encoding='utf-8')
+    monkeypatch.setattr(taxonomy, 'TAXONOMY_PATH', str(path))
+    monkeypatch.setattr(taxonomy, 'RELOAD_CHECK_SECONDS', 0)
+    monkeypatch.setattr(taxonomy, '_STATE', {'taxonomy': None, 'file': None, 'checked': 0.0})
+    monkeypatch.setattr(taxonomy, '_STATS', {'loads': 0, 'reloads': 0, 'errors': 0, 'last_error': None,
+                                           'scans': 0, 'scan_seconds': 0.0})
+    monkeypatch.setattr(taxonomy, '_SCAN_COUNTERS', {})
+    monkeypatch.setattr(taxonomy, '_LOCAL', threading.local())
+    return path, data
+
+
+def rewrite(path, text, bump):
+    path.write_text(text, encoding='utf-8')
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))
+
+
+def test_hot_reload_and_bad_file_keeps_previous(taxonomy_file):
+    path, data = taxonomy_file
+    first = taxonomy.current()
+    assert taxonomy.current() is first
+
+    data['version'] = 'next'
+    data['esg']['categories']['Environmental']['high_impact'].append('tidal power')
+    rewrite(path, json.dumps(data), 10**9)
+    reloaded = taxonomy.current()
+    assert reloaded.version == 'next' and 'tidal power' in reloaded.scan('new tidal power plant')
+
+    rewrite(path, '{"version": "broken"', 2 * 10**9)
+    assert taxonomy.current() is reloaded
+    stats = taxonomy.stats()
+    assert (stats['reloads'], stats['errors']) == (1, 1)
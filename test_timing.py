@@ -0,0 +1,52 @@
+"""Server-Timing header and `timings` body field (timing.py)."""
+import pytest
+
+from batching import MicroBatcher
+
+
+def parse_server_timing(value):
+    """{name: (ms or None, desc or None)} from a Server-Timing header (repeated names keep the last)."""
+    stages = {}
+    for part in value.split(', '):
+        name, *params = part.split(';')
+        fields = dict(p.split('=', 1) for p in params)
+        stages[name] = (float(fields['dur']) if 'dur' in fields else None, fields.get('desc', '').strip('"') or None)
+    return stages
+
+
+@pytest.fixture
+def timed(api, monkeypatch):
+    monkeypatch.setattr(api, 'SERVER_TIMING', True)
+    monkeypatch.setattr(api, 'SINGLEFLIGHT', None)
+    return api
+
+
+def test_stages_of_a_predict_request(timed, client):
+    response = client.post('/predict', json={'description': 'solar power for schools', 'timings': True})
+    stages = parse_server_timing(response.headers['Server-Timing'])
+    assert {'parse', 'kw', 'models', 'vec', 'esg', 'sdg', 'ser', 'total'} <= set(stages)
+    assert stages['models'] == (None, 'cached')
+    durations = {name: ms for name, (ms, _) in stages.items() if ms is not None}
+    assert all(ms >= 0 for ms in durations.values())
+    assert sum(ms for name, ms in durations.items() if name != 'total') <= durations['total']
+    body = response.get_json()['timings']
+    assert body['models'] == 'cached' and body['vec'] > 0 and body['esg'] > 0
+
+
+def test_stages_run_on_the_batcher_thread_are_reported(timed, client, monkeypatch, models_dir):
+    monkeypatch.setattr(timed, 'BATCHER', MicroBatcher(timed.predict_model_arrays, window=0, timeout=5))
+    for name in ('VECTORIZER', 'ESG_MODEL', 'SDG_MODEL'):
+        monkeypatch.setattr(timed, name, None)  # the lazy load happens on the batcher thread
+
+    response = client.post('/predict', json={'description': 'wind farm'})
+    stages = parse_server_timing(response.headers['Server-Timing'])
+    assert {'batch', 'load', 'vec', 'esg', 'sdg', 'total'} <= set(stages)
+    assert stages['load'][1] == 'lazy'
+    batch = stages['batch'][0]
+    assert stages['load'][0] + stages['vec'][0] + stages['esg'][0] + stages['sdg'][0] <= batch <= stages['total'][0]
+
+    # only the timed caller's batch is timed; a request without a timer gets no stages
+    stages = parse_server_timing(client.post('/predict', json={'description': 'wind farm'}).headers['Server-Timing'])
+    assert stages['models'] == (None, 'cached')
+    monkeypatch.setattr(timed, 'SERVER_TIMING', False)
+    assert 'Server-Timing' not in client.post('/predict', json={'description': 'wind farm'}).headers
@@ -0,0 +1,89 @@
+"""Per-request stage timings exported as a `Server-Timing` header.
+
+A `RequestTimer` is bound to the current context for the duration of a
+request (see the hooks in app.py). Code on the scoring path wraps its stages
+in `stage(name)`; when no timer is active that returns a shared no-op context
+manager, so instrumented code costs one context-variable lookup.
+"""
+import contextlib
+import contextvars
+import time
+
+_CURRENT = contextvars.ContextVar('request_timer', default=None)
+_NOOP = contextlib.nullcontext()
+
+
+class RequestTimer:
+    """Collects (name, seconds, description) entries for one request."""
+
+    __slots__ = ('started', 'entries')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries = []
+
+    def add(self, name, seconds=None, desc=None):
+        self.entries.append((name, seconds, desc))
+
+    @contextlib.contextmanager
+    def stage(self, name, desc=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.entries.append((name, time.perf_counter() - start, desc))
+
+    def header(self):
+        """Render the entries plus a `total` stage as a Server-Timing header value."""
+        parts = []
+        for name, seconds, desc in self.entries + [('total', time.perf_counter() - self.started, None)]:
+            part = name
+            if seconds is not None:
+                part += f';dur={seconds * 1000:.3f}'
+            if desc:
+                part += f';desc="{desc}"'
+            parts.append(part)
+        return ', '.join(parts)
+
+    def as_dict(self):
+        """Stage durations in milliseconds (repeated stages are summed) and markers."""
+        out = {}
+        for name, seconds, desc in self.entries:
+            if seconds is None:
+                out[name] = desc
+            else:
+                out[name] = round(out.get(name, 0.0) + seconds * 1000, 3)
+        return out
+
+
+def start():
+    """Bind a fresh timer to the current context and return it."""
+    timer = RequestTimer()
+    _CURRENT.set(timer)
+    return timer
+
+
+def finish():
+    """Unbind and return the current timer (None if none was active)."""
+    timer = _CURRENT.get()
+    _CURRENT.set(None)
+    return timer
+
+
+def current():
+    return _CURRENT.get()
+
+
+def stage(name, desc=None):
+    """Context manager timing `name` on the active timer; a no-op without one."""
+    timer = _CURRENT.get()
+    if timer is None:
+        return _NOOP
+    return timer.stage(name, desc)
+
+
+def record(name, seconds=None, desc=None):
+    """Add a finished duration or, with seconds=None, a marker such as a cache hit."""
+    timer = _CURRENT.get()
+    if timer is not None:
+        timer.add(name, seconds, desc)
@@ -1,64 +1,58 @@
 import os
 import pandas as pd
 import joblib
+import sys
+import time
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.multioutput import MultiOutputRegressor
 from sklearn.linear_model import LinearRegression
 
-# SDG keywords used to generate weak labels
-sdg_keywords = {
-    1: ['poverty','income','welfare'],
-    2: ['hunger','agriculture','food','nutrition'],
-    3: ['health','disease','medical','hospital'],
-    4: ['education','school','learning','training'],
-    5: ['women','gender','female','equality'],
-    6: ['water','sanitation','clean water'],
-    7: ['energy','renewable','solar','electricity'],
-    8: ['employment','jobs','economic','growth'],
-    9: ['infrastructure','industry','innovation','technology'],
-    10: ['inequality','equal opportunity','minorities'],
-    11: ['cities','urban','housing','transport'],
-    12: ['sustainable','consumption','recycle','waste'],
-    13: ['climate','carbon','emission'],
-    14: ['ocean','marine','sea','fish'],
-    15: ['biodiversity','forest','ecosystem','land'],
-    16: ['peace','justice','corruption','governance'],
-    17: ['partnership','international','cooperation']
-}
-
 base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-data_path = os.path.join(base_dir, 'projects.csv')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import storage
+import multi_target
+from weak_labels import SDG_COLUMNS, score_sdg
+
+# CSV or Parquet corpus; only the Description column is read
+data_path = os.environ.get('PROJECTS_PATH', os.path.join(base_dir, 'projects.csv'))
+# 'multioutput' (one LinearRegression per SDG) or a multi_target solver
+# ('auto', 'cg', 'direct', 'lsqr') fitting all 17 SDGs in one fused head
+SDG_SOLVER = os.environ.get('SDG_SOLVER', 'multioutput')
+SDG_RIDGE_ALPHA = float(os.environ.get('SDG_RIDGE_ALPHA', '0'))
+SDG_N_JOBS = int(os.environ.get('SDG_N_JOBS', '-1'))
+if SDG_SOLVER != 'multioutput' and SDG_SOLVER not in multi_target.SOLVERS:
+    raise SystemExit(f"Unknown SDG_SOLVER {SDG_SOLVER!r}; expected 'multioutput' or one of {multi_target.SOLVERS}")
+if SDG_RIDGE_ALPHA > 0 and SDG_SOLVER in ('multioutput', 'lsqr'):
+    raise SystemExit(f"SDG_RIDGE_ALPHA needs a 'cg', 'direct' or 'auto' SDG_SOLVER, not {SDG_SOLVER!r}")
 models_dir = os.path.join(base_dir, 'app', 'models')
 os.makedirs(models_dir, exist_ok=True)
 
 print('Loading data from', data_path)
-df = pd.read_csv(data_path)
+df = storage.read_corpus(data_path, columns=['Description'])
 
 # ensure Description column exists
 if 'Description' not in df.columns:
     raise SystemExit('No Description column found in CSV')
 
-# Function to compute SDG vector labels
-def score_sdg(text):
-    text = str(text).lower()
-    vector = []
-    for sdg, words in sdg_keywords.items():
-        score = min(1.0, sum(w in text for w in words) / max(1, len(words)))
-        vector.append(round(score, 2))
-    return vector
-
 print('Generating SDG labels (weak labels from keywords)')
 labels = df['Description'].apply(score_sdg)
-Y = pd.DataFrame(labels.tolist(), columns=[f'SDG{i}' for i in range(1,18)])
+Y = pd.DataFrame(labels.tolist(), columns=SDG_COLUMNS)
 
 # Vectorize descriptions
 vectorizer = TfidfVectorizer(max_features=5000)
 X = vectorizer.fit_transform(df['Description'].astype(str))
 
 # Train simple regression model
-print('Training SDG MultiOutputRegressor...')
-model = MultiOutputRegressor(LinearRegression())
-model.fit(X, Y)
+started = time.perf_counter()
+if SDG_SOLVER == 'multioutput':
+    print('Training SDG MultiOutputRegressor...')
+    model = MultiOutputRegressor(LinearRegression())
+    model.fit(X, Y)
+else:
+    print(f'Training fused SDG head (solver={SDG_SOLVER}, alpha={SDG_RIDGE_ALPHA})...')
+    model = multi_target.fit_multi_target(X, Y.to_numpy(), alpha=SDG_RIDGE_ALPHA, solver=SDG_SOLVER,
+                                          n_jobs=SDG_N_JOBS)
+print(f'Trained in {time.perf_counter() - started:.2f}s')
 
 # Save artifacts
 vfile = os.path.join(models_dir, 'vectorizer.pkl')
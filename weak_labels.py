@@ -0,0 +1,42 @@
+"""Keyword weak labels the ESG and SDG heads are trained on.
+
+esg_sdg_model.py and train_sdg.py generate their training targets here;
+sweep.py and other tooling import them from here instead of re-running
+those scripts. The keyword lists live in taxonomy.json (`esg_labels` and
+`sdg_labels`); one taxonomy scan per text yields both label sets.
+"""
+import numpy as np
+
+import taxonomy
+
+ESG_COLUMNS = ['E', 'S', 'G']
+SDG_COLUMNS = [f'SDG{i}' for i in taxonomy.SDG_GOALS]
+
+
+def score_esg(text):
+    """(E, S, G) keyword scores: matched keywords / 5, capped at 1."""
+    tax = taxonomy.current()
+    return tax.esg_label(tax.scan(str(text), 'labels'))
+
+
+def score_sdg(text):
+    """17 SDG keyword scores: fraction of the goal's keywords present."""
+    tax = taxonomy.current()
+    return tax.sdg_label(tax.scan(str(text), 'labels'))
+
+
+def label_matrix(texts, targets='all'):
+    """Weak-label matrix for `texts`: 'esg' (n, 3), 'sdg' (n, 17) or 'all' (n, 20, ESG first)."""
+    if targets not in ('esg', 'sdg', 'all'):
+        raise ValueError(f"Unknown targets {targets!r}; expected 'esg', 'sdg' or 'all'")
+    tax = taxonomy.current()
+    rows = []
+    for text in texts:
+        found = tax.scan(str(text), 'labels')
+        row = list(tax.esg_label(found)) if targets != 'sdg' else []
+        rows.append(row + tax.sdg_label(found) if targets != 'esg' else row)
+    return np.array(rows, dtype=float).reshape(-1, len(label_columns(targets)))
+
+
+def label_columns(targets='all'):
+    return {'esg': ESG_COLUMNS, 'sdg': SDG_COLUMNS, 'all': ESG_COLUMNS + SDG_COLUMNS}[targets]